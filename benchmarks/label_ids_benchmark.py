@@ -0,0 +1,68 @@
+"""
+Measures the throughput (rows per second) of the label id computations Dataset.get_unique_labels_from_2d and
+MultiOutputDataset.get_tuple_ids, either on synthetic labels or on the datasets given as arguments.
+
+    python benchmarks/label_ids_benchmark.py
+    python benchmarks/label_ids_benchmark.py examples/cartpole.scs examples/10rooms.scs
+"""
+import sys
+import time
+
+import numpy as np
+
+from dtcontrol.dataset.dataset import Dataset
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+
+REPETITIONS = 3
+
+
+def measure(name, num_rows, f):
+    best = min(timed(f) for _ in range(REPETITIONS))
+    print(f'{name:<52} {num_rows:>10} rows {best:8.3f}s {num_rows / best:14,.0f} rows/s')
+
+
+def timed(f):
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def get_tuple_ids(ds):
+    ds.tuple_ids = None
+    ds.get_tuple_ids()
+
+
+def benchmark_synthetic(num_rows, non_determinism, num_outputs, num_labels, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, num_labels, size=(num_outputs, num_rows, non_determinism))
+    y[:, rng.random((num_rows, non_determinism)) < 0.5] = -1
+    ds = MultiOutputDataset('synthetic.csv')
+    ds.x = np.zeros((num_rows, 1))
+    ds.y = y
+    ds.get_tuples()
+    description = f'{num_outputs} outputs, {non_determinism} choices'
+    measure(f'get_unique_labels_from_2d ({description})', num_rows,
+            lambda: Dataset.get_unique_labels_from_2d(y[0]))
+    measure(f'get_tuple_ids ({description})', num_rows, lambda: get_tuple_ids(ds))
+
+
+def benchmark_file(filename):
+    ds = MultiOutputDataset(filename)
+    ds.load_if_necessary()
+    if len(ds.y.shape) == 2:
+        measure(f'get_unique_labels_from_2d ({ds.get_name()})', len(ds.y), lambda: Dataset.get_unique_labels_from_2d(ds.y))
+        return
+    ds.get_tuples()
+    measure(f'get_tuple_ids ({ds.get_name()})', ds.y.shape[1], lambda: get_tuple_ids(ds))
+    tuple_ids = ds.get_tuple_ids()
+    measure(f'get_unique_labels_from_2d ({ds.get_name()})', len(tuple_ids),
+            lambda: Dataset.get_unique_labels_from_2d(tuple_ids))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        for filename in sys.argv[1:]:
+            benchmark_file(filename)
+    else:
+        for num_rows in [10 ** 4, 10 ** 5, 10 ** 6]:
+            benchmark_synthetic(num_rows, non_determinism=4, num_outputs=2, num_labels=10)
@@ -5,6 +5,7 @@ import os
 import sys
 import time
 import webbrowser
+from multiprocessing.connection import wait
 from os import makedirs
 from os.path import join, exists, isfile
 
@@ -15,6 +16,7 @@ import json
 import dtcontrol
 from dtcontrol import util
 from dtcontrol.bdd import BDD
+from dtcontrol.benchmark_worker import BenchmarkWorker
 from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
 from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
 from dtcontrol.timeout import call_with_timeout
@@ -25,6 +27,8 @@ file_loader = FileSystemLoader([path + "/c_templates" for path in dtcontrol.__pa
 env = Environment(loader=file_loader)
 single_output_c_template = env.get_template('single_output.c')
 multi_output_c_template = env.get_template('multi_output.c')
+# the templates are rendered with this placeholder as code, which is then replaced by the code written by the classifier
+C_CODE_PLACEHOLDER = '/* code */'
 
 util.ignore_convergence_warnings()
 sys.setrecursionlimit(10000)
@@ -35,7 +39,7 @@ class BenchmarkSuite:
     """
 
     def __init__(self, benchmark_file='benchmark', timeout=None, output_folder='decision_trees', output_type=None, save_folder=None,
-                 stdout=False, rerun=False, is_artifact=False):
+                 stdout=False, rerun=False, is_artifact=False, jobs=1):
         logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
         self.datasets = []
         self.json_file = f'{benchmark_file}.json'
@@ -48,6 +52,7 @@ class BenchmarkSuite:
         self.stdout = stdout
         self.rerun = rerun  # rerun benchmarks even if there already are results available
         self.is_artifact = is_artifact  # always produces a table exactly corresponding to the one in the paper
+        self.jobs = jobs  # the number of worker processes computing cells in parallel
         self.table_controller = TableController(self.html_file, self.output_folder, self.is_artifact)
 
         logging.info(f"INFO: Benchmark statistics will be available in {self.json_file} and {self.html_file}.")
@@ -91,6 +96,15 @@ class BenchmarkSuite:
 
     def benchmark(self, classifiers):
         self.load_results()
+        if self.jobs > 1:
+            self.benchmark_parallel(classifiers)
+        else:
+            self.benchmark_sequential(classifiers)
+        logging.info('All benchmarks completed. Shutting down dtControl.')
+
+        self.update_table(classifiers)
+
+    def benchmark_sequential(self, classifiers):
         num_steps = len(classifiers) * len(self.datasets)
         step = 0
         for ds in self.datasets:
@@ -103,25 +117,103 @@ class BenchmarkSuite:
                     # traceback.print_exc()
                     logging.error(e)
                     continue
-                if computed:
+                if computed or cell == 'not applicable':
                     self.save_result(classifier.get_name(), ds, cell)
-                    if cell == 'timeout':
-                        msg = f"{step}/{num_steps}: Timed out after {format_seconds(self.timeout)}"
-                    elif cell == 'failed to fit':
-                        msg = f"{step}/{num_steps}: Failed to fit"
-                    else:
-                        msg = f"{step}/{num_steps}: Finished in {cell['time']}."
-                    logging.info(msg)
+                    self.log_cell(step, num_steps, cell)
                 else:
-                    if cell == 'not applicable':
-                        self.save_result(classifier.get_name(), ds, cell)
-                        logging.info(
-                            f"{step}/{num_steps}: Not applicable.")
-                    else:
-                        logging.info(
-                            f"{step}/{num_steps}: Not running since the result is already available.")
-        logging.info('All benchmarks completed. Shutting down dtControl.')
+                    logging.info(
+                        f"{step}/{num_steps}: Not running since the result is already available.")
 
+    def benchmark_parallel(self, classifiers):
+        """
+        Computes the cells on self.jobs worker processes. A cell that exceeds the timeout is stopped by killing its
+        worker, and results are saved as soon as a cell is completed.
+        """
+        num_steps = len(classifiers) * len(self.datasets)
+        pending = []
+        step = 0
+        for i, ds in enumerate(self.datasets):
+            for j, classifier in enumerate(classifiers):
+                step += 1
+                if self.already_computed(ds, classifier) and not self.rerun:
+                    logging.info(f"{step}/{num_steps}: Not running {classifier.get_name()} on {ds.get_name()} since "
+                                 f"the result is already available.")
+                else:
+                    pending.append((step, i, j))
+
+        workers = [BenchmarkWorker(self, classifiers) for _ in range(min(self.jobs, len(pending)))]
+        try:
+            while pending or not all(worker.is_idle() for worker in workers):
+                for worker in workers:
+                    if worker.is_idle() and pending:
+                        task = self.next_task(pending, worker.loaded_datasets)
+                        step, i, j = task
+                        logging.info(f"{step}/{num_steps}: Evaluating {classifiers[j].get_name()} on "
+                                     f"{self.datasets[i].get_name()}... ")
+                        worker.assign(task)
+                busy = [worker for worker in workers if not worker.is_idle()]
+                deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+                ready = wait([worker.connection for worker in busy],
+                             max(0, min(deadlines) - time.time()) if deadlines else None)
+                for worker in busy:
+                    if worker.connection in ready:
+                        self.handle_message(worker, classifiers, num_steps)
+                    elif worker.is_timed_out():
+                        step, i, j = worker.task
+                        worker.restart()
+                        self.save_result(classifiers[j].get_name(), self.datasets[i], 'timeout')
+                        self.log_cell(step, num_steps, 'timeout')
+                        self.update_table(classifiers)
+        finally:
+            for worker in workers:
+                worker.stop()
+
+    @staticmethod
+    def next_task(pending, loaded_datasets):
+        # prefer cells whose dataset the worker has already loaded
+        for index, (_, i, _) in enumerate(pending):
+            if i in loaded_datasets:
+                return pending.pop(index)
+        return pending.pop(0)
+
+    def handle_message(self, worker, classifiers, num_steps):
+        step, i, j = worker.task
+        ds = self.datasets[i]
+        try:
+            message = worker.connection.recv()
+        except EOFError:
+            logging.error(f"{step}/{num_steps}: The worker evaluating {classifiers[j].get_name()} on {ds.get_name()} "
+                          f"terminated unexpectedly.")
+            worker.restart()
+            self.save_result(classifiers[j].get_name(), ds, 'failed to fit')
+            self.log_cell(step, num_steps, 'failed to fit')
+            self.update_table(classifiers)
+            return
+        if message[0] == 'fitting':
+            _, ds.x_metadata, ds.y_metadata = message
+            worker.set_fitting(self.timeout)
+        elif message[0] == 'fitted':
+            worker.set_fitted()
+        else:
+            _, cell, ds.x_metadata, ds.y_metadata = message
+            worker.task = None
+            worker.set_fitted()
+            self.save_result(classifiers[j].get_name(), ds, cell)
+            self.log_cell(step, num_steps, cell)
+            self.update_table(classifiers)
+
+    def log_cell(self, step, num_steps, cell):
+        if cell == 'timeout':
+            msg = f"{step}/{num_steps}: Timed out after {format_seconds(self.timeout)}"
+        elif cell == 'failed to fit':
+            msg = f"{step}/{num_steps}: Failed to fit"
+        elif cell == 'not applicable':
+            msg = f"{step}/{num_steps}: Not applicable."
+        else:
+            msg = f"{step}/{num_steps}: Finished in {cell['time']}."
+        logging.info(msg)
+
+    def update_table(self, classifiers):
         self.table_controller.update_and_save(self.results, [ds.get_name() for ds in self.datasets],
                                               [cl.get_name() for cl in classifiers])
 
@@ -144,40 +236,47 @@ class BenchmarkSuite:
             'classifiers']
 
     def train_and_get_cell(self, dataset, classifier):
-        if self.timeout is not None:
-            classifier, success, run_time = call_with_timeout(classifier, 'fit', dataset, timeout=self.timeout)
+        classifier, success, run_time = self.fit(classifier, dataset, self.timeout)
+        if not success:
+            return 'timeout'
+        return self.get_cell(classifier, dataset, run_time)
+
+    @staticmethod
+    def fit(classifier, dataset, timeout):
+        """
+        :returns: the fitted classifier, False if the timeout was reached and True otherwise, and the time needed
+        """
+        if timeout is not None:
+            return call_with_timeout(classifier, 'fit', dataset, timeout=timeout)
+        start = time.time()
+        classifier.fit(dataset)
+        return classifier, True, time.time() - start
+
+    def get_cell(self, classifier, dataset, run_time):
+        accuracy_start = time.time()
+        if isinstance(classifier, BDD):
+            acc = 1.0  # TODO: make BDD checking code work with multi-output datasets
         else:
-            start = time.time()
-            classifier.fit(dataset)
-            run_time = time.time() - start
-            success = True
-        if success:
-            accuracy_start = time.time()
-            if isinstance(classifier, BDD):
-                acc = 1.0  # TODO: make BDD checking code work with multi-output datasets
-            else:
-                acc = dataset.compute_accuracy(classifier.predict(dataset, actual_values=False))
-            if acc is None:
-                cell = 'failed to fit'
-            else:
-                stats = classifier.get_stats()
-                cell = {'stats': stats, 'time': format_seconds(run_time)}
-                self.save_dot_c_json(classifier, dataset)
-                # if not isinstance(classifier, OC1Wrapper):
-                #     vhdl_filename = self.get_filename(self.output_folder, dataset, classifier, '.vhdl')
-                #     classifier.print_vhdl(len(dataset.x_metadata["variables"]), vhdl_filename)
-                if abs(acc - 1.0) > 1e-10:
-                    cell['accuracy'] = acc
-                if self.save_folder is not None:
-                    classifier.save(self.get_filename(self.save_folder, dataset, classifier, '.saved', unique=True))
-
-            accuracy_time = time.time() - accuracy_start
-            # complete_time = time.time() - start
-            logging.debug("Decision tree was built in {} seconds.".format(round(run_time, ndigits=3)))
-            logging.debug("Accuracy was computed in {} seconds.".format(round(accuracy_time, ndigits=3)))
-            logging.debug("dtControl finished in {} seconds.".format(round(run_time + accuracy_time, ndigits=3)))
+            acc = classifier.compute_accuracy(dataset)
+        if acc is None:
+            cell = 'failed to fit'
         else:
-            cell = 'timeout'
+            stats = classifier.get_stats()
+            cell = {'stats': stats, 'time': format_seconds(run_time)}
+            self.save_dot_c_json(classifier, dataset)
+            # if not isinstance(classifier, OC1Wrapper):
+            #     vhdl_filename = self.get_filename(self.output_folder, dataset, classifier, '.vhdl')
+            #     classifier.print_vhdl(len(dataset.x_metadata["variables"]), vhdl_filename)
+            if abs(acc - 1.0) > 1e-10:
+                cell['accuracy'] = acc
+            if self.save_folder is not None:
+                classifier.save(self.get_filename(self.save_folder, dataset, classifier, '.saved', unique=True))
+
+        accuracy_time = time.time() - accuracy_start
+        # complete_time = time.time() - start
+        logging.debug("Decision tree was built in {} seconds.".format(round(run_time, ndigits=3)))
+        logging.debug("Accuracy was computed in {} seconds.".format(round(accuracy_time, ndigits=3)))
+        logging.debug("dtControl finished in {} seconds.".format(round(run_time + accuracy_time, ndigits=3)))
         return cell
 
     def save_dot_c_json(self, classifier, dataset):
@@ -188,43 +287,52 @@ class BenchmarkSuite:
         if isinstance(classifier, BDD):
             return
 
+        # the classifiers write their output to the files part by part, see BenchmarkSuiteClassifier.write_dot
         if self.stdout:
             logging.info(f"INFO: Writing {self.output_type} code into stdout.\n")
             print("START")
             if self.output_type == 'c':
-                num_outputs = 1 if len(dataset.y.shape) <= 2 else len(dataset.y)
-                template = multi_output_c_template if num_outputs > 1 else single_output_c_template
-                example = f'{{{",".join(str(i) + (".f" if isinstance(i, np.integer) else "f") for i in dataset.x[0])}}}'
-                print(template.render(example=example, num_outputs=num_outputs, code=classifier.print_c()))
+                self.write_c_file(sys.stdout, classifier, dataset)
             elif self.output_type == 'dot':
-                print(classifier.print_dot(dataset.x_metadata, dataset.y_metadata))
+                classifier.write_dot(sys.stdout, dataset.x_metadata, dataset.y_metadata)
             elif self.output_type == 'json':
-                print(classifier.toJSON(dataset.x_metadata, dataset.y_metadata))
+                classifier.write_json(sys.stdout, dataset.x_metadata, dataset.y_metadata)
+            print()
             print("END")
             return
 
         logging.info(f"INFO: Writing DOT file into {self.output_folder}.\n")
         dot_filename = self.get_filename(self.output_folder, dataset, classifier, '.dot')
         with open(dot_filename, 'w+') as outfile:
-            outfile.write(classifier.print_dot(dataset.x_metadata, dataset.y_metadata))
+            classifier.write_dot(outfile, dataset.x_metadata, dataset.y_metadata)
 
         logging.info(f"INFO: Writing C file into {self.output_folder}.\n")
-        num_outputs = 1 if len(dataset.y.shape) <= 2 else len(dataset.y)
-        template = multi_output_c_template if num_outputs > 1 else single_output_c_template
-        example = f'{{{",".join(str(i) + (".f" if isinstance(i, np.integer) else "f") for i in dataset.x[0])}}}'
         c_filename = self.get_filename(self.output_folder, dataset, classifier, '.c')
         with open(c_filename, 'w+') as outfile:
-            outfile.write(template.render(example=example, num_outputs=num_outputs, code=classifier.print_c()))
+            self.write_c_file(outfile, classifier, dataset)
 
         json_filename = self.get_filename(self.output_folder, dataset, classifier, '.json')
         with open(json_filename, 'w+') as outfile:
-            outfile.write(classifier.toJSON(dataset.x_metadata, dataset.y_metadata))
+            classifier.write_json(outfile, dataset.x_metadata, dataset.y_metadata)
+
+    @staticmethod
+    def write_c_file(file, classifier, dataset):
+        """
+        Writes the C template for the dataset with the code of the classifier filled in.
+        """
+        num_outputs = 1 if len(dataset.y.shape) <= 2 else len(dataset.y)
+        template = multi_output_c_template if num_outputs > 1 else single_output_c_template
+        example = f'{{{",".join(str(i) + (".f" if isinstance(i, np.integer) else "f") for i in dataset.x[0])}}}'
+        before, after = template.render(example=example, num_outputs=num_outputs,
+                                        code=C_CODE_PLACEHOLDER).split(C_CODE_PLACEHOLDER)
+        file.write(before)
+        classifier.write_c(file)
+        file.write(after)
 
     @staticmethod
     def get_filename(folder, dataset, classifier, extension, unique=False):
         dir = join(folder, classifier.get_name(), dataset.get_name())
-        if not exists(dir):
-            makedirs(dir)
+        makedirs(dir, exist_ok=True)
         name = classifier.get_name()
         if unique:
             name += f'--{time.strftime("%Y%m%d-%H%M%S")}'
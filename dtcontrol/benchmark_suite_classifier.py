@@ -28,6 +28,14 @@ class BenchmarkSuiteClassifier(ABC):
         """
         pass
 
+    def compute_accuracy(self, dataset):
+        """
+        Computes the fraction of examples in the dataset for which all predicted labels are allowed.
+        :param dataset: the dataset to classify
+        :return: the accuracy, or None if the classifier has no prediction for some example
+        """
+        return dataset.compute_accuracy(self.predict(dataset, actual_values=False))
+
     @abstractmethod
     def get_stats(self):
         """
@@ -53,6 +61,13 @@ class BenchmarkSuiteClassifier(ABC):
         """
         pass
 
+    def write_dot(self, file, x_metadata, y_metadata):
+        """
+        Writes the classifier in the dot (graphviz) format to a file object. Classifiers with large outputs should
+        override this to write the output part by part instead of building the whole string with print_dot.
+        """
+        file.write(self.print_dot(x_metadata, y_metadata))
+
     @abstractmethod
     def print_c(self):
         """
@@ -60,3 +75,9 @@ class BenchmarkSuiteClassifier(ABC):
         :return: the C string
         """
         pass
+
+    def write_c(self, file):
+        """
+        Writes the classifier as nested if-else statements in the C syntax to a file object, see write_dot.
+        """
+        file.write(self.print_c())
@@ -0,0 +1,107 @@
+import logging
+import multiprocessing
+import time
+import traceback
+
+from dtcontrol.timeout import kill_process_tree
+
+def run_worker(suite, classifiers, connection):
+    """
+    The main loop of a worker process. Receives the indices of (dataset, classifier) cells, computes them and sends back
+    the following messages:
+        ('fitting', x_metadata, y_metadata) once the dataset is loaded and the classifier is about to be fit
+        ('fitted',) once the classifier has been fit
+        ('done', cell, x_metadata, y_metadata) once the cell has been computed, where cell is 'failed to fit' if the
+            computation raised an error
+    Datasets stay loaded in the worker, so that every worker loads every dataset at most once.
+    """
+    while True:
+        task = connection.recv()
+        if task is None:
+            return
+        dataset_index, classifier_index = task
+        dataset = suite.datasets[dataset_index]
+        classifier = classifiers[classifier_index]
+        try:
+            dataset.load_if_necessary()
+            if not classifier.is_applicable(dataset):
+                connection.send(('done', 'not applicable', dataset.x_metadata, dataset.y_metadata))
+                continue
+            connection.send(('fitting', dataset.x_metadata, dataset.y_metadata))
+            classifier, success, run_time = suite.fit(classifier, dataset, timeout=None)
+            connection.send(('fitted',))
+            cell = suite.get_cell(classifier, dataset, run_time)
+        except ValueError as e:
+            logging.error(e)
+            cell = 'failed to fit'
+        except Exception:
+            logging.error(traceback.format_exc())
+            cell = 'failed to fit'
+        connection.send(('done', cell, dataset.x_metadata, dataset.y_metadata))
+
+class BenchmarkWorker:
+    """
+    A worker process computing benchmark cells. The timeout of a cell is enforced by the benchmark suite, which kills
+    the worker (including any OC1 process it started) and starts a new one.
+
+    Workers are not daemonic, as classifiers may start processes of their own (e.g. DecisionTree with num_jobs > 1).
+    Therefore they have to be shut down explicitly with stop.
+    """
+
+    def __init__(self, suite, classifiers):
+        self.suite = suite
+        self.classifiers = classifiers
+        self.connection = None
+        self.process = None
+        self.task = None  # (step, dataset_index, classifier_index) of the cell currently computed
+        self.deadline = None
+        self.loaded_datasets = set()
+        self.start()
+
+    def start(self):
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=run_worker,
+                                               args=(self.suite, self.classifiers, worker_connection))
+        self.process.start()
+        worker_connection.close()
+        self.task = None
+        self.deadline = None
+        self.loaded_datasets = set()
+
+    def is_idle(self):
+        return self.task is None
+
+    def assign(self, task):
+        self.task = task
+        self.connection.send(task[1:])
+
+    def set_fitting(self, timeout):
+        if timeout is not None:
+            self.deadline = time.time() + timeout
+        self.loaded_datasets.add(self.task[1])
+
+    def set_fitted(self):
+        self.deadline = None
+
+    def is_timed_out(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def restart(self):
+        self.kill()
+        self.start()
+
+    def kill(self):
+        kill_process_tree(self.process.pid)
+        self.process.join()
+        self.connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.connection.close()
@@ -255,10 +255,11 @@ def main():
 
     # TODO Make early stopping user definable
     def get_classifier(numeric_split, categorical_split, determinize, impurity, tolerance=1e-5, safe_pruning=False,
-                       name=None):
+                       name=None, num_jobs=1):
         """
         Creates classifier objects for each method
 
+        :param num_jobs: the number of worker processes building each decision tree
         :param name:
         :param safe_pruning:
         :param impurity:
@@ -356,7 +357,8 @@ def main():
         impurity_measure = impurity_map[impurity](determinization_map[determinize](None))
 
         classifier = DecisionTree(splitting_strategy, impurity_measure, name,
-                                  early_stopping=early_stopping, label_pre_processor=label_pre_processor)
+                                  early_stopping=early_stopping, label_pre_processor=label_pre_processor,
+                                  num_jobs=num_jobs)
 
         if safe_pruning:
             logging.info(f"Enabling safe pruning for preset {name}")
@@ -443,6 +445,7 @@ def main():
                 sys.exit("Ensure permission exists to create output directory")
 
         kwargs["rerun"] = args.rerun
+        kwargs["jobs"] = args.jobs
         if not args.rerun and isfile(kwargs["benchmark_file"]):
             logging.warning(
                 f"Dataset - method combinations whose results are already present in '{kwargs['benchmark_file']}' "
@@ -490,7 +493,8 @@ def main():
                 try:
                     classifier = get_classifier(numeric_split, categorical_split, determinize, impurity,
                                                 tolerance=tolerance,
-                                                safe_pruning=safe_pruning, name=preset)
+                                                safe_pruning=safe_pruning, name=preset,
+                                                num_jobs=args.tree_jobs)
                 except EnvironmentError:
                     logging.warning(f"WARNING: Could not instantiate a classifier for preset '{preset}'. This could be "
                                     f"because the preset '{preset}' is not supported on this platform. Skipping...\n")
@@ -514,7 +518,8 @@ def main():
             try:
                 classifier = get_classifier(numeric_split, categorical_split, determinize, impurity,
                                             tolerance=tolerance,
-                                            safe_pruning=safe_pruning, name=preset)
+                                            safe_pruning=safe_pruning, name=preset,
+                                            num_jobs=args.tree_jobs)
             except Exception:
                 logging.error("Could not instantiate the default classifier due a runtime error. Exiting...")
                 sys.exit(-1)
@@ -592,6 +597,14 @@ def main():
                             help="Sets a timeout for each method. Can be specified in seconds, minutes "
                                  "or hours (eg. 300s, 7m or 3h)")
 
+    run_config.add_argument("--jobs", "-j", type=int, default=1,
+                            help="Evaluates the input-method combinations on the given number of worker processes. "
+                                 "Combinations exceeding the timeout are stopped by killing their worker.")
+
+    run_config.add_argument("--tree-jobs", type=int, default=1,
+                            help="Builds every decision tree on the given number of worker processes. Only subtrees "
+                                 "with many examples are distributed, so this pays off for large controllers.")
+
     subparsers = parser.add_subparsers(title='other commands',
                                        # description = 'Supplementary commands',
                                        help='Run \'dtcontrol COMMAND --help\' to see command specific help')
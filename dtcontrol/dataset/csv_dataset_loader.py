@@ -1,11 +1,41 @@
 import logging
+import os
+from os.path import getsize
 
 import numpy as np
 import pandas as pd
 
 from dtcontrol.dataset.dataset_loader import DatasetLoader
+from dtcontrol.util import get_unique_rows
 
 class CSVDatasetLoader(DatasetLoader):
+    """
+    Reads CSV files in chunks if a chunk size is given, if the environment variable DTCONTROL_CSV_CHUNK_SIZE is set, or
+    if the file is larger than CHUNKING_THRESHOLD bytes.
+    """
+    CHUNKING_THRESHOLD = 256 * 1024 ** 2
+    DEFAULT_CHUNK_SIZE = 1000000
+
+    def __init__(self, chunk_size=None):
+        """
+        :param chunk_size: if given, the CSV is read in chunks of this many rows, so that only the aggregated controller
+                           and not the whole CSV has to fit into memory
+        """
+        super().__init__()
+        self.chunk_size = chunk_size
+
+    def get_chunk_size(self, filename):
+        """
+        :returns: the number of rows per chunk or None if the file should be read at once
+        """
+        if self.chunk_size is not None:
+            return self.chunk_size
+        if 'DTCONTROL_CSV_CHUNK_SIZE' in os.environ:
+            return int(os.environ['DTCONTROL_CSV_CHUNK_SIZE'])
+        if getsize(filename) > self.CHUNKING_THRESHOLD:
+            return self.DEFAULT_CHUNK_SIZE
+        return None
+
     def _load_dataset(self, filename):
         with open(filename, 'r') as f:
             logging.info(f"Reading from {filename}")
@@ -13,36 +43,27 @@ class CSVDatasetLoader(DatasetLoader):
 
             state_dim, input_dim = map(int, f.readline().split("BEGIN")[1].split())
 
-            ds = pd.read_csv(f, header=None)
+            chunk_size = self.get_chunk_size(filename)
+            if chunk_size is None:
+                chunks = [pd.read_csv(f, header=None)]
+            else:
+                logging.info(f"Reading in chunks of {chunk_size} rows")
+                chunks = pd.read_csv(f, header=None, chunksize=chunk_size)
+            x, label_values, label_codes = self.aggregate_chunks(chunks, state_dim, input_dim)
 
             unique_list = []
-            for i in range(state_dim, state_dim + input_dim):
-                unique_list += ds[i].unique().tolist()
+            for values in label_values:
+                unique_list += values
             index_to_actual = {x + 1: y for x, y in enumerate(set(unique_list))}
             value_to_index = {y: x for x, y in index_to_actual.items()}
-            ds[[i for i in range(state_dim, state_dim + input_dim)]] = ds[
-                [i for i in range(state_dim, state_dim + input_dim)]].applymap(lambda x: value_to_index[x])
-
-            grouped = ds.groupby([i for i in range(state_dim)], sort=False)
-            aggregate = grouped[state_dim].apply(list).reset_index(name=state_dim)
-            for i in range(1, input_dim):
-                aggregate[state_dim + i] = grouped[state_dim + i].apply(list).reset_index(name=state_dim + i)[
-                    state_dim + i]
-
-            max_non_det = aggregate[state_dim].agg(len).max()
-
-            for i in range(0, input_dim):
-                aggregate[state_dim + i] = aggregate[state_dim + i].apply(
-                    lambda ls: ls + [-1 for i in range(max_non_det - len(ls))])
-
-            x = np.array(aggregate[[i for i in range(state_dim)]])
 
-            if input_dim > 1:
-                y = np.ndarray((input_dim, x.shape[0], max_non_det), dtype=np.int16)
-                for i in range(input_dim):
-                    y[i] = np.array(aggregate[state_dim + i].tolist())
-            else:  # input_dim = 1
-                y = np.array(aggregate[state_dim].tolist())
+            y = np.full(label_codes.shape, -1, dtype=np.int16 if input_dim > 1 else int)
+            for i in range(input_dim):
+                code_to_index = np.array([value_to_index[value] for value in label_values[i]], dtype=int)
+                present = label_codes[i] != -1
+                y[i][present] = code_to_index[label_codes[i][present]]
+            if input_dim == 1:
+                y = y[0]
 
             # construct metadata
             # assumption is that UPPAAL only works with integers
@@ -63,3 +84,65 @@ class CSVDatasetLoader(DatasetLoader):
             logging.debug(y_metadata)
 
             return (x, x_metadata, y, y_metadata, index_to_actual)
+
+    @staticmethod
+    def grow(size, required):
+        return size if size >= required else max(required, 2 * size)
+
+    def aggregate_chunks(self, chunks, state_dim, input_dim):
+        """
+        Groups the rows of all chunks by state, keeping the states in the order of their first occurrence and the labels
+        of each state in the order of the file.
+        :param chunks: an iterable of DataFrames with the state columns followed by the label columns
+        :returns: the unique states, the unique values of every label column in the order of their first occurrence and
+                  the labels of shape (input_dim, num_states, max_non_det) as indices into these values, padded with -1
+        """
+        x = np.empty((0, state_dim))
+        label_values = [{} for _ in range(input_dim)]  # maps every value to its code, in the order of first occurrence
+        known_states = None
+        counts = np.zeros(0, dtype=np.int64)
+        label_codes = np.full((input_dim, 0, 0), -1, dtype=np.int64)
+
+        for chunk in chunks:
+            states = chunk.iloc[:, :state_dim].to_numpy()
+            first_occurrences, row_states = get_unique_rows(states)
+            if len(x) == 0:
+                chunk_to_group = np.arange(len(first_occurrences))
+            else:
+                # states of later chunks are matched with the states seen so far
+                if known_states is None:
+                    known_states = {state: i for i, state in enumerate(map(tuple, x.tolist()))}
+                chunk_to_group = np.array([known_states.setdefault(state, len(known_states))
+                                           for state in map(tuple, states[first_occurrences].tolist())], dtype=int)
+            new_groups = chunk_to_group >= len(x)
+            x = np.concatenate([x, states[first_occurrences[new_groups]]]) if len(x) > 0 else states[first_occurrences]
+            row_groups = chunk_to_group[row_states]
+
+            # the position of every label within its state
+            order = np.argsort(row_groups, kind='stable')
+            sorted_groups = row_groups[order]
+            is_group_start = np.ones(len(order), dtype=bool)
+            is_group_start[1:] = np.diff(sorted_groups) != 0
+            group_starts = np.flatnonzero(is_group_start)
+            ranks = np.arange(len(order)) - np.repeat(group_starts, np.diff(np.append(group_starts, len(order))))
+            counts = np.concatenate([counts, np.zeros(len(x) - len(counts), dtype=np.int64)])
+            positions = np.empty(len(order), dtype=np.int64)
+            positions[order] = counts[sorted_groups] + ranks
+            counts += np.bincount(row_groups, minlength=len(x))
+
+            _, capacity, width = label_codes.shape
+            if capacity < len(x) or width < counts.max(initial=0):
+                # grow geometrically, as later chunks add further states and labels
+                grown = np.full((input_dim, self.grow(capacity, len(x)), self.grow(width, int(counts.max()))), -1,
+                                dtype=np.int64)
+                grown[:, :capacity, :width] = label_codes
+                label_codes = grown
+
+            for i in range(input_dim):
+                codes, values = pd.factorize(chunk.iloc[:, state_dim + i])
+                value_codes = np.array([label_values[i].setdefault(value, len(label_values[i]))
+                                        for value in values.tolist()], dtype=np.int64)
+                label_codes[i, row_groups, positions] = value_codes[codes]
+
+        label_codes = label_codes[:, :len(x), :int(counts.max(initial=0))]
+        return x, [list(values) for values in label_values], label_codes
@@ -2,12 +2,13 @@ from abc import ABC, abstractmethod
 
 import numpy as np
 
+import dtcontrol.dataset.label_bitsets as label_bitsets
 from dtcontrol.dataset.csv_dataset_loader import CSVDatasetLoader
 from dtcontrol.dataset.prism_dataset_loader import PrismDatasetLoader
 from dtcontrol.dataset.scots_dataset_loader import ScotsDatasetLoader
 from dtcontrol.dataset.storm_dataset_loader import StormDatasetLoader
 from dtcontrol.dataset.uppaal_dataset_loader import UppaalDatasetLoader
-from dtcontrol.util import get_filename_and_relevant_extension
+from dtcontrol.util import get_filename_and_relevant_extension, get_unique_rows, make_set
 
 
 class Dataset(ABC):
@@ -52,6 +53,9 @@ class Dataset(ABC):
 
                 y[i] gives the allowed control inputs for the ith state. -1 is a
                 filler just to make the length of the lists  = max_non_determinism.
+
+        Subsets created with from_mask are views: they only store the indices of their examples in the root dataset
+        (the dataset holding the actual arrays) and materialize x, y and the derived label arrays on demand.
     """
 
     def __init__(self, filename):
@@ -66,7 +70,7 @@ class Dataset(ABC):
         }
         if self.extension not in self.extension_to_loader:
             raise ValueError('Unknown file format.')
-        self.x = None
+        self._x = None
         self.numeric_x = None
         self.categorical_x = None
 
@@ -76,7 +80,7 @@ class Dataset(ABC):
 
         self.x_metadata = {"variables": None, "categorical": None, "category_names": None,
                            "min": None, "max": None, "step_size": None}
-        self.y = None
+        self._y = None
         self.y_metadata = {"categorical": None, "category_names": None, "min": None, "max": None, "step_size": None,
                            'num_rows': None, 'num_flattened': None, 'num_unique_labels': None}
         self.index_to_actual = {}  # mapping from arbitrary integer indices to the actual float/categorical labels
@@ -86,17 +90,58 @@ class Dataset(ABC):
         self.categorical_columns = None
         self.is_deterministic = None
         self.parent_mask = None  # if this is a subset, parent_mask saves the mask into the parent dataset
+        self.root = None  # if this is a view, the dataset holding the actual arrays
+        self.indices = None  # if this is a view, the indices of its examples in the root dataset
+
+        # statistics of the root dataset, which views only select from (see get_label_row_ids, get_label_bitsets and
+        # is_x_constant)
+        self.label_row_ids = None
+        self.label_bitsets = None  # False if the bitsets would take more memory than the labels
+        self.x_min = None
+        self.x_max = None
+
+    @property
+    def x(self):
+        if self._x is None and self.is_view():
+            self._x = self.root.x[self.indices]
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        self._x = x
+
+    @property
+    def y(self):
+        if self._y is None and self.is_view():
+            self._y = self.select_examples_of_y(self.root.y)
+        return self._y
+
+    @y.setter
+    def y(self, y):
+        self._y = y
+
+    def select_examples_of_y(self, y):
+        """
+        Selects the examples of this view from a label array of the root dataset.
+        """
+        return y[self.indices]
+
+    def is_view(self):
+        return self.indices is not None
 
     def get_name(self):
         return self.name
 
     def copy_from_other_dataset(self, ds):
         self.x = ds.x
+        self.y = ds.y
+        self.copy_metadata_from_other_dataset(ds)
+
+    def copy_metadata_from_other_dataset(self, ds):
         self.numeric_x = None
         self.numeric_columns = None
         self.categorical_x = None
         self.x_metadata = ds.x_metadata
-        self.y = ds.y
         self.y_metadata = ds.y_metadata
         self.index_to_actual = ds.index_to_actual
         self.numeric_feature_mapping = ds.numeric_feature_mapping
@@ -104,6 +149,32 @@ class Dataset(ABC):
         self.is_deterministic = ds.is_deterministic
         self.treat_categorical_as_numeric = ds.treat_categorical_as_numeric
 
+    def init_view(self, parent, mask):
+        """
+        Turns this (empty) dataset into a view of the examples of parent selected by mask. No arrays are copied.
+        :param parent: the dataset to take the examples from, which can itself be a view
+        :param mask: a boolean mask or an index array into the examples of parent
+        """
+        self.copy_metadata_from_other_dataset(parent)
+        self.parent_mask = mask
+        if parent.is_view():
+            self.root = parent.root
+            self.indices = parent.indices[mask]
+        else:
+            self.root = parent
+            self.indices = np.arange(len(parent))[mask]
+
+    def release_materialized_arrays(self):
+        """
+        Frees the arrays a view has materialized from its root dataset. They are recomputed when needed again.
+        Does nothing if this dataset is not a view.
+        """
+        if self.is_view():
+            self._x = None
+            self._y = None
+            self.numeric_x = None
+            self.categorical_x = None
+
     def load_if_necessary(self):
         if self.x is None:
             self.x, self.x_metadata, self.y, self.y_metadata, self.index_to_actual = \
@@ -122,15 +193,18 @@ class Dataset(ABC):
         if self.x is None:
             raise RuntimeError('Dataset is not loaded.')
 
+    def get_num_features(self):
+        return self.root.x.shape[1] if self.is_view() else self.x.shape[1]
+
     def get_numeric_x(self):
         if self.numeric_x is None:
             if self.treat_categorical_as_numeric:
-                self.numeric_columns = set(range(self.x.shape[1]))
+                self.numeric_columns = set(range(self.get_num_features()))
             else:
-                self.numeric_columns = set(range(self.x.shape[1])).difference(set(self.x_metadata['categorical']))
+                self.numeric_columns = set(range(self.get_num_features())).difference(set(self.x_metadata['categorical']))
             self.numeric_columns = sorted(list(self.numeric_columns))
             self.numeric_feature_mapping = {i: self.numeric_columns[i] for i in range(len(self.numeric_columns))}
-            self.numeric_x = self.x[:, self.numeric_columns]
+            self.numeric_x = self.select_columns(self.numeric_columns)
         return self.numeric_x
 
     def get_categorical_x(self):
@@ -138,9 +212,83 @@ class Dataset(ABC):
             self.categorical_columns = self.x_metadata['categorical']
             self.categorical_feature_mapping = {i: self.categorical_columns[i] for i in
                                                 range(len(self.categorical_columns))}
-            self.categorical_x = self.x[:, self.categorical_columns]
+            self.categorical_x = self.select_columns(self.categorical_columns)
         return self.categorical_x
 
+    def select_columns(self, columns):
+        """
+        Returns x restricted to the given columns. A view only copies the selected columns from its root dataset.
+        """
+        if list(columns) == list(range(self.get_num_features())):
+            return self.x
+        if self.is_view() and self._x is None:
+            return self.root.x[np.ix_(self.indices, np.asarray(columns, dtype=int))]
+        return self.x[:, columns]
+
+    def get_root(self):
+        return self.root if self.is_view() else self
+
+    def select_examples(self, array):
+        """
+        Selects the examples of this dataset from an array computed for the root dataset.
+        """
+        return array[self.indices] if self.is_view() else array
+
+    def get_label_row_ids(self):
+        """
+        Returns an int for every example, which is the same for two examples if and only if their rows of
+        get_single_labels() are equal. It is computed once for the root dataset.
+        """
+        root = self.get_root()
+        if root.label_row_ids is None:
+            _, root.label_row_ids = np.unique(root.get_single_labels(), axis=0, return_inverse=True)
+            root.label_row_ids = root.label_row_ids.reshape(-1)
+        return self.select_examples(root.label_row_ids)
+
+    def get_label_bitsets(self):
+        """
+        Returns the labels of get_single_labels() as bitsets (see label_bitsets.py), where bit (l % 64) of word
+        [i, l // 64] is set if and only if example i allows the label l. It is computed once for the root dataset and
+        kept next to y, taking up to as much memory as y again. The bitsets are thus only used if enabled with the
+        use_label_bitsets parameter of DecisionTree.
+        :returns: the bitsets or None if they would take more memory than the labels themselves
+        """
+        root = self.get_root()
+        if root.label_bitsets is None:
+            labels = root.get_single_labels()
+            num_words = label_bitsets.get_num_words(int(labels.max(initial=0)) + 1)
+            root.label_bitsets = False if num_words > labels.shape[1] else label_bitsets.to_bitsets(labels)
+        if root.label_bitsets is False:
+            return None
+        return self.select_examples(root.label_bitsets)
+
+    def is_x_constant(self):
+        """
+        Returns whether all entries of x are equal. The minimum and maximum of every feature are computed once for the
+        root dataset. A view then only checks the features that are not constant in the root dataset, stopping at the
+        first one that is not constant in the view.
+        """
+        if len(self) == 0:
+            return True
+        root = self.get_root()
+        if root.x_min is None:
+            root.x_min = root.x.min(axis=0)
+            root.x_max = root.x.max(axis=0)
+        constant_in_root = root.x_min == root.x_max
+        if constant_in_root.all() or not self.is_view():
+            return root.x_min.min() == root.x_max.max()
+        constant_values = root.x_min[constant_in_root]
+        if len(constant_values) > 0 and constant_values.min() != constant_values.max():
+            return False
+        value = constant_values[0] if len(constant_values) > 0 else None
+        for feature in np.flatnonzero(~constant_in_root):
+            column = self.select_columns([feature])
+            column_min, column_max = column.min(), column.max()
+            if column_min != column_max or (value is not None and column_min != value):
+                return False
+            value = column_min
+        return True
+
     def set_treat_categorical_as_numeric(self):
         self.treat_categorical_as_numeric = True
 
@@ -151,12 +299,48 @@ class Dataset(ABC):
         return self.categorical_feature_mapping[feature]
 
     def __len__(self):
+        if self.is_view():
+            return len(self.indices)
         return len(self.x)
 
     @abstractmethod
     def compute_accuracy(self, y_pred):
         pass
 
+    def compute_grouped_accuracy(self, groups, group_predictions):
+        """
+        Computes the same accuracy as compute_accuracy for predictions that are shared by groups of examples, e.g. all
+        examples ending up in the same leaf of a decision tree. All (example, predicted label) pairs are checked at once.
+        :param groups: an int array assigning every example to a group
+        :param group_predictions: the predicted (index) label of every group, which can be a single label or tuple or
+                                  a list of them
+        """
+        self.check_loaded()
+        if any(group_predictions[group] is None for group in np.unique(groups)):
+            return None
+        predicted_labels = [list(make_set(prediction)) for prediction in group_predictions]
+        num_predicted = np.array([len(labels) for labels in predicted_labels], dtype=int)
+        flat_labels = np.array([label for labels in predicted_labels for label in labels])
+
+        counts = num_predicted[groups]
+        pair_examples = np.repeat(np.arange(len(groups)), counts)
+        position_in_group = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        first_label = np.cumsum(num_predicted) - num_predicted
+        pair_labels = flat_labels[np.repeat(first_label[groups], counts) + position_in_group]
+
+        correct = np.ones(len(groups), dtype=bool)
+        correct[pair_examples[~self.allows_labels(pair_examples, pair_labels)]] = False
+        return int(np.count_nonzero(correct)) / len(groups)
+
+    @abstractmethod
+    def allows_labels(self, examples, labels):
+        """
+        :param examples: the indices of the examples to check
+        :param labels: one (index) label or tuple per example
+        :returns: a boolean array indicating for every example whether its label is allowed
+        """
+        pass
+
     @abstractmethod
     def get_single_labels(self):
         """
@@ -209,7 +393,7 @@ class Dataset(ABC):
     @abstractmethod
     def from_mask(self, mask):
         """
-        Returns the subset given by the mask.
+        Returns the subset given by the mask as a view sharing the arrays of the root dataset.
         :param mask: a numpy array of 0s and 1s with len(mask) == num_examples
         """
         pass
@@ -227,17 +411,9 @@ class Dataset(ABC):
         """
         Computes unique labels of a 2d label array by mapping every unique inner array to an int. Returns the unique labels
         and the int mapping.
+        Inner arrays containing the same labels in a different order get the same int. The ints are assigned in the order
+        of first occurrence, starting with 1 as expected by OC1.
         """
-        l = []
-        int_to_label = {}
-        next_unused_int = 1  # OC1 expects labels starting with 1
-        label_str_to_int = {}
-        for i in range(len(labels)):
-            label_str = ','.join(sorted([str(i) for i in labels[i] if i != -1]))
-            if label_str not in label_str_to_int:
-                label_str_to_int[label_str] = next_unused_int
-                int_to_label[next_unused_int] = labels[i]
-                next_unused_int += 1
-            new_label = label_str_to_int[label_str]
-            l.append(new_label)
-        return np.array(l), int_to_label
+        first_occurrences, row_numbers = get_unique_rows(np.sort(labels, axis=1))
+        int_to_label = {i + 1: labels[first] for i, first in enumerate(first_occurrences)}
+        return row_numbers + 1, int_to_label
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from os.path import abspath, dirname, exists, getsize, isdir, join, split
+
+import numpy as np
+
+from dtcontrol.util import split_relevant_extension
+
+
+class DatasetCache:
+    """
+    Stores converted datasets, keyed on a hash of the contents of the input file and its _config.json.
+    Renaming, copying or touching an input file thus keeps its cache entry valid, while any change to its contents or
+    its config creates a new entry.
+
+    Arrays are stored uncompressed and loaded with mmap_mode='r', so that loading is fast and processes share the pages
+    of the same entry. The cached arrays are read-only.
+
+    If the total size of the cache exceeds max_size bytes, the least recently used entries are evicted.
+
+    The location and size can be configured with the environment variables DTCONTROL_CACHE_DIR and
+    DTCONTROL_CACHE_SIZE (in MB). By default, every input folder has its own cache in the subfolder .benchmark_suite.
+    """
+    FOLDER = '.benchmark_suite'
+    DEFAULT_MAX_SIZE = 4 * 1024 ** 3
+    HASH_INDEX = 'hashes.json'
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self, location=None, max_size=None):
+        """
+        :param location: the folder containing the cache; if None, the cache is kept next to every input file
+        :param max_size: the maximum total size of the cache in bytes
+        """
+        if location is None:
+            location = os.environ.get('DTCONTROL_CACHE_DIR')
+        if max_size is None:
+            max_size = int(float(os.environ['DTCONTROL_CACHE_SIZE']) * 1024 ** 2) \
+                if 'DTCONTROL_CACHE_SIZE' in os.environ else self.DEFAULT_MAX_SIZE
+        self.location = location
+        self.max_size = max_size
+
+    def get_location(self, filename):
+        if self.location is not None:
+            return self.location
+        return join(dirname(abspath(filename)), self.FOLDER)
+
+    def get_entry(self, filename, loader_name):
+        """
+        :returns: the folder of the entry for the given input file, which may not exist yet
+        """
+        location = self.get_location(filename)
+        hashes = self.load_hash_index(location)
+        known_hashes = dict(hashes)
+        digest = hashlib.sha256(loader_name.encode())
+        name, _ = split_relevant_extension(filename)
+        for file in [filename, name + '_config.json']:
+            if exists(file):
+                digest.update(self.get_file_hash(file, hashes).encode())
+        if hashes != known_hashes:
+            self.save_hash_index(location, hashes)
+        return join(location, f'{split(filename)[1]}_{digest.hexdigest()[:32]}')
+
+    def get_file_hash(self, filename, hashes):
+        # the hash of a file is only recomputed if its path, size or modification time changed
+        stat = os.stat(filename)
+        key = f'{abspath(filename)}|{stat.st_size}|{stat.st_mtime_ns}'
+        if key not in hashes:
+            for outdated in [k for k in hashes if k.startswith(abspath(filename) + '|')]:
+                del hashes[outdated]
+            digest = hashlib.sha256()
+            with open(filename, 'rb') as f:
+                for block in iter(lambda: f.read(self.BLOCK_SIZE), b''):
+                    digest.update(block)
+            hashes[key] = digest.hexdigest()
+        return hashes[key]
+
+    def load_hash_index(self, location):
+        try:
+            with open(join(location, self.HASH_INDEX)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_hash_index(self, location, hashes):
+        try:
+            os.makedirs(location, exist_ok=True)
+            self.write_atomically(join(location, self.HASH_INDEX), lambda f: f.write(json.dumps(hashes).encode()))
+        except OSError:
+            logging.warning(f'Could not write the hash index of the dataset cache at {location}.')
+
+    def load(self, entry):
+        """
+        :returns: x, x_metadata, y, y_metadata, index_to_actual of the entry or None if the entry does not exist
+        """
+        try:
+            x = np.load(join(entry, 'X_train.npy'), mmap_mode='r')
+            y = np.load(join(entry, 'Y_train.npy'), mmap_mode='r')
+            with open(join(entry, 'extra_data.pickle'), 'rb') as infile:
+                extra_data = pickle.load(infile)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+        # the modification time of an entry tracks its last use
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return x, extra_data["X_metadata"], y, extra_data["Y_metadata"], extra_data["index_to_value"]
+
+    def save(self, entry, x, x_metadata, y, y_metadata, index_to_actual):
+        location = dirname(entry)
+        os.makedirs(location, exist_ok=True)
+        # entries are written to a temporary folder first, so that concurrent processes never see partial entries
+        temporary = tempfile.mkdtemp(dir=location, prefix='.tmp_')
+        try:
+            np.save(join(temporary, 'X_train.npy'), x)
+            np.save(join(temporary, 'Y_train.npy'), y)
+            with open(join(temporary, 'extra_data.pickle'), 'wb+') as outfile:
+                pickle.dump({"index_to_value": index_to_actual,
+                             "X_metadata": x_metadata,
+                             "Y_metadata": y_metadata},
+                            outfile)
+            os.rename(temporary, entry)
+        except OSError:
+            # another process has created the entry in the meantime
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.evict(location, keep=entry)
+
+    def evict(self, location, keep=None):
+        """
+        Removes the least recently used entries until the cache is not larger than max_size.
+        """
+        entries = []
+        for name in os.listdir(location):
+            path = join(location, name)
+            if isdir(path) and not name.startswith('.tmp_') and exists(join(path, 'X_train.npy')):
+                size = sum(getsize(join(path, file)) for file in os.listdir(path))
+                entries.append((os.stat(path).st_mtime, size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if path != keep:
+                logging.info(f'Evicting {path} from the dataset cache.')
+                shutil.rmtree(path, ignore_errors=True)
+                total_size -= size
+
+    @staticmethod
+    def write_atomically(filename, write):
+        file_descriptor, temporary = tempfile.mkstemp(dir=dirname(filename), prefix='.tmp_')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                write(f)
+            os.replace(temporary, filename)
+        except OSError:
+            os.remove(temporary)
+            raise
@@ -1,20 +1,26 @@
 import json
 import logging
-import pickle
 from abc import ABC, abstractmethod
-from os import makedirs
-from os.path import getmtime, split, exists, join, isfile
-
-import numpy as np
+from os.path import exists, join, isfile
 
 import dtcontrol.util as util
+from dtcontrol.dataset.dataset_cache import DatasetCache
 from dtcontrol.util import is_int, split_relevant_extension
 
 
 class DatasetLoader(ABC):
+    # the cache of converted datasets, shared by all loaders
+    cache = DatasetCache()
+
     def __init__(self):
         self.loaded_datasets = {}
-        self.PATH = '.benchmark_suite'
+
+    @classmethod
+    def configure_cache(cls, location=None, max_size=None):
+        """
+        Sets the location and the maximum size (in bytes) of the cache of converted datasets. See DatasetCache.
+        """
+        cls.cache = DatasetCache(location, max_size)
 
     def load_dataset(self, filename):
         if filename not in self.loaded_datasets:
@@ -27,38 +33,27 @@ class DatasetLoader(ABC):
 
     def is_already_converted(self, filename):
         possible_path = self.get_converted_folder(filename)
-        return exists(possible_path)
+        return exists(join(possible_path, 'X_train.npy'))
 
     def load_converted_dataset(self, filename):
         folder = self.get_converted_folder(filename)
-        assert exists(folder)
         util.log_without_newline('Loading existing converted dataset...')
-        x = np.load(join(folder, 'X_train.npy'))
-        y = np.load(join(folder, 'Y_train.npy'))
-        with open(join(folder, 'extra_data.pickle'), 'rb') as infile:
-            extra_data = pickle.load(infile)
-            index_to_actual = extra_data["index_to_value"]
-            x_metadata = extra_data["X_metadata"]
-            y_metadata = extra_data["Y_metadata"]
+        converted = self.cache.load(folder)
+        if converted is None:
+            # the entry has been evicted in the meantime
+            converted = self.load_dataset_and_config(filename)
         logging.info(" Done.")
-        return x, x_metadata, y, y_metadata, index_to_actual
+        return converted
 
     def save_converted_dataset(self, filename):
         folder = self.get_converted_folder(filename)
-        if not exists(folder):
-            makedirs(folder)
-        x, x_metadata, y, y_metadata, index_to_actual = self.loaded_datasets[filename]
-        np.save(join(folder, 'X_train.npy'), x)
-        np.save(join(folder, 'Y_train.npy'), y)
-        with open(join(folder, 'extra_data.pickle'), 'wb+') as outfile:
-            pickle.dump({"index_to_value": index_to_actual,
-                         "X_metadata": x_metadata,
-                         "Y_metadata": y_metadata},
-                        outfile)
+        try:
+            self.cache.save(folder, *self.loaded_datasets[filename])
+        except OSError:
+            logging.warning(f'Could not save the converted dataset to {folder}.')
 
     def get_converted_folder(self, filename):
-        directory, name = split(filename)
-        return join(directory, self.PATH, f'{name}_{getmtime(filename)}')
+        return self.cache.get_entry(filename, type(self).__name__)
 
     def load_dataset_and_config(self, filename):
         tup = self._load_dataset(filename)
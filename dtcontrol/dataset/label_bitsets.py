@@ -0,0 +1,124 @@
+"""
+A packed representation of non-deterministic labels. Instead of an int array padded with -1, the allowed labels of an
+example are stored as a bitset of uint64 words: bit (l % 64) of word (l // 64) is set if and only if label l is allowed.
+
+e.g.
+[[1  2 -1],           [[0b110],
+ [3 -1 -1],    <-->    [0b1000],
+ [2  3  1]]            [0b1110]]
+
+The labels of a row must be distinct. For multi-output labels of shape (num_outputs, num_examples, k), every output
+gets its own bitsets of shape (num_outputs, num_examples, num_words).
+"""
+import numpy as np
+
+WORD_SIZE = 64
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+# BIT_TABLE[v, b] is bit b of the byte value v
+BIT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1, bitorder='little').astype(np.int64)
+
+
+def get_num_words(num_labels):
+    """
+    :returns: the number of words needed for the labels 0, ..., num_labels - 1 (at least one)
+    """
+    return max((num_labels + WORD_SIZE - 1) // WORD_SIZE, 1)
+
+
+def to_bitsets(labels, num_labels=None):
+    """
+    :param labels: an int array of shape (..., k) padded with -1
+    :param num_labels: the number of possible labels 0, ..., num_labels - 1; by default the largest label + 1
+    :returns: a uint64 array of shape (..., num_words)
+    """
+    labels = np.asarray(labels)
+    if num_labels is None:
+        num_labels = int(labels.max(initial=-1)) + 1
+    bitsets = np.zeros(labels.shape[:-1] + (get_num_words(num_labels),), dtype=np.uint64)
+    flat_bitsets = bitsets.reshape(-1, bitsets.shape[-1])
+    flat_labels = labels.reshape(-1, labels.shape[-1])
+    # every row appears at most once per column, so the in-place updates of a column do not collide
+    for column in flat_labels.T:
+        rows = np.flatnonzero(column != -1)
+        values = column[rows].astype(np.uint64)
+        words = (values // np.uint64(WORD_SIZE)).astype(np.intp)
+        flat_bitsets[rows, words] |= np.left_shift(np.uint64(1), values % np.uint64(WORD_SIZE))
+    return bitsets
+
+
+def unpack(bitsets):
+    """
+    :returns: a uint8 array of shape (..., num_words * 64) containing the bits of the bitsets
+    """
+    bitsets = np.asarray(bitsets, dtype=np.uint64)
+    # little-endian bytes, so that bit l of the unpacked array is label l on every platform
+    as_bytes = bitsets.astype('<u8').view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, bitorder='little')
+
+
+def from_bitsets(bitsets, width=None):
+    """
+    Converts bitsets back to the padded layout.
+    :param bitsets: a uint64 array of shape (..., num_words)
+    :param width: the number of columns of the result; by default the largest number of labels of a bitset
+    :returns: an int array of shape (..., width) containing the labels of every bitset in increasing order, padded
+              with -1
+    """
+    bitsets = np.asarray(bitsets, dtype=np.uint64)
+    flat_bits = unpack(bitsets).reshape(-1, bitsets.shape[-1] * WORD_SIZE)
+    counts = flat_bits.sum(axis=1, dtype=np.int64)
+    if width is None:
+        width = int(counts.max(initial=0))
+    elif counts.max(initial=0) > width:
+        raise ValueError(f'A bitset contains more than {width} labels.')
+    rows, labels = np.nonzero(flat_bits)  # row by row, in increasing order of the labels
+    positions = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    result = np.full((len(flat_bits), width), -1, dtype=np.int64)
+    result[rows, positions] = labels
+    return result.reshape(bitsets.shape[:-1] + (width,))
+
+
+def popcount(bitsets):
+    """
+    :returns: an int array of shape (...) containing the number of labels of every bitset of shape (..., num_words)
+    """
+    bitsets = np.asarray(bitsets, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(bitsets).sum(axis=-1, dtype=np.int64)
+    as_bytes = bitsets.astype('<u8').view(np.uint8)
+    return POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def count_labels(bitsets, num_labels=None):
+    """
+    Counts how many bitsets contain every label, like np.bincount on the flattened padded labels without the fillers.
+    Instead of unpacking all bits, the bytes at every position are counted by value, and BIT_TABLE turns the 256
+    counts into the counts of the 8 labels of the byte. Only the bytes of the first num_labels labels are read.
+    :param bitsets: a uint64 array of shape (num_examples, num_words)
+    :param num_labels: the length of the result; by default num_words * 64
+    :returns: an int array containing the count of every label
+    """
+    bitsets = np.ascontiguousarray(bitsets, dtype=np.uint64)
+    as_bytes = bitsets.astype('<u8', copy=False).view(np.uint8).reshape(len(bitsets), -1)
+    if num_labels is None:
+        num_labels = as_bytes.shape[1] * 8
+    num_bytes = min((num_labels + 7) // 8, as_bytes.shape[1])
+    counts = np.zeros(max(num_bytes * 8, num_labels), dtype=np.int64)
+    for i in range(num_bytes):
+        counts[i * 8:(i + 1) * 8] = np.bincount(as_bytes[:, i], minlength=256) @ BIT_TABLE
+    return counts[:num_labels]
+
+
+def intersect(bitsets):
+    """
+    :param bitsets: a uint64 array of shape (num_examples, num_words) with num_examples > 0
+    :returns: the bitset of the labels allowed by all examples
+    """
+    return np.bitwise_and.reduce(np.asarray(bitsets, dtype=np.uint64), axis=0)
+
+
+def get_labels(bitset):
+    """
+    :returns: the labels of a single bitset of shape (num_words,) in increasing order
+    """
+    return np.flatnonzero(unpack(bitset))
@@ -1,7 +1,7 @@
 import numpy as np
 
 from dtcontrol.dataset.dataset import Dataset
-from dtcontrol.util import make_set
+from dtcontrol.util import get_unique_rows, make_set
 
 class MultiOutputDataset(Dataset):
     def __init__(self, filename):
@@ -27,6 +27,9 @@ class MultiOutputDataset(Dataset):
                 num_correct += 1
         return num_correct / len(y_pred)
 
+    def allows_labels(self, examples, labels):
+        return np.any(np.all(self.get_tuples()[examples] == labels[:, np.newaxis, :], axis=2), axis=1)
+
     def get_tuples(self):
         """
             [[[ 0, -1, -1],
@@ -58,7 +61,10 @@ class MultiOutputDataset(Dataset):
               [ 0  0]]]
         """
         if self.tuples is None:
-            self.tuples = np.stack(self.y, axis=2)
+            if self.is_view() and self.root.tuples is not None:
+                self.tuples = self.root.tuples[self.indices]
+            else:
+                self.tuples = np.stack(self.y, axis=2)
         return self.tuples
 
     def get_single_labels(self):
@@ -95,28 +101,32 @@ class MultiOutputDataset(Dataset):
         if self.tuple_ids is not None:
             return self.tuple_ids
 
+        if self.is_view():
+            self.tuple_ids = self.root.get_tuple_ids()[self.indices]
+            self.tuple_to_tuple_id = self.root.tuple_to_tuple_id
+            self.tuple_id_to_tuple = self.root.tuple_id_to_tuple
+            return self.tuple_ids
+
         stacked_y_train = self.get_tuples()
+        num_examples, num_labels, num_outputs = stacked_y_train.shape
 
         # default
-        tuple_to_index = {tuple(-1 for i in range(stacked_y_train.shape[2])): -1}
-
-        self.tuple_ids = np.full((stacked_y_train.shape[0], stacked_y_train.shape[1]), -1)
+        tuple_to_index = {tuple(-1 for i in range(num_outputs)): -1}
 
         # first axis: datapoints
         # second axis: non-det
         # third axis: control inputs
-        i = 0
-        for datapoint in stacked_y_train:
-            j = 0
-            for action in datapoint:
-                action_tuple = tuple(action)
-                if action_tuple not in tuple_to_index.keys():
-                    # indexing from 1
-                    tuple_to_index[action_tuple] = len(tuple_to_index) + 1
-                self.tuple_ids[i][j] = tuple_to_index[action_tuple]
-                j += 1
-            i += 1
-
+        # tuples are numbered in the order of their first occurrence, the first one getting id 2
+        actions = stacked_y_train.reshape(-1, num_outputs)
+        first_occurrences, action_numbers = get_unique_rows(actions)
+        unique_tuples = actions[first_occurrences]
+        is_default = np.all(unique_tuples == -1, axis=1)
+        ids = np.full(len(unique_tuples), -1)
+        ids[~is_default] = np.arange(2, np.count_nonzero(~is_default) + 2)
+        for unique_tuple in unique_tuples[~is_default]:
+            tuple_to_index[tuple(unique_tuple)] = len(tuple_to_index) + 1
+
+        self.tuple_ids = ids[action_numbers].reshape(num_examples, num_labels)
         self.tuple_to_tuple_id = tuple_to_index
         self.tuple_id_to_tuple = {y: x for (x, y) in tuple_to_index.items()}
         return self.tuple_ids
@@ -128,7 +138,12 @@ class MultiOutputDataset(Dataset):
 
     def get_unique_labels(self):
         if self.unique_labels is None:
-            self.unique_labels, self.list_id_to_list = self.get_unique_labels_from_2d(self.get_tuple_ids())
+            if self.is_view():
+                self.get_tuple_ids()
+                self.unique_labels = self.root.get_unique_labels()[self.indices]
+                self.list_id_to_list = self.root.list_id_to_list
+            else:
+                self.unique_labels, self.list_id_to_list = self.get_unique_labels_from_2d(self.get_tuple_ids())
         return self.unique_labels
 
     def map_unique_label_back(self, label):
@@ -140,21 +155,19 @@ class MultiOutputDataset(Dataset):
 
     def from_mask(self, mask):
         subset = MultiOutputDataset(self.filename)
-        subset.copy_from_other_dataset(self)
-        subset.parent_mask = mask
-        subset.x = self.x[mask]
-        subset.y = self.y[:, mask, :]
-        if self.tuple_ids is not None:
-            subset.tuple_ids = self.tuple_ids[mask]
-            subset.tuple_id_to_tuple = self.tuple_id_to_tuple
-            subset.tuple_to_tuple_id = self.tuple_to_tuple_id
-        if self.unique_labels is not None:
-            subset.unique_labels = self.unique_labels[mask]
-            subset.list_id_to_list = self.list_id_to_list
-        if self.tuples is not None:
-            subset.tuples = self.tuples[mask]
+        subset.init_view(self, mask)
         return subset
 
+    def select_examples_of_y(self, y):
+        return y[:, self.indices]
+
+    def release_materialized_arrays(self):
+        if self.is_view():
+            super().release_materialized_arrays()
+            self.tuple_ids = None
+            self.unique_labels = None
+            self.tuples = None
+
     def from_mask_optimized(self, mask):
         empty_object = type('', (), {})()
         empty_object.parent_mask = mask
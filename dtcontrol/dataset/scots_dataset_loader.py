@@ -1,4 +1,5 @@
 import logging
+import mmap
 
 import numpy as np
 from tqdm import tqdm
@@ -6,10 +7,12 @@ from tqdm import tqdm
 from dtcontrol.dataset.dataset_loader import DatasetLoader
 
 class ScotsDatasetLoader(DatasetLoader):
+    CHUNK_SIZE = 1 << 24  # bytes of the controller that are tokenized at once
+
     def _load_dataset(self, filename):
         precision = 10
 
-        with open(filename) as f:
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as f:
             logging.info(f"Reading from {filename}")
 
             for i in range(5):
@@ -82,12 +85,9 @@ class ScotsDatasetLoader(DatasetLoader):
             for i in range(4):
                 f.readline()
 
-            dim_str = f.readline().split(":")[1]
+            dim_str = f.readline().split(b":")[1]
             rows, max_non_det = list(map(int, dim_str.split()))
 
-            # Controller starts now
-            controller_start = 32 + 3 * (state_dim + input_dim)
-
             x_nn = [1]
             for i in range(1, state_dim):
                 x_nn.append(x_nn[i - 1] * n_state_grid[i - 1])
@@ -96,86 +96,115 @@ class ScotsDatasetLoader(DatasetLoader):
             for i in range(1, input_dim):
                 u_nn.append(u_nn[i - 1] * n_input_grid[i - 1])
 
-            # Get the number of lines describing the controller
-            controller_lines = sum(1 for line in f) - 1
-
-            x = np.empty((controller_lines, state_dim), dtype=np.float32)
-            y = np.full((input_dim, controller_lines, max_non_det), -1, dtype=np.int32)
-
-            f.seek(0)
-
-            float_to_unique_label = dict()
-
-            for i in range(controller_start):
-                f.readline()
+            # Controller starts now and ends before the last line
+            controller_start = f.tell()
+            controller_end = f.rfind(b'\n', controller_start, len(f) - 1 if f[-1:] == b'\n' else len(f)) + 1
+            controller_end = max(controller_start, controller_end)
 
             logging.info("Extracting states and control inputs from SCOTS dump")
-            for i, line in enumerate(tqdm(f, total=controller_lines)):
-                if i == controller_lines:
-                    break
-                idxu = np.fromstring(line, dtype=np.int32, sep=' ')
-                idx = idxu[0]
-
-                k = state_dim - 1
-                x2 = np.zeros(state_dim)
-                while k > 0:
-                    num = int(idx / x_nn[k])  # j
-                    idx = idx % x_nn[k]  # i
-                    x2[k] = state_lb[k] + num * state_eta[k]
-                    k = k - 1
-                num = idx
-                x2[0] = state_lb[0] + num * state_eta[0]
-
-                x[i] = x2
-
-                # creating input variables
-                u_idx = np.empty(input_dim, dtype=np.int16)
-                for j in range(1, idxu.shape[0]):
-                    idu = idxu[j]
-                    kk = input_dim - 1
-                    u = np.empty(input_dim, dtype=np.float32)
-                    while kk > 0:
-                        u_idx[kk] = int(idu / u_nn[kk])
-                        idu = idu % u_nn[kk]
-                        u[kk] = input_lb[kk] + u_idx[kk] * input_eta[kk]
-                        if u[kk] not in float_to_unique_label.keys():
-                            float_to_unique_label[u[kk]] = len(float_to_unique_label) + 1
-                        y[kk][i][j - 1] = float_to_unique_label[u[kk]]
-                        kk = kk - 1
-                    u_idx[0] = idu
-                    u[0] = input_lb[0] + u_idx[0] * input_eta[0]
-                    if u[0] not in float_to_unique_label.keys():
-                        float_to_unique_label[u[0]] = len(float_to_unique_label) + 1
-                    y[0][i][j - 1] = float_to_unique_label[u[0]]
-
-            # inverse map
-            unique_label_to_float = {y: x for (x, y) in float_to_unique_label.items()}
-
-            # if only single control input, do not wrap it in another array
-            if y.shape[0] == 1:
-                y = y[0]
-
-            logging.info("Constructed training set with %s datapoints" % x.shape[0])
-
-            # construct metadata
-            x_metadata = dict()
-            x_metadata["categorical"] = []
-
-            # The safe set
-            x_metadata["min_outer"] = state_lb
-            x_metadata["max_outer"] = state_ub
-
-            # Compute the invariant set (which is the domain of the controller)
-            x_metadata["min_inner"] = [float(i) for i in np.amin(x, axis=0)]
-            x_metadata["max_inner"] = [float(i) for i in np.amax(x, axis=0)]
-            x_metadata["step_size"] = state_eta
-
-            y_metadata = dict()
-            y_metadata["variables"] = [f"u_{i}" for i in range(len(input_lb))]
-            # y_metadata["min"] = input_lb
-            # y_metadata["max"] = input_ub
-            y_metadata["min"] = [min(unique_label_to_float.values())]
-            y_metadata["max"] = [max(unique_label_to_float.values())]
-            y_metadata["step_size"] = input_eta
-
-            return (x, x_metadata, y, y_metadata, unique_label_to_float)
+            state_indices, input_indices, input_rows, input_choices = \
+                self._parse_controller(f, controller_start, controller_end)
+
+        x = np.empty((len(state_indices), state_dim), dtype=np.float32)
+        idx = state_indices
+        for k in range(state_dim - 1, 0, -1):
+            num, idx = np.divmod(idx, x_nn[k])
+            x[:, k] = state_lb[k] + num * state_eta[k]
+        x[:, 0] = state_lb[0] + idx * state_eta[0]
+
+        # creating input variables
+        u = np.empty((len(input_indices), input_dim), dtype=np.float32)
+        idu = input_indices
+        for kk in range(input_dim - 1, 0, -1):
+            u_idx, idu = np.divmod(idu, u_nn[kk])
+            u[:, kk] = input_lb[kk] + u_idx * input_eta[kk]
+        u[:, 0] = input_lb[0] + idu * input_eta[0]
+
+        # labels are numbered in the order in which the values are encountered, going through the inputs backwards
+        values, first_occurrences, inverse = np.unique(u[:, ::-1], return_index=True, return_inverse=True)
+        order = np.argsort(first_occurrences)
+        value_to_label = np.empty(len(values), dtype=np.int32)
+        value_to_label[order] = np.arange(1, len(values) + 1)
+        labels = value_to_label[inverse.reshape(-1)].reshape(len(u), input_dim)[:, ::-1]
+
+        y = np.full((input_dim, len(x), max_non_det), -1, dtype=np.int32)
+        for kk in range(input_dim):
+            y[kk, input_rows, input_choices] = labels[:, kk]
+
+        # inverse map
+        flat_u = u[:, ::-1].reshape(-1)
+        unique_label_to_float = {i + 1: flat_u[first] for i, first in enumerate(first_occurrences[order])}
+
+        # if only single control input, do not wrap it in another array
+        if y.shape[0] == 1:
+            y = y[0]
+
+        logging.info("Constructed training set with %s datapoints" % x.shape[0])
+
+        # construct metadata
+        x_metadata = dict()
+        x_metadata["categorical"] = []
+
+        # The safe set
+        x_metadata["min_outer"] = state_lb
+        x_metadata["max_outer"] = state_ub
+
+        # Compute the invariant set (which is the domain of the controller)
+        x_metadata["min_inner"] = [float(i) for i in np.amin(x, axis=0)]
+        x_metadata["max_inner"] = [float(i) for i in np.amax(x, axis=0)]
+        x_metadata["step_size"] = state_eta
+
+        y_metadata = dict()
+        y_metadata["variables"] = [f"u_{i}" for i in range(len(input_lb))]
+        # y_metadata["min"] = input_lb
+        # y_metadata["max"] = input_ub
+        y_metadata["min"] = [min(unique_label_to_float.values())]
+        y_metadata["max"] = [max(unique_label_to_float.values())]
+        y_metadata["step_size"] = input_eta
+
+        return (x, x_metadata, y, y_metadata, unique_label_to_float)
+
+    def _parse_controller(self, f, start, end):
+        """
+        Tokenizes the controller lines "state_index input_index input_index ..." between the byte offsets start and end
+        in large chunks.
+        :returns: the state index of every line, and for all input indices (in the order of the file) the index itself,
+                  the line it occurs in and its position among the inputs of that line
+        """
+        state_indices, input_indices, input_rows, input_choices = [], [], [], []
+        num_rows = 0
+        with tqdm(total=end - start, unit='B', unit_scale=True) as progress:
+            while start < end:
+                chunk_end = f.rfind(b'\n', start, min(start + self.CHUNK_SIZE, end)) + 1
+                if chunk_end <= start:
+                    # a single line longer than the chunk size
+                    chunk_end = f.find(b'\n', start, end) + 1 or end
+                chunk = f[start:chunk_end]
+                progress.update(chunk_end - start)
+                start = chunk_end
+
+                tokens = np.fromstring(chunk, dtype=np.int64, sep=' ')
+                chars = np.frombuffer(chunk, dtype=np.uint8)
+                is_space = chars <= ord(' ')
+                token_starts = np.flatnonzero(~is_space & np.concatenate(([True], is_space[:-1])))
+                line_ends = np.flatnonzero(chars == ord('\n'))
+                if len(line_ends) == 0 or line_ends[-1] < len(chars) - 1:
+                    line_ends = np.append(line_ends, len(chars))
+                tokens_per_line = np.bincount(np.searchsorted(line_ends, token_starts), minlength=len(line_ends))
+                if len(tokens) != len(token_starts) or np.any(tokens_per_line == 0):
+                    raise ValueError('Could not parse the controller of the SCOTS file.')
+
+                line_starts = np.cumsum(tokens_per_line) - tokens_per_line
+                is_input = np.ones(len(tokens), dtype=bool)
+                is_input[line_starts] = False
+                inputs_per_line = tokens_per_line - 1
+                state_indices.append(tokens[line_starts])
+                input_indices.append(tokens[is_input])
+                input_rows.append(num_rows + np.repeat(np.arange(len(line_ends)), inputs_per_line))
+                input_choices.append(np.arange(len(tokens) - len(line_ends)) -
+                                     np.repeat(np.cumsum(inputs_per_line) - inputs_per_line, inputs_per_line))
+                num_rows += len(line_ends)
+
+        if num_rows == 0:
+            return (np.empty(0, dtype=np.int64),) * 4
+        return tuple(np.concatenate(parts) for parts in [state_indices, input_indices, input_rows, input_choices])
@@ -1,3 +1,5 @@
+import numpy as np
+
 from dtcontrol.dataset.dataset import Dataset
 from dtcontrol.util import make_set
 
@@ -18,6 +20,9 @@ class SingleOutputDataset(Dataset):
                 num_correct += 1
         return num_correct / len(y_pred)
 
+    def allows_labels(self, examples, labels):
+        return np.any(self.y[examples] == labels[:, np.newaxis], axis=1)
+
     def get_single_labels(self):
         return self.y
 
@@ -38,7 +43,11 @@ class SingleOutputDataset(Dataset):
         unique_mapping = {1: [1 2 3 -1 -1], 2: [1 -1 -1 -1 -1], 3: [1 2 -1 -1 -1]}
         """
         if self.unique_labels is None:
-            self.unique_labels, self.unique_mapping = self.get_unique_labels_from_2d(self.y)
+            if self.is_view():
+                self.unique_labels = self.root.get_unique_labels()[self.indices]
+                self.unique_mapping = self.root.unique_mapping
+            else:
+                self.unique_labels, self.unique_mapping = self.get_unique_labels_from_2d(self.y)
         return self.unique_labels
 
     def map_unique_label_back(self, label):
@@ -46,15 +55,14 @@ class SingleOutputDataset(Dataset):
 
     def from_mask(self, mask):
         subset = SingleOutputDataset(self.filename)
-        subset.copy_from_other_dataset(self)
-        subset.parent_mask = mask
-        subset.x = self.x[mask]
-        subset.y = self.y[mask]
-        if self.unique_labels is not None:
-            subset.unique_labels = self.unique_labels[mask]
-            subset.unique_mapping = self.unique_mapping
+        subset.init_view(self, mask)
         return subset
 
+    def release_materialized_arrays(self):
+        if self.is_view():
+            super().release_materialized_arrays()
+            self.unique_labels = None
+
     def from_mask_optimized(self, mask):
         empty_object = type('', (), {})()
         empty_object.parent_mask = mask
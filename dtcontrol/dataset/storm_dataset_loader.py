@@ -1,11 +1,15 @@
 import json
 import logging
+import re
+from array import array
 from os.path import splitext, exists
 
 import numpy as np
 
 from dtcontrol.dataset.dataset_loader import DatasetLoader
 
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
 
 class StormDatasetLoader(DatasetLoader):
     '''
@@ -16,12 +20,11 @@ class StormDatasetLoader(DatasetLoader):
     def _load_dataset(self, filename):
         logging.info(f"Reading from {filename}")
 
-        file = open(filename)
-        json_file = json.loads(file.read())
-
         x_variables = None
-        x_list = []
-        y_list = []
+        x_values = array('q')  # the state values of all entries, concatenated; becomes array('d') for float values
+        only_bools = True
+        y_values = array('q')  # the choices of all entries, concatenated
+        y_ends = array('q', [0])
 
         # Stores mapping from action index to action string
         index_to_choice = dict()
@@ -30,57 +33,72 @@ class StormDatasetLoader(DatasetLoader):
         new_action_index = 0
         new_long_action = 0
 
-        for entry in json_file:
-            # Add choices
-            y_current = []
-            for non_deterministic_choice in entry["c"]:
-                if "origin" not in non_deterministic_choice:
-                    '''
-                    a) There is no commandset/edgeset enabled. In this case Storm adds a self-loop to the deadlock 
-                       state in order to get a valid MDP.
-                    b) There is no need to continue state-space exploration in order to check the provided property 
-                       (e.g. we do not need to explore the successors of a target state if we only want to check a 
-                       single reachability formula). Again, Storm just adds a single self loop choice in order to 
-                       get a valid MDP.
-                    '''
-                    choice_string = ":loop:"
-                    break
-                # elif "action-label" in non_deterministic_choice["origin"] and non_deterministic_choice["origin"]["action-label"]:
-                #     choice_string = non_deterministic_choice["origin"]["action-label"]
-                else:
-                    if json.dumps(non_deterministic_choice["origin"], ensure_ascii=False) not in long_action:
-                        long_action[json.dumps(non_deterministic_choice["origin"], ensure_ascii=False)] = new_long_action
-                        new_long_action = new_long_action + 1
-                    if "action-label" in non_deterministic_choice["origin"] and non_deterministic_choice["origin"]["action-label"]:
-                        choice_string_prefix = non_deterministic_choice["origin"]["action-label"]
+        with open(filename, encoding='utf-8') as file:
+            for entry in self.iterate_entries(file):
+                # Add choices
+                y_current = []
+                for non_deterministic_choice in entry["c"]:
+                    if "origin" not in non_deterministic_choice:
+                        '''
+                        a) There is no commandset/edgeset enabled. In this case Storm adds a self-loop to the deadlock 
+                           state in order to get a valid MDP.
+                        b) There is no need to continue state-space exploration in order to check the provided property 
+                           (e.g. we do not need to explore the successors of a target state if we only want to check a 
+                           single reachability formula). Again, Storm just adds a single self loop choice in order to 
+                           get a valid MDP.
+                        '''
+                        choice_string = ":loop:"
+                        break
                     else:
-                        choice_string_prefix = "act"
-                    choice_string = f'{choice_string_prefix}{long_action[json.dumps(non_deterministic_choice["origin"], ensure_ascii=False)]}'
-
-                if choice_string not in choice_to_index:
-                    index_to_choice[new_action_index] = choice_string
-                    choice_to_index[choice_string] = new_action_index
-                    new_action_index = new_action_index + 1
-
-                index = choice_to_index[choice_string]
-                y_current.append(index+1)
-
-            if ":loop:" in choice_string:
-                continue
-
-            y_list.append(y_current)
-
-            # Add state
-            state = entry["s"]
-            if not x_variables:
-                x_variables = list(state.keys())
-
-            x_list.append(list(state.values()))
-
-        x = np.array(x_list)
-        y = np.full((len(y_list), max([len(e) for e in y_list])), -1, dtype=np.int16)
-        for i, row in enumerate(y_list):
-            y[i][0:len(row)] = np.array(row)
+                        origin = non_deterministic_choice["origin"]
+                        # for parsed JSON, repr distinguishes the same origins as json.dumps, but is a lot cheaper
+                        origin_key = repr(origin)
+                        if origin_key not in long_action:
+                            long_action[origin_key] = new_long_action
+                            new_long_action = new_long_action + 1
+                        if "action-label" in origin and origin["action-label"]:
+                            choice_string_prefix = origin["action-label"]
+                        else:
+                            choice_string_prefix = "act"
+                        choice_string = f'{choice_string_prefix}{long_action[origin_key]}'
+
+                    if choice_string not in choice_to_index:
+                        index_to_choice[new_action_index] = choice_string
+                        choice_to_index[choice_string] = new_action_index
+                        new_action_index = new_action_index + 1
+
+                    index = choice_to_index[choice_string]
+                    y_current.append(index+1)
+
+                if ":loop:" in choice_string:
+                    continue
+
+                y_values.extend(y_current)
+                y_ends.append(len(y_values))
+
+                # Add state
+                state = entry["s"]
+                if not x_variables:
+                    x_variables = list(state.keys())
+                if len(state) != len(x_variables):
+                    raise ValueError(f"The state variables of {filename} differ between states.")
+
+                values = list(state.values())
+                value_types = set(map(type, values))
+                if x_values.typecode == 'q' and float in value_types:
+                    x_values = array('d', x_values)
+                only_bools = only_bools and value_types == {bool}
+                x_values.extend(values)
+
+        x = np.frombuffer(x_values, dtype=np.int64 if x_values.typecode == 'q' else np.float64)
+        x = x.reshape(len(y_ends) - 1, len(x_variables) if x_variables else 0)
+        if only_bools:
+            x = x.astype(bool)
+        y_ends = np.frombuffer(y_ends, dtype=np.int64)
+        num_choices = np.diff(y_ends)
+        y = np.full((len(num_choices), num_choices.max()), -1, dtype=np.int16)
+        y[np.repeat(np.arange(len(num_choices)), num_choices),
+          np.arange(len(y_values)) - np.repeat(y_ends[:-1], num_choices)] = np.frombuffer(y_values, dtype=np.int64)
 
         x_metadata = dict()
         x_metadata["variables"] = x_variables
@@ -102,3 +120,49 @@ class StormDatasetLoader(DatasetLoader):
         logging.debug(y_metadata)
 
         return (x, x_metadata, y, y_metadata, index_to_actual)
+
+    @staticmethod
+    def iterate_entries(file, buffer_size=1 << 20):
+        """
+        Parses the entries of the top-level JSON array one at a time, reading the file in blocks. The whole file is
+        never held in memory.
+        """
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+
+        def next_char():
+            # skips whitespace and returns the next character, reading more of the file if necessary
+            nonlocal buffer, position
+            while True:
+                position = WHITESPACE.match(buffer, position).end()
+                if position < len(buffer):
+                    return buffer[position]
+                buffer, position = file.read(buffer_size), 0
+                if not buffer:
+                    raise ValueError('Unexpected end of the Storm scheduler.')
+
+        if next_char() != '[':
+            raise ValueError('The Storm scheduler has to be a JSON array.')
+        position += 1
+        if next_char() == ']':
+            return
+        while True:
+            next_char()
+            try:
+                entry, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the entry is not completely in the buffer yet
+                more = file.read(max(buffer_size, len(buffer) - position))
+                if not more:
+                    raise
+                buffer, position = buffer[position:] + more, 0
+                continue
+            yield entry
+            position = end
+            separator = next_char()
+            position += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f'Unexpected {separator!r} in the Storm scheduler.')
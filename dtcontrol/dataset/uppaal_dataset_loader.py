@@ -1,13 +1,21 @@
 import logging
 import re
+from array import array
+from os.path import getsize
 
 import numpy as np
-import pandas as pd
 from tqdm import tqdm
 
 from dtcontrol.dataset.dataset_loader import DatasetLoader
 
 class UppaalDatasetLoader(DatasetLoader):
+    STATE_VARIABLE = re.compile(r'(\w+)=-?[0-9]+')
+    STATE_VALUE = re.compile(r'\w+=(-?[0-9]+)')
+    ASSIGNMENT = re.compile(r'((\w+) := (-?[0-9]+))')
+    TRANSITION = ' take transition '
+    HEADER_LINES = 7
+    BUFFER_SIZE = 1 << 20  # approximate number of characters read at once
+
     def _load_dataset(self, filename):
         """
             Some assumptions regarding the Uppaal dataset
@@ -17,138 +25,187 @@ class UppaalDatasetLoader(DatasetLoader):
                may have the .Choose state, they are added as categorical variables
                in x
             4. Step sizes for all state variables is 1
-        """
 
-        with open(filename) as f:
+            The dump is read in a single pass. Controllable components and actions are numbered in the order of their
+            first occurrence.
+        """
+        numeric_features = []
+        controllable_states = {}  # maps every component in a .Choose state to its column
+        actions = {}  # maps every action taking a .Choose transition to its index
+        state_components = {}  # maps the tuple of .Choose components of a state line to an id
+        state_heads = {}  # caches the (controllable, id) of the component part "State: ( ... )" of state lines
+
+        # one entry per state-action row, collected in growable typed arrays
+        row_components = array('q')
+        row_num_vals = array('q')
+        row_actions = array('q')
+        row_action_ends = array('q', [0])
+
+        ignore_current = False
+        current_actions = []
+        components = numeric_vals = None
+        total_rows = 0
+
+        with open(filename) as f, tqdm(total=getsize(filename), unit='B', unit_scale=True) as progress:
             logging.info("Reading from %s" % filename)
-
-            action_set = set()
-            controllable_state_set = set()
-
-            num_lines = sum(1 for line in f)
-
-            f.seek(0)
-
-            logging.info("Extracting actions and controllable components from UPPPAL dump")
-            for i, line in enumerate(tqdm(f, total=num_lines)):
-                if i == 1:
-                    # Extract numeric features
-                    numeric_features = re.findall(r'(\w+)=-?[0-9]+', line)
-
-                # Extract actions and controllable components
-                if line.startswith('State: '):
-                    ctrl = [word for word in line.split() if "Choose" in word]
-                    if ctrl:
-                        controllable_state_set.update(ctrl)
-                if line.startswith('When'):
-                    action_set.add(line[line.index(' take transition ') + 17:].rstrip())
-
-            action_set = {action for action in action_set if "Choose" in action}
-            actions = dict(zip(list(action_set), range(1, len(action_set) + 1)))
-            controllable_states = list(controllable_state_set)
-
-            # Figure out the assignments in each action and extract
-            # the assigned value. The assigned variable is extracted
-            # too, but not used anywhere as of now.
-            index_to_actual = dict()
-            action_var = None
-            for (action, index) in actions.items():
-                _, action_var, val = re.findall(r"((\w+) := (-?[0-9]+))", action)[0]
-                index_to_actual[index] = int(val)
-
-            row_num_vals = []
-            row_actions = []
-
-            ignore_current = False
-            current_actions = []
-            total_rows = 0
-            total_state_actions = 0
-
-            f.seek(0)
-
-            for i in range(7):
-                f.readline()
-
             logging.info("Extracting state-action pairs from UPPAAL dump")
-            for i, line in enumerate(tqdm(f, total=num_lines)):
-                if line.startswith("State:"):
-                    # find if the state is controllable, and if so, then make that position 1 in categorical vals
-                    controllable = False
-                    cat_vals = [0 for i in range(len(controllable_states))]
-                    for i in range(len(controllable_states)):
-                        if controllable_states[i] in line:
-                            cat_vals[i] = 1
-                            controllable = True
-                    if not controllable:
-                        ignore_current = True
+            line_number = 0
+            for lines in iter(lambda: f.readlines(self.BUFFER_SIZE), []):
+                progress.update(sum(map(len, lines)))
+                for line in lines:
+                    line_number += 1
+                    if line_number <= self.HEADER_LINES:
+                        # the header is only searched for features, actions and controllable components
+                        if line_number == 2:
+                            numeric_features = self.STATE_VARIABLE.findall(line)
+                        if line.startswith('State:'):
+                            self.parse_state_head(line, state_heads, state_components, controllable_states)
+                        elif line.startswith('When'):
+                            self.parse_action(line, actions)
                         continue
-                    else:
+
+                    first = line[0]
+                    if first == 'S' and line.startswith('State:'):
+                        # a state is controllable if one of the components is in a .Choose state
+                        controllable, state = self.parse_state_head(line, state_heads, state_components,
+                                                                    controllable_states)
+                        if not controllable:
+                            ignore_current = True
+                            continue
                         ignore_current = False
-                        numeric_vals = [word.split("=")[1] for word in line.split() if "=" in word]
-                elif ignore_current:
-                    continue
-                elif line.startswith("When"):
-                    action_str = line[line.index(' take transition ') + 17:].rstrip()
-                    current_actions.append(actions[action_str])
-                elif line.startswith("While"):
-                    # We implicityly assume that transitions starting with 'While' are mapped to wait.
-                    ignore_current = True
-                elif line.strip() == "":
-                    if not ignore_current:
-                        row_num_vals.append(cat_vals + numeric_vals)
-                        row_actions.append(current_actions)
+                        components = state
+                        numeric_vals = [int(value) for value in self.STATE_VALUE.findall(line)]
+                        if len(numeric_vals) != len(numeric_features):
+                            raise Exception("ERROR: Unexpected number of values in state line")
+                    elif first == 'W' and line.startswith('When'):
+                        action = self.parse_action(line, actions)
+                        if not ignore_current:
+                            current_actions.append(actions[action])
+                    elif ignore_current:
+                        continue
+                    elif first == 'W' and line.startswith("While"):
+                        # We implicityly assume that transitions starting with 'While' are mapped to wait.
+                        ignore_current = True
+                    elif line.strip() == "" and components is not None:
+                        row_components.append(components)
+                        row_num_vals.extend(numeric_vals)
+                        row_actions.extend(current_actions)
+                        row_action_ends.append(len(row_actions))
                         total_rows += 1
-                        total_state_actions += len(current_actions)
-                    ignore_current = False
-                    current_actions = []
-                else:
-                    raise Exception("ERROR: Unhandled line in input")
-
-            logging.info(
-                f"Done reading {total_rows} states with \na total of {total_state_actions} state-action pairs.")
-
-            # Project onto measurable variables, the strategy should not depend on the gua variables coming from euler
-            projection_variables = controllable_states + list(filter(lambda x: 'gua' not in x, numeric_features))
-            num_df = pd.DataFrame(row_num_vals, columns=controllable_states + numeric_features, dtype=np.int16)
-            num_df = num_df[projection_variables]
-
-            grouped = num_df.groupby(projection_variables)
-            x = np.empty((len(grouped), len(projection_variables)), dtype=np.int16)
-            y = np.full((len(grouped), max([len(y) for y in row_actions])), -1, dtype=np.int16)
-
-            i = 0
-            for (group, indices) in grouped.indices.items():
-                if len(indices) > 1:
-                    x[i] = group
-                    conservative_actions = set(actions.values()).copy()
-                    for idx in indices:
-                        conservative_actions &= set(row_actions[idx])
-                    assert len(
-                        conservative_actions) > 0, "Stategy for picking safe action doesn't work. Deeper analysis needed."
-                    y[i][0:len(conservative_actions)] = list(sorted(conservative_actions))
-                else:
-                    x[i] = group
-                    y[i][0:len(row_actions[indices[0]])] = sorted(row_actions[indices[0]])
-                i = i + 1
-
-            logging.info("Constructed training set with %s datapoints" % x.shape[0])
-
-            # construct metadata
-            # assumption is that UPPAAL only works with integers
-            x_metadata = dict()
-            x_metadata["variables"] = projection_variables
-            x_metadata["categorical"] = []
-            x_metadata["min_inner"] = x_metadata["min_outer"] = [float(i) for i in np.amin(x, axis=0)]
-            x_metadata["max_inner"] = x_metadata["max_outer"] = [float(i) for i in np.amax(x, axis=0)]
-            x_metadata["step_size"] = [1 for _ in range(len(projection_variables))]
-
-            y_metadata = dict()
-            y_metadata["variables"] = [action_var]
-            y_metadata["min"] = [min(index_to_actual.values())]
-            y_metadata["max"] = [max(index_to_actual.values())]
-            y_metadata["step_size"] = [int((y_metadata["max"][0] - y_metadata["min"][0]) / (len(index_to_actual) - 1))]
-
-            logging.debug(x_metadata)
-            logging.debug(y_metadata)
-
-            return (x, x_metadata, y, y_metadata, index_to_actual)
+                        current_actions = []
+                    else:
+                        raise Exception("ERROR: Unhandled line in input")
+
+        logging.info(
+            f"Done reading {total_rows} states with \na total of {len(row_actions)} state-action pairs.")
+
+        # Figure out the assignments in each action and extract
+        # the assigned value. The assigned variable is extracted
+        # too, but not used anywhere as of now.
+        index_to_actual = dict()
+        action_var = None
+        for (action, index) in actions.items():
+            _, action_var, val = self.ASSIGNMENT.findall(action)[0]
+            index_to_actual[index] = int(val)
+
+        # a component is marked in all states whose .Choose components contain its name
+        categorical = np.zeros((len(state_components), len(controllable_states)), dtype=np.int16)
+        for ctrl, components in state_components.items():
+            for state, column in controllable_states.items():
+                categorical[components, column] = any(state in word for word in ctrl)
+
+        # Project onto measurable variables, the strategy should not depend on the gua variables coming from euler
+        numeric_columns = [i for i, feature in enumerate(numeric_features) if 'gua' not in feature]
+        projection_variables = list(controllable_states) + [numeric_features[i] for i in numeric_columns]
+        num_vals = np.frombuffer(row_num_vals, dtype=np.int64).reshape(total_rows, len(numeric_features))
+        rows = np.hstack([categorical[np.frombuffer(row_components, dtype=np.int64)],
+                          num_vals[:, numeric_columns].astype(np.int16)])
+        x, y = self.group_rows(rows, np.frombuffer(row_actions, dtype=np.int64),
+                               np.frombuffer(row_action_ends, dtype=np.int64))
+
+        logging.info("Constructed training set with %s datapoints" % x.shape[0])
+
+        # construct metadata
+        # assumption is that UPPAAL only works with integers
+        x_metadata = dict()
+        x_metadata["variables"] = projection_variables
+        x_metadata["categorical"] = []
+        x_metadata["min_inner"] = x_metadata["min_outer"] = [float(i) for i in np.amin(x, axis=0)]
+        x_metadata["max_inner"] = x_metadata["max_outer"] = [float(i) for i in np.amax(x, axis=0)]
+        x_metadata["step_size"] = [1 for _ in range(len(projection_variables))]
+
+        y_metadata = dict()
+        y_metadata["variables"] = [action_var]
+        y_metadata["min"] = [min(index_to_actual.values())]
+        y_metadata["max"] = [max(index_to_actual.values())]
+        y_metadata["step_size"] = [int((y_metadata["max"][0] - y_metadata["min"][0]) / (len(index_to_actual) - 1))]
+
+        logging.debug(x_metadata)
+        logging.debug(y_metadata)
+
+        return (x, x_metadata, y, y_metadata, index_to_actual)
+
+    @staticmethod
+    def parse_state_head(line, state_heads, state_components, controllable_states):
+        """
+        Parses the component part "State: ( ... )" of a state line, registering its .Choose components.
+        :returns: whether the state is controllable and the id of its tuple of .Choose components
+        """
+        head = line.partition(')')[0]
+        if head not in state_heads:
+            ctrl = tuple(word for word in head.split() if "Choose" in word)
+            if line.startswith('State: '):
+                for state in ctrl:
+                    controllable_states.setdefault(state, len(controllable_states))
+            state_heads[head] = (len(ctrl) > 0, state_components.setdefault(ctrl, len(state_components)))
+        return state_heads[head]
+
+    def parse_action(self, line, actions):
+        """
+        Parses the action of a transition line, registering it if it takes a .Choose transition.
+        """
+        action_str = line[line.index(self.TRANSITION) + len(self.TRANSITION):].rstrip()
+        if action_str not in actions and "Choose" in action_str:
+            actions[action_str] = len(actions) + 1
+        return action_str
+
+    @staticmethod
+    def group_rows(rows, actions, action_ends):
+        """
+        Merges rows with the same state. A state occurring only once keeps all its actions, for a state occurring several
+        times only the conservative actions allowed in all occurrences are kept.
+        :param rows: the states of shape (num_rows, num_features)
+        :param actions: the actions of all rows, concatenated
+        :param action_ends: the end of the actions of every row in actions, starting with 0
+        :returns: the unique states in lexicographic order and their sorted actions, padded with -1
+        """
+        order = np.lexsort(rows.T[::-1])
+        is_new_group = np.ones(len(rows), dtype=bool)
+        is_new_group[1:] = np.any(rows[order[1:]] != rows[order[:-1]], axis=1)
+        x = rows[order[is_new_group]]
+        row_group = np.empty(len(rows), dtype=np.int64)
+        row_group[order] = np.cumsum(is_new_group) - 1
+        group_sizes = np.bincount(row_group, minlength=len(x))
+
+        num_actions = np.diff(action_ends)
+        action_row = np.repeat(np.arange(len(rows)), num_actions)
+        action_group = row_group[action_row]
+
+        # states occurring once keep their actions as they are, otherwise every action is counted once per row
+        single = group_sizes[action_group] == 1
+        max_action = actions.max(initial=0) + 1
+        row_actions = np.unique(action_row[~single] * max_action + actions[~single])
+        group_actions, counts = np.unique(row_group[row_actions // max_action] * max_action + row_actions % max_action,
+                                          return_counts=True)
+        conservative = counts == group_sizes[group_actions // max_action]
+        assert np.all(np.isin(np.flatnonzero(group_sizes > 1), group_actions[conservative] // max_action)), \
+            "Stategy for picking safe action doesn't work. Deeper analysis needed."
+
+        y_group = np.concatenate([action_group[single], group_actions[conservative] // max_action])
+        y_action = np.concatenate([actions[single], group_actions[conservative] % max_action])
+        y_order = np.lexsort([y_action, y_group])
+        y_group, y_action = y_group[y_order], y_action[y_order]
+        group_starts = np.searchsorted(y_group, np.arange(len(x)))
+        y = np.full((len(x), num_actions.max()), -1, dtype=np.int16)
+        y[y_group, np.arange(len(y_group)) - group_starts[y_group]] = y_action
+        return x, y
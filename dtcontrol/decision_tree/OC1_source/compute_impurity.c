@@ -9,6 +9,7 @@
 /* Author : Sreerama K. Murthy					*/
 /* Last modified : July 1994					*/
 /* Contains modules :	compute_impurity			*/
+/*			set_impurity_function			*/
 /*			set_counts				*/
 /*			reset_counts				*/
 /*			largest_element				*/
@@ -25,13 +26,32 @@ extern int no_of_categories;
 extern int coeff_modified;
 extern float *coeff_array;
 
+/* Selects the impurity measure at runtime, overriding IMPURITY if set.	*/
+/* Set by set_impurity_function.					*/
+float (*impurity_function)() = NULL;
+
+float maxminority(),summinority(),variance(),info_gain(),gini_index(),twoing();
+
+struct impurity_entry
+{
+  char *name;
+  float (*function)();
+};
+
+static struct impurity_entry impurity_functions[] = {
+  {"maxminority",maxminority}, {"summinority",summinority},
+  {"variance",variance}, {"info_gain",info_gain},
+  {"gini_index",gini_index}, {"twoing",twoing}, {NULL,NULL}
+};
+
 /************************************************************************/
 /* Module name : compute_impurity					*/
 /* Functionality : Front end to the routine to compute the		*/
 /*		   impurity of a given array of points.			*/
 /*		   The name of the actual impurity-computing routine	*/
 /*		   is given by the hash constant IMPURITY, which is	*/
-/*		   in turn defined by the user in oc1.h.		*/
+/*		   in turn defined by the user in oc1.h, unless		*/
+/*		   impurity_function is set.				*/
 /* Parameters : cur_no_of_points : Size of the point set whose impurity	*/
 /*		needs to be computed.                                   */
 /* Returns :	impurity.						*/
@@ -59,9 +79,32 @@ float compute_impurity(cur_no_of_points)
   
   if (stop_splitting()) return(0);
   
+  if (impurity_function != NULL) return((*impurity_function)());
   return(IMPURITY);
 }
 
+/************************************************************************/
+/* Module name : set_impurity_function					*/
+/* Functionality : Selects the impurity measure used by compute_impurity*/
+/*		   by its name, one of the values listed for IMPURITY	*/
+/*		   in oc1.h.						*/
+/* Parameters : name : the name of the impurity measure.		*/
+/* Returns :	TRUE if the impurity measure is known, FALSE otherwise.	*/
+/* Is called by modules :	main (mktree.c)				*/
+/*				oc1_find_split (oc1_lib.c)		*/
+/************************************************************************/
+int set_impurity_function(name)
+     char *name;
+{
+  int i;
+  
+  impurity_function = NULL;
+  for (i=0;impurity_functions[i].name != NULL;i++)
+    if (!strcmp(impurity_functions[i].name,name))
+      impurity_function = impurity_functions[i].function;
+  return(impurity_function != NULL);
+}
+
 /************************************************************************/
 /* Module name : set_counts						*/
 /* Functionality :	Sets the values in the integer arrays 		*/
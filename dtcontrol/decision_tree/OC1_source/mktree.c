@@ -122,7 +122,7 @@ char* argv[];
 
     pname = argv[0];
     if (argc == 1) usage (pname);
-    while ((c1 = getopt (argc, argv, "aA:b:Bc:d:D:i:j:Kl:m:M:n:Nop:r:R:s:t:T:uvV:")) != EOF)
+    while ((c1 = getopt (argc, argv, "aA:b:Bc:d:D:i:I:j:Kl:m:M:n:Nop:r:R:s:t:T:uvV:")) != EOF)
 
         switch (c1)
         {
@@ -171,6 +171,10 @@ char* argv[];
             no_of_restarts = atoi (optarg);
             if (no_of_restarts <= 0) usage (pname);
             break;
+        case 'I': /*Impurity measure, overriding IMPURITY in oc1.h.
+                      One of the values listed for IMPURITY. */
+            if (!set_impurity_function (optarg)) usage (pname);
+            break;
         case 'j': /*Maximum number of random perturbations tried when
                       stuck in a local minimum. */
             if (oblique == FALSE) usage (pname);
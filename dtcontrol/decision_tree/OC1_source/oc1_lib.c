@@ -0,0 +1,160 @@
+/****************************************************************/
+/* File Name : oc1_lib.c					*/
+/* Contains modules :	oc1_find_split				*/
+/*			oc1_get_error				*/
+/*			map_categories				*/
+/* Uses modules in :	oc1.h					*/
+/*			mktree.c				*/
+/*			load_data.c				*/
+/*			compute_impurity.c			*/
+/*			util.c					*/
+/* Is used by modules in :	None.				*/
+/* Remarks       :	Entry point of the shared library	*/
+/*			liboc1.so, which lets dtControl induce	*/
+/*			the root hyperplane of OC1 on in-memory	*/
+/*			data, without a data file, a decision	*/
+/*			tree file or a child process.		*/
+/****************************************************************/
+#include <setjmp.h>
+#include "oc1.h"
+
+extern jmp_buf* error_handler;
+extern char error_message[];
+extern int no_of_dimensions, no_of_coeffs, no_of_categories;
+extern int no_of_restarts, max_no_of_random_perturbations;
+extern int coeff_modified, cycle_count;
+extern float (*impurity_function) ();
+
+/************************************************************************/
+/* Module name : map_categories						*/
+/* Functionality : Assigns the categories of the points in the same way	*/
+/*                 as load_points (load_data.c): if the labels are not	*/
+/*                 all in [1,k], where k is the number of distinct	*/
+/*                 labels, they are renumbered in order of appearance.	*/
+/* Parameters : points : array of points, indices in the range 1,n	*/
+/*              labels : the labels of the points, indices 0,n-1	*/
+/* Returns : the number of categories.					*/
+/************************************************************************/
+static int map_categories (POINT** points, int* labels, int no_of_points)
+{
+    int i, j, count = 0, remap = FALSE;
+    int* categories;
+
+    categories = ivector (1, no_of_points);
+    for (i = 1; i <= no_of_points; i++)
+    {
+        for (j = 1; j <= count; j++)
+            if (categories[j] == labels[i - 1]) break;
+        if (j > count) categories[++count] = labels[i - 1];
+        points[i]->category = j;
+    }
+
+    for (j = 1; j <= count; j++)
+        if (categories[j] < 1 || categories[j] > count) remap = TRUE;
+    if (!remap)
+        for (i = 1; i <= no_of_points; i++)
+            points[i]->category = labels[i - 1];
+
+    free_ivector (categories, 1, no_of_points);
+    return (count);
+}
+
+/************************************************************************/
+/* Module name : oc1_find_split						*/
+/* Functionality : Induces the root hyperplane of the decision tree for	*/
+/*                 the given points, exactly as "mktree -p0 -i<restarts>*/
+/*                 -j<jumps>" does with a tree depth of one.		*/
+/* Parameters : data : row-major array of no_of_points x dimensions	*/
+/*                     attribute values.				*/
+/*              labels : the integer class of every point.		*/
+/*              impurity : the name of the impurity measure, one of	*/
+/*                         the values listed for IMPURITY in oc1.h.	*/
+/*              restarts, jumps : see the -i and -j options of mktree.	*/
+/*              hyperplane : output array of dimensions+1 entries, the	*/
+/*                           coefficients followed by the constant.	*/
+/* Returns : 1 if a hyperplane was found, 0 if the impurity could not	*/
+/*           be improved, -1 if the impurity measure is unknown and -2	*/
+/*           if OC1 reported an error, see oc1_get_error.		*/
+/* Calls modules :	set_impurity_function (compute_impurity.c)	*/
+/*			shuffle_points (load_data.c)			*/
+/*			allocate_structures (mktree.c)			*/
+/*			build_subtree (mktree.c)			*/
+/*			deallocate_structures (mktree.c)		*/
+/* Remarks : The random number generator is reset on every call to the	*/
+/*           state of a freshly started mktree process, so that the	*/
+/*           results do not depend on previous calls.			*/
+/*           Errors (e.g. failed memory allocations) return to this	*/
+/*           module instead of exiting the process. The memory		*/
+/*           allocated up to the error is not freed then.		*/
+/************************************************************************/
+int oc1_find_split (float* data, int* labels, int no_of_points, int dimensions, char* impurity, int restarts,
+                    int jumps, float* hyperplane)
+{
+    int i, j, found;
+    unsigned short seed[3] = { 0, 0, 0 };
+    jmp_buf handler;
+    POINT** points = NULL;
+    POINT** allocate_point_array ();
+    struct tree_node *root, *build_subtree ();
+
+    if (!set_impurity_function (impurity)) return (-1);
+    if (setjmp (handler))
+    {
+        error_handler = NULL;
+        impurity_function = NULL;
+        return (-2);
+    }
+    error_handler = &handler;
+    if (no_of_points < 1 || dimensions < 1) error ("Oc1_Find_Split : No points or no attributes given.");
+
+    seed48 (seed);
+    no_of_dimensions = dimensions;
+    no_of_restarts = restarts;
+    max_no_of_random_perturbations = jumps;
+    coeff_modified = FALSE;
+    cycle_count = 0;
+
+    points = allocate_point_array (points, no_of_points, 0);
+    for (i = 1; i <= no_of_points; i++)
+    {
+        for (j = 1; j <= no_of_dimensions; j++)
+            points[i]->dimension[j] = data[(i - 1) * no_of_dimensions + j - 1];
+        points[i]->val = 0.0;
+    }
+    no_of_categories = map_categories (points, labels, no_of_points);
+    shuffle_points (points, no_of_points);
+
+    allocate_structures (no_of_points);
+    root = build_subtree ("\0", points, no_of_points);
+    found = root != NULL;
+    if (found)
+    {
+        for (i = 1; i <= no_of_coeffs; i++)
+            hyperplane[i - 1] = root->coefficients[i];
+        free_vector (root->coefficients, 1, no_of_coeffs);
+        free_ivector (root->left_count, 1, no_of_categories);
+        free_ivector (root->right_count, 1, no_of_categories);
+        free ((char*)root);
+    }
+    deallocate_structures (no_of_points);
+
+    for (i = 1; i <= no_of_points; i++)
+    {
+        free_vector (points[i]->dimension, 1, no_of_dimensions);
+        free ((char*)points[i]);
+    }
+    free ((char*)(points + 1));
+    impurity_function = NULL;
+    error_handler = NULL;
+    return (found);
+}
+
+/************************************************************************/
+/* Module name : oc1_get_error						*/
+/* Functionality : Returns the message of the last error reported by	*/
+/*                 oc1_find_split.					*/
+/************************************************************************/
+char* oc1_get_error ()
+{
+    return (error_message);
+}
@@ -30,7 +30,14 @@
 /*                      routines used by most of the modules    */
 /*                      in the package.	                        */
 /****************************************************************/
+#include <setjmp.h>
 #include <stdio.h>
+#include <string.h>
+
+/* Set by oc1_find_split (oc1_lib.c) while OC1 runs inside another	*/
+/* process, which must not be terminated by error.			*/
+jmp_buf* error_handler = NULL;
+char error_message[256];
 
 /************************************************************************/
 /* Module name : MyLog2                                                  */
@@ -59,10 +66,18 @@ float myabs (x) float x;
 /************************************************************************/
 /* Module name : error							*/
 /* Functionality :	Displays an error message, and exits execution	*/
-/*			normally.					*/
+/*			normally. If an error handler is set, the	*/
+/*			message is stored in error_message and control	*/
+/*			returns to the handler instead.			*/
 /************************************************************************/
 error (error_text) char error_text[];
 {
+    if (error_handler != NULL)
+    {
+        strncpy (error_message, error_text, sizeof (error_message) - 1);
+        error_message[sizeof (error_message) - 1] = '\0';
+        longjmp (*error_handler, 1);
+    }
     printf ("Runtime Error.\n%s.\nExecution Terminated.\n", error_text);
     exit (1);
 }
@@ -291,6 +306,7 @@ usage (pname) char* pname;
         fprintf (stderr, "\n      (Default=<training data>.dt, for outputting.)");
         fprintf (stderr, "\n    -i<#restarts for the perturbation alg.>");
         fprintf (stderr, "\n      (Default=20)");
+        fprintf (stderr, "\n    -I<impurity measure> (Default: IMPURITY in oc1.h)");
         fprintf (stderr, "\n    -j<maximum number of random jumps");
         fprintf (stderr, "\n       tried at each local minimum> (Default = 5)");
         fprintf (stderr, "\n    -K : CART-linear combinations mode");
@@ -1,20 +1,25 @@
+import io
 import json
 import logging
 import pickle
 from collections.abc import Iterable
-from functools import reduce
 from typing import Sequence
 
 import numpy as np
 
 import dtcontrol.util as util
+import dtcontrol.dataset.label_bitsets as label_bitsets
+import dtcontrol.decision_tree.tree_arrays as tree_arrays
 from dtcontrol.decision_tree.splitting.categorical_single import CategoricalSingleSplittingStrategy
 from dtcontrol.util import Caller
 from dtcontrol.benchmark_suite_classifier import BenchmarkSuiteClassifier
 from dtcontrol.decision_tree.determinization.label_powerset_determinizer import LabelPowersetDeterminizer
+from dtcontrol.decision_tree.expansion_queue import ExpansionQueue
+from dtcontrol.decision_tree.flat_tree import FlatTree
 from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import DeterminizingImpurityMeasure
 from dtcontrol.decision_tree.impurity.multi_label_impurity_measure import MultiLabelImpurityMeasure
 from dtcontrol.decision_tree.impurity.twoing_rule import TwoingRule
+from dtcontrol.decision_tree.parallel_fit import ParallelFit
 from dtcontrol.decision_tree.splitting.categorical_multi import CategoricalMultiSplit, CategoricalMultiSplittingStrategy
 from dtcontrol.decision_tree.splitting.oc1 import OC1SplittingStrategy
 from dtcontrol.util import print_tuple
@@ -25,7 +30,15 @@ from dtcontrol.decision_tree.splitting.context_aware.context_aware_splitting_str
 
 class DecisionTree(BenchmarkSuiteClassifier):
     def __init__(self, splitting_strategies, impurity_measure, name, label_pre_processor=None, early_stopping=False,
-                 early_stopping_num_examples=None, early_stopping_optimized=False):
+                 early_stopping_num_examples=None, early_stopping_optimized=False, num_jobs=1,
+                 parallel_num_examples=10000, expansion_order='dfs', use_label_bitsets=False):
+        """
+        :param expansion_order: the order in which the nodes are expanded, one of 'dfs', 'bfs' and 'best-first'
+        :param use_label_bitsets: whether early stopping intersects the labels as bitsets. This is faster for large
+            datasets, but the bitsets are cached next to the labels (see Dataset.get_label_bitsets).
+        :param num_jobs: the number of processes building subtrees in parallel
+        :param parallel_num_examples: the minimum number of examples of a subtree to be built as a separate parallel task
+        """
         super().__init__(name)
         self.root = None
         self.name = name
@@ -35,6 +48,10 @@ class DecisionTree(BenchmarkSuiteClassifier):
         self.early_stopping = early_stopping
         self.early_stopping_num_examples = early_stopping_num_examples
         self.early_stopping_optimized = early_stopping_optimized
+        self.num_jobs = num_jobs
+        self.parallel_num_examples = parallel_num_examples
+        self.expansion_order = expansion_order
+        self.use_label_bitsets = use_label_bitsets
         self.check_valid()
 
     def check_valid(self):
@@ -48,6 +65,8 @@ class DecisionTree(BenchmarkSuiteClassifier):
             raise ValueError('OC1 can only be used with pre-split-determinization.')
         if not self.early_stopping and self.early_stopping_num_examples is not None:
             raise ValueError('Early stopping parameters set although early stopping is disabled.')
+        if self.expansion_order not in ExpansionQueue.ORDERS:
+            raise ValueError(f'Unknown expansion order {self.expansion_order}.')
 
         determinization = isinstance(self.impurity_measure, MultiLabelImpurityMeasure) or \
                           not isinstance(self.impurity_measure.determinizer, LabelPowersetDeterminizer)
@@ -72,19 +91,41 @@ class DecisionTree(BenchmarkSuiteClassifier):
                 return False
         return True
 
+    def create_builder(self):
+        return NodeBuilder(self.splitting_strategies, self.impurity_measure, self.early_stopping,
+                           self.early_stopping_num_examples, self.early_stopping_optimized,
+                           use_label_bitsets=self.use_label_bitsets)
+
     def fit(self, dataset, **kwargs):
         if self.label_pre_processor is not None:
             dataset = self.label_pre_processor.preprocess(dataset)
         self.check_categorical(dataset)
-        self.root = Node(self.splitting_strategies, self.impurity_measure, self.early_stopping,
-                         self.early_stopping_num_examples, self.early_stopping_optimized)
+        builder = self.create_builder()
+        self.root = Node(builder)
         for split_strat in self.splitting_strategies:
             if isinstance(split_strat, ContextAwareSplittingStrategy):
                 split_strat.set_root(self.root)
-        self.root.fit(dataset, **kwargs)
+        # the web UI builds the tree level by level, which is not supported by the parallel construction
+        if self.num_jobs > 1 and len(dataset) >= self.parallel_num_examples and "rounds" not in kwargs:
+            ParallelFit(Node, builder, self.num_jobs, self.parallel_num_examples).fit(self.root, dataset, **kwargs)
+        else:
+            self.root.fit(dataset, expansion_order=self.expansion_order, **kwargs)
+        # the configuration is kept once on the tree, the finished nodes only hold their decision data
+        self.root.release_builder()
+
+    def compile(self):
+        """
+        Compiles the tree into its flat array representation, which predicts all examples at once. The tree is compiled
+        anew for every prediction as it may have been changed by post-processing or in the frontend.
+        """
+        return FlatTree(self.root)
 
     def predict(self, dataset, actual_values=True):
-        return self.root.predict(dataset.x, actual_values)
+        return self.compile().predict(dataset.x, actual_values)
+
+    def compute_accuracy(self, dataset):
+        flat_tree = self.compile()
+        return dataset.compute_grouped_accuracy(flat_tree.predict_leaves(dataset.x), flat_tree.index_labels)
 
     def get_stats(self):
         return {
@@ -97,13 +138,24 @@ class DecisionTree(BenchmarkSuiteClassifier):
     def print_dot(self, x_metadata, y_metadata):
         return self.root.print_dot(x_metadata, y_metadata)
 
+    def write_dot(self, file, x_metadata, y_metadata):
+        self.root.write_dot(file, x_metadata, y_metadata)
+
     def print_c(self):
         return self.root.print_c()
 
+    def write_c(self, file):
+        self.root.write_c(file)
+
     def toJSON(self, x_metadata, y_metadata):
+        file = io.StringIO()
+        self.write_json(file, x_metadata, y_metadata)
+        return file.getvalue()
+
+    def write_json(self, file, x_metadata, y_metadata):
         variables = x_metadata.get('variables')
         category_names = x_metadata.get('category_names')
-        return json.dumps(self.root.to_json_dict(y_metadata, variables=variables, category_names=category_names), indent=4, default=util.convert)
+        self.root.write_json(file, y_metadata, variables=variables, category_names=category_names)
 
     # Needs to know the number of inputs, because it has to define how many inputs the hardware component has in
     # the "entity" block
@@ -123,16 +175,38 @@ class DecisionTree(BenchmarkSuiteClassifier):
             return entity_str + architecture
 
     def save(self, filename):
+        """
+        Saves the classifier. If the filename ends with .npz, only the tree is saved in the compact array format of
+        tree_arrays.py, which is much smaller and faster to write than the pickled classifier.
+        """
+        if filename.endswith('.npz'):
+            tree_arrays.save(self.root, filename)
+            return
         with open(filename, 'wb') as outfile:
             pickle.dump(self, outfile)
 
+    def load(self, filename):
+        """
+        Replaces the tree of this classifier by the tree saved with save. The configuration of this classifier is kept.
+        Both formats may unpickle objects (see tree_arrays.py), so only trusted files should be loaded.
+        """
+        if filename.endswith('.npz'):
+            self.root = tree_arrays.load(filename, Node)
+        else:
+            with open(filename, 'rb') as infile:
+                self.root = pickle.load(infile).root
+
     def __str__(self):
         return self.name
 
 
-class Node:
+class NodeBuilder:
+    """
+    The configuration of the tree construction. A single builder is shared by all nodes of a tree while it is built.
+    """
+
     def __init__(self, splitting_strategies, impurity_measure, early_stopping=False, early_stopping_num_examples=None,
-                 early_stopping_optimized=False, depth=0):
+                 early_stopping_optimized=False, subtree_collector=None, use_label_bitsets=False):
         self.logger = logging.getLogger("node_logger")
         self.logger.setLevel(logging.ERROR)
         self.splitting_strategies = splitting_strategies
@@ -140,6 +214,19 @@ class Node:
         self.early_stopping = early_stopping
         self.early_stopping_num_examples = early_stopping_num_examples
         self.early_stopping_optimized = early_stopping_optimized
+        self.subtree_collector = subtree_collector  # set when building in parallel, see parallel_fit.py
+        self.use_label_bitsets = use_label_bitsets
+        self.logged_depth_problem = False
+
+
+class Node:
+    # trees can have hundreds of thousands of nodes, so a node only holds its decision data and a reference to the
+    # builder, which is released once the tree is built
+    __slots__ = ('builder', 'depth', 'split', 'num_nodes', 'num_inner_nodes', 'children', 'index_label',
+                 'actual_label')
+
+    def __init__(self, builder=None, depth=0):
+        self.builder = builder
         self.depth = depth
         self.split = None
         self.num_nodes = 0
@@ -149,7 +236,25 @@ class Node:
         #                                     a list of tuples
         self.index_label = None  # the label with int indices
         self.actual_label = None  # the actual float or categorical label
-        self.logged_depth_problem = False
+
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['builder'] = None
+        return state
+
+    def __setstate__(self, state):
+        # trees pickled before nodes had slots do not have all attributes
+        self.__init__()
+        for name in self.__slots__:
+            if name in state:
+                setattr(self, name, state[name])
+
+    def release_builder(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.builder = None
+            stack.extend(node.children)
 
     def predict(self, x, actual_values=True):
         pred = []
@@ -176,9 +281,58 @@ class Node:
         else:
             return [tuple_or_value.item()], decision_path
 
-    def fit(self, dataset, **kwargs):
-        if self.check_done(dataset):
+    def fit(self, dataset, expansion_order='dfs', **kwargs):
+        """
+        Builds the subtree of this node. Instead of recursing, the nodes waiting to be expanded are kept in an
+        ExpansionQueue, which determines the order of expansion. The 'dfs' order builds the same tree in the same order
+        as a recursive construction.
+        """
+        queue = ExpansionQueue(expansion_order)
+        self.push_entries(queue, [(self, dataset, kwargs)])
+        while queue:
+            node, dataset, kwargs = entry = queue.pop()
+            if queue.is_best_first() or node.choose_split_of_entry(entry, self) is not None:
+                self.push_entries(queue, node.create_children(dataset, kwargs))
+        self.update_num_nodes()
+
+    def push_entries(self, queue, entries):
+        """
+        Pushes the entries of the children of a node. For 'best-first', their splits are chosen first.
+        """
+        if not queue.is_best_first():
+            queue.push(entries)
             return
+        chosen = [(entry, entry[0].choose_split_of_entry(entry, self)) for entry in entries]
+        chosen = [(entry, impurity) for entry, impurity in chosen if impurity is not None]
+        # waiting nodes should not keep their arrays in memory
+        for (_, dataset, _), _ in chosen:
+            dataset.release_materialized_arrays()
+        queue.push([entry for entry, _ in chosen], [impurity for _, impurity in chosen])
+
+    def choose_split_of_entry(self, entry, root):
+        """
+        Chooses the split of the node of an entry of the expansion queue.
+        :returns: the impurity of the chosen split or None if the node is not split
+        """
+        _, dataset, kwargs = entry
+        for split_strat in self.builder.splitting_strategies:
+            if self is not root and isinstance(split_strat, ContextAwareSplittingStrategy):
+                split_strat.set_current_node(self)
+            split_strat.begin_node(self)
+        impurity = self.choose_split(dataset, kwargs)
+        if impurity is None:
+            self.end_node([])
+            dataset.release_materialized_arrays()
+        return impurity
+
+    def choose_split(self, dataset, kwargs):
+        """
+        Sets self.split to the best split found by the splitting strategies, unless the node becomes a leaf.
+        :param kwargs: the keyword arguments passed to the splitting strategies, which are updated for the children
+        :returns: the impurity of the chosen split or None if the node is not split
+        """
+        if self.check_done(dataset):
+            return None
 
         # Rounds are used to control how many levels of tree building is to be done
         # before returning the tree (possibly incomplete). This is useful for the
@@ -187,27 +341,29 @@ class Node:
             if kwargs["rounds"] > 0:
                 kwargs["rounds"] = kwargs["rounds"] - 1
             else:
-                return
+                return None
 
-        pre_determinize = isinstance(self.impurity_measure, DeterminizingImpurityMeasure) and \
-                          self.impurity_measure.determinizer.is_pre_split()
+        impurity_measure = self.builder.impurity_measure
+        pre_determinize = isinstance(impurity_measure, DeterminizingImpurityMeasure) and \
+                          impurity_measure.determinizer.is_pre_split()
         if pre_determinize:
-            self.impurity_measure.determinizer.pre_determinized_labels = None
-            determinized_labels = self.impurity_measure.determinizer.determinize(dataset)
-            self.impurity_measure.determinizer.pre_determinized_labels = determinized_labels
-        splits = [strategy.find_split(dataset, self.impurity_measure, **kwargs) for strategy in self.splitting_strategies]
+            impurity_measure.determinizer.pre_determinized_labels = None
+            determinized_labels = impurity_measure.determinizer.determinize(dataset)
+            impurity_measure.determinizer.pre_determinized_labels = determinized_labels
+        splits = [strategy.find_split(dataset, impurity_measure, **kwargs)
+                  for strategy in self.builder.splitting_strategies]
         splits = [s for s in splits if s is not None]
         if not splits:
-            self.logger.warning("Aborting branch: no split possible.")
+            self.builder.logger.warning("Aborting branch: no split possible.")
             if pre_determinize:
-                self.impurity_measure.determinizer.pre_determinized_labels = None
-            return
+                impurity_measure.determinizer.pre_determinized_labels = None
+            return None
 
         fallback_dict = {}
         split_dict = {}
 
         for split in splits:
-            impurity = self.impurity_measure.calculate_impurity(dataset, split)
+            impurity = impurity_measure.calculate_impurity(dataset, split)
             if impurity < 9223372036854775807:
                 if split.priority == 0:
                     fallback_dict[split] = impurity
@@ -215,83 +371,132 @@ class Node:
                     split_dict[split] = impurity / split.priority
                 else:
                     # One split appeared with split.priority > 1 or split.priority < 0:
-                    self.logger.warning("Aborting: only splitting strategy priorities between 0 and 1 allowed.")
-                    return
+                    self.builder.logger.warning("Aborting: only splitting strategy priorities between 0 and 1 "
+                                                "allowed.")
+                    return None
 
         # Choosing the right split for self.split
         if split_dict:
             # Using the best split from split_dict
             self.split = min(split_dict.keys(), key=split_dict.get)
+            impurity = split_dict[self.split]
         elif fallback_dict:
             # Using the best fallback split
             self.split = min(fallback_dict.keys(), key=fallback_dict.get)
+            impurity = fallback_dict[self.split]
         else:
-            self.logger.warning("Aborting branch: no split possible.")
+            self.builder.logger.warning("Aborting branch: no split possible.")
             if pre_determinize:
-                self.impurity_measure.determinizer.pre_determinized_labels = None
-            return
+                impurity_measure.determinizer.pre_determinized_labels = None
+            return None
 
+        for split in splits:
+            if split is not self.split:
+                split.clear_mask_cache()
         if pre_determinize:
-            self.impurity_measure.determinizer.pre_determinized_labels = None
-
+            impurity_measure.determinizer.pre_determinized_labels = None
+        return impurity
+
+    def create_children(self, dataset, kwargs):
+        """
+        Splits the dataset of this node with self.split and creates the children.
+        :returns: the (child, subset, kwargs) entries of the children that still have to be built
+        """
         subsets = self.split.split(dataset)
+        self.split.clear_mask_cache()
         assert len(subsets) > 1
-        if any(len(s.x) == 0 for s in subsets):
-            self.logger.warning("Aborting branch: no split possible. "
-                                "You might want to consider adding more splitting strategies.")
-            return
-        self.logger.debug(f"Level {self.depth}: Found split for data set size {len(dataset.x)}: {self.split}")
+        if any(len(s) == 0 for s in subsets):
+            self.builder.logger.warning("Aborting branch: no split possible. "
+                                        "You might want to consider adding more splitting strategies.")
+            self.end_node([])
+            dataset.release_materialized_arrays()
+            return []
+        self.builder.logger.debug(f"Level {self.depth}: Found split for data set size {len(dataset)}: {self.split}")
+        # the subsets are views, so the arrays of this node are no longer needed while the children are built
+        dataset.release_materialized_arrays()
+        entries = []
         for subset in subsets:
             # TODO P: Store address in the Node object if needed in frontend
-            node = Node(self.splitting_strategies, self.impurity_measure, self.early_stopping,
-                        self.early_stopping_num_examples, self.early_stopping_optimized, self.depth + 1)
-
-            for split_strat in self.splitting_strategies:
-                if isinstance(split_strat, ContextAwareSplittingStrategy):
-                    split_strat.set_current_node(node)
-
+            node = Node(self.builder, self.depth + 1)
             self.children.append(node)
-            node.fit(subset, **kwargs)
-        self.num_nodes = 1 + sum([c.num_nodes for c in self.children])
-        self.num_inner_nodes = 1 + sum([c.num_inner_nodes for c in self.children])
+            collector = self.builder.subtree_collector
+            if collector is not None and collector.collect(node, subset):
+                continue
+            entries.append((node, subset, dict(kwargs)))
+        self.end_node([entry[0] for entry in entries])
+        return entries
+
+    def end_node(self, children):
+        """
+        Tells the splitting strategies that this node is done and which of its children are built next.
+        """
+        for split_strat in self.builder.splitting_strategies:
+            split_strat.end_node(self, children)
+
+    def update_num_nodes(self):
+        """
+        Computes num_nodes and num_inner_nodes of all inner nodes of this subtree from the leaves upwards.
+        """
+        preorder = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            preorder.append(node)
+            stack.extend(node.children)
+        for node in reversed(preorder):
+            if node.children:
+                node.num_nodes = 1 + sum([c.num_nodes for c in node.children])
+                node.num_inner_nodes = 1 + sum([c.num_inner_nodes for c in node.children])
 
     def check_done(self, dataset):
-        if self.depth >= 100 and not self.logged_depth_problem:
-            self.logged_depth_problem = True
-            self.logger.info("Depth >= 100. Maybe something is going wrong?")
+        builder = self.builder
+        if self.depth >= 100 and not builder.logged_depth_problem:
+            builder.logged_depth_problem = True
+            builder.logger.info("Depth >= 100. Maybe something is going wrong?")
         if self.depth >= 500:
-            self.logger.warning("Aborting branch: depth >= 500.")
+            builder.logger.warning("Aborting branch: depth >= 500.")
             return True
 
+        # the statistics used here are computed once for the root dataset, see Dataset.get_label_row_ids,
+        # Dataset.get_label_bitsets (if enabled) and Dataset.is_x_constant
         y = dataset.get_single_labels()
-        if len(np.unique(y, axis=0)) <= 1:
+        row_ids = dataset.get_label_row_ids()
+        if row_ids.min() == row_ids.max():
             self.set_labels(y[0, :], dataset)
             return True
 
-        if self.early_stopping:
-            if self.early_stopping_num_examples is None or len(dataset.x) <= self.early_stopping_num_examples:
-                flattened = y.flatten()
-                flattened = flattened[flattened != -1]
-                counts = np.bincount(flattened)[1:]
-                if np.any(counts == len(dataset)):
-                    if self.early_stopping_optimized:
-                        index_label = np.where(counts == len(dataset))[0][0] + 1
-                        self.set_labels([index_label], dataset)
+        if builder.early_stopping:
+            if builder.early_stopping_num_examples is None or len(dataset) <= builder.early_stopping_num_examples:
+                intersection = self.get_label_intersection(dataset, builder.use_label_bitsets)
+                # label 0 is not a valid index label
+                if np.any(intersection > 0):
+                    if builder.early_stopping_optimized:
+                        self.set_labels([intersection[intersection > 0][0]], dataset)
                     else:
-                        intersection = reduce(np.intersect1d, y)
-                        intersection = intersection[intersection != -1]
-                        assert len(intersection) > 0
                         self.set_labels(intersection, dataset)
                     return True
 
-        unique_x = np.unique(dataset.x)
-        if len(unique_x) <= 1:
+        if dataset.is_x_constant():
             self.index_label = self.actual_label = None
             self.num_nodes = 1
             return True
 
         return False
 
+    @staticmethod
+    def get_label_intersection(dataset, use_bitsets=False):
+        """
+        :param use_bitsets: whether to intersect the cached bitsets of the labels instead of counting the labels
+        :returns: the sorted labels allowed by all examples of the dataset
+        """
+        bitsets = dataset.get_label_bitsets() if use_bitsets else None
+        if bitsets is not None:
+            return label_bitsets.get_labels(label_bitsets.intersect(bitsets))
+        # the labels of an example are distinct, so a label is allowed by all examples if it occurs len(dataset) times
+        y = dataset.get_single_labels()
+        counts = np.bincount(y[y != -1])
+        return np.flatnonzero(counts == len(dataset))
+
     def set_labels(self, label_array, dataset):
         self.index_label = [dataset.map_single_label_back(label) for label in list(label_array) if label != -1]
         if len(self.index_label) == 1:
@@ -303,80 +508,137 @@ class Node:
         return not self.children
 
     def print_dot(self, x_metadata, y_metadata):
-        text = 'digraph {{\n{}\n}}'.format(self._print_dot(0, x_metadata, y_metadata)[1])
-        return text
-
-    def _print_dot(self, starting_number, x_metadata, y_metadata):
+        file = io.StringIO()
+        self.write_dot(file, x_metadata, y_metadata)
+        return file.getvalue()
+
+    def write_dot(self, file, x_metadata, y_metadata):
+        """
+        Writes the subtree in the dot format to a file object, part by part.
+        """
+        writer = util.ChunkedWriter(file)
+        writer.write('digraph {\n')
+        self._write_dot(writer, 0, x_metadata, y_metadata)
+        writer.write('\n}')
+        writer.flush()
+
+    def _write_dot(self, writer, starting_number, x_metadata, y_metadata):
+        """
+        Writes the subtree with an explicit stack. Nodes are numbered in preorder and the edges to a child are written
+        after the subtree of the child.
+        :returns: the last number used
+        """
         variables = x_metadata.get('variables')
         x_category_names = x_metadata.get('category_names')
-        if self.is_leaf():
-            return starting_number, '{} [label=\"{}\"];\n'.format(starting_number, self.print_dot_label(y_metadata))
-
-        text = '{} [label=\"{}\"'.format(starting_number, self.split.print_dot(variables, x_category_names))
-        text += "];\n"
-
-        last_number = -1
-        child_starting_number = starting_number + 1
-        if isinstance(self.split, CategoricalMultiSplit):
-            names = None
-            if x_category_names and self.split.feature in x_category_names:
-                names = x_category_names[self.split.feature]
-            labels = []
-            for group in self.split.value_groups:
-                if len(group) == 1:
-                    if not names:
+        next_number = starting_number
+        # the stack contains strings to output, (node, slot) pairs to print and (parent number, slot, edge) triples of
+        # edges to print. The slot is a list receiving the number of the child once it has been printed.
+        stack = [(self, [None])]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                writer.write(item)
+                continue
+            if len(item) == 3:
+                parent_number, slot, edge = item
+                writer.write(f'{parent_number} -> {slot[0]} [{edge}];\n')
+                continue
+            node, slot = item
+            number = slot[0] = next_number
+            next_number += 1
+            if node.is_leaf():
+                writer.write('{} [label=\"{}\"];\n'.format(number, node.print_dot_label(y_metadata)))
+                continue
+            writer.write('{} [label=\"{}\"'.format(number, node.split.print_dot(variables, x_category_names)) + "];\n")
+            labels = node.get_dot_edge_labels(x_category_names)
+            assert len(node.children) == len(labels)
+            for i in reversed(range(len(node.children))):
+                edge = ''
+                if not isinstance(node.split, CategoricalMultiSplit) and i == 1:
+                    edge += 'style="dashed", '
+                edge += f'label="{labels[i]}"'
+                child_slot = [None]
+                stack.append((number, child_slot, edge))
+                stack.append((node.children[i], child_slot))
+        return next_number - 1
+
+    def get_dot_edge_labels(self, x_category_names):
+        if not isinstance(self.split, CategoricalMultiSplit):
+            return ['True', 'False']
+        names = None
+        if x_category_names and self.split.feature in x_category_names:
+            names = x_category_names[self.split.feature]
+        labels = []
+        for group in self.split.value_groups:
+            if len(group) == 1:
+                if not names:
+                    label = group[0]
+                else:
+                    try:
+                        label = names[group[0]]
+                    except IndexError:
+                        logging.warning("Action label missing in _config.json file. Please ensure that all categorical values are labeled. Using action index instead...")
                         label = group[0]
-                    else:
+                labels.append(label)
+            else:
+                if not names:
+                    str_group = group
+                else:
+                    str_group = []
+                    for v in group:
                         try:
-                            label = names[group[0]]
+                            str_group.append(names[v])
                         except IndexError:
                             logging.warning("Action label missing in _config.json file. Please ensure that all categorical values are labeled. Using action index instead...")
-                            label = group[0]
-                    labels.append(label)
-                else:
-                    if not names:
-                        str_group = group
-                    else:
-                        str_group = []
-                        for v in group:
-                            try:
-                                str_group.append(names[v])
-                            except IndexError:
-                                logging.warning("Action label missing in _config.json file. Please ensure that all categorical values are labeled. Using action index instead...")
-                                str_group.append(v)
-                    label = f'{{{str_group[0]}'
-                    for s in str_group[1:]:
-                        label += f',\\n{s}'
-                    label += '}'
-                    labels.append(label)
-        else:
-            labels = ['True', 'False']
-        assert len(self.children) == len(labels)
-        for i in range(len(self.children)):
-            child = self.children[i]
-            last_number, child_text = child._print_dot(child_starting_number, x_metadata, y_metadata)
-            text += child_text
-            text += f'{starting_number} -> {child_starting_number} ['
-            if not isinstance(self.split, CategoricalMultiSplit) and i == 1:
-                text += 'style="dashed", '
-            text += f'label="{labels[i]}"];\n'
-            child_starting_number = last_number + 1
-        assert last_number != -1
-        return last_number, text
+                            str_group.append(v)
+                label = f'{{{str_group[0]}'
+                for s in str_group[1:]:
+                    label += f',\\n{s}'
+                label += '}'
+                labels.append(label)
+        return labels
 
     def print_c(self):
         return self.print_if_then_else(1, 'c')
 
+    def write_c(self, file):
+        self.write_if_then_else(file, 1, 'c')
+
     def print_vhdl(self):
         return self.print_if_then_else(2, 'vhdl')
 
     def print_if_then_else(self, indentation_level, type):
+        file = io.StringIO()
+        self.write_if_then_else(file, indentation_level, type)
+        return file.getvalue()
+
+    def write_if_then_else(self, file, indentation_level, type):
+        """
+        Writes the subtree as nested if-then-else statements to a file object, part by part.
+        """
         if type not in ['c', 'vhdl']:
             raise ValueError('Only c and vhdl printing is currently supported.')
 
-        if self.is_leaf():
-            return "\t" * indentation_level + (self.print_c_label() if type == 'c' else self.print_vhdl_label())
-
+        writer = util.ChunkedWriter(file)
+        # the stack contains strings to output and (node, indentation_level) pairs to print
+        stack = [(self, indentation_level)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                writer.write(item)
+                continue
+            node, indentation_level = item
+            if node.is_leaf():
+                writer.write("\t" * indentation_level +
+                             (node.print_c_label() if type == 'c' else node.print_vhdl_label()))
+                continue
+            stack.extend(reversed(node.get_if_then_else_parts(indentation_level, type)))
+        writer.flush()
+
+    def get_if_then_else_parts(self, indentation_level, type):
+        """
+        :returns: the strings and (child, indentation_level) pairs making up the if-then-else block of an inner node
+        """
         if isinstance(self.split, CategoricalMultiSplit):
             if type == 'vhdl':
                 raise ValueError('VHDL does not (yet?) support multi splits')
@@ -384,14 +646,14 @@ class Node:
                 f"{self.split.print_c()} == {self.split.value_groups[0][i]}"
                 for i in range(len(self.split.value_groups[0]))
             ])
-            text = "\t" * indentation_level + f"if ({disjunction}) {{\n"
+            parts = ["\t" * indentation_level + f"if ({disjunction}) {{\n"]
         else:
-            text = "\t" * indentation_level + (
-                f"if ({self.split.print_c()}) {{\n" if type == 'c' else f"if {self.split.print_vhdl()} then\n")
+            parts = ["\t" * indentation_level + (
+                f"if ({self.split.print_c()}) {{\n" if type == 'c' else f"if {self.split.print_vhdl()} then\n")]
 
-        text += f"{self.children[0].print_if_then_else(indentation_level + 1, type)}\n"
+        parts += [(self.children[0], indentation_level + 1), "\n"]
         if type == 'c':
-            text += "\t" * indentation_level + "}\n"
+            parts.append("\t" * indentation_level + "}\n")
         for i in range(1, len(self.children)):
             if isinstance(self.split, CategoricalMultiSplit):
                 disjunction = " || ".join([
@@ -399,13 +661,12 @@ class Node:
                     for j in range(len(self.split.value_groups[i]))
                 ])
                 c_text = f"else if ({disjunction}) {{\n"
-                text += "\t" * indentation_level + c_text
+                parts.append("\t" * indentation_level + c_text)
             else:
-                text += "\t" * indentation_level + ("else {\n" if type == 'c' else "else \n")
-            text += f"{self.children[i].print_if_then_else(indentation_level + 1, type)}\n"
-            text += "\t" * indentation_level + ("}\n" if type == 'c' else "end if;")
-
-        return text
+                parts.append("\t" * indentation_level + ("else {\n" if type == 'c' else "else \n"))
+            parts += [(self.children[i], indentation_level + 1), "\n"]
+            parts.append("\t" * indentation_level + ("}\n" if type == 'c' else "end if;"))
+        return parts
 
     def get_determinized_label(self):
         if isinstance(self.actual_label, list):
@@ -475,6 +736,63 @@ class Node:
         return f'y <= {str(label)};'
 
     def to_json_dict(self, y_metadata, variables=None, category_names=None):
+        result = None
+        # the stack contains (node, children list of the parent, edge label) triples
+        stack = [(self, None, None)]
+        while stack:
+            node, siblings, edge_label = stack.pop()
+            node_json = node.get_json_dict_without_children(y_metadata, variables, category_names)
+            if siblings is None:
+                result = node_json
+            else:
+                node_json.update({"edge_label": edge_label})
+                siblings.append(node_json)
+            if not node.is_leaf():
+                labels = node.get_json_edge_labels(category_names)
+                stack.extend((node.children[i], node_json["children"], labels[i])
+                             for i in reversed(range(len(node.children))))
+        return result
+
+    def write_json(self, file, y_metadata, variables=None, category_names=None):
+        """
+        Writes the JSON of to_json_dict to a file object, formatted like json.dumps with indent=4. The dict of every
+        node is encoded on its own, so that the nested dict of the whole subtree is never built.
+        """
+        def encode(value, indent):
+            # json.dumps does not output raw newlines inside values, so nested values can be indented like this
+            return json.dumps(value, indent=4, default=util.convert).replace('\n', '\n' + indent)
+
+        writer = util.ChunkedWriter(file)
+        # the stack contains strings to output and (node, edge label, indentation) triples to print
+        stack = [(self, None, '')]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                writer.write(item)
+                continue
+            node, edge_label, indent = item
+            node_json = node.get_json_dict_without_children(y_metadata, variables, category_names)
+            inner = indent + '    '
+            parts = ['{\n', f'{inner}"actual_label": {encode(node_json["actual_label"], inner)},\n',
+                     f'{inner}"children": ']
+            if node.is_leaf():
+                parts.append('[]')
+            else:
+                labels = node.get_json_edge_labels(category_names)
+                child_indent = inner + '    '
+                parts.append('[\n')
+                for i, child in enumerate(node.children):
+                    parts += [child_indent, (child, labels[i], child_indent),
+                              ',\n' if i < len(node.children) - 1 else '\n']
+                parts.append(f'{inner}]')
+            parts.append(f',\n{inner}"split": {encode(node_json["split"], inner)}')
+            if edge_label is not None:
+                parts.append(f',\n{inner}"edge_label": {encode(edge_label, inner)}')
+            parts.append(f'\n{indent}}}')
+            stack.extend(reversed(parts))
+        writer.flush()
+
+    def get_json_dict_without_children(self, y_metadata, variables, category_names):
         if self.is_leaf():
             text_label = None
             if self.actual_label is not None:
@@ -487,30 +805,24 @@ class Node:
                 "children": [],
                 "split": None
             }
-
-        if isinstance(self.split, CategoricalMultiSplit):
-            names = None
-            if category_names and self.split.feature in category_names:
-                names = category_names[self.split.feature]
-            labels = []
-            for group in self.split.value_groups:
-                if len(group) == 1:
-                    label = group[0] if not names else names[group[0]]
-                    labels.append([label])
-                else:
-                    str_group = group if not names else [names[v] for v in group]
-                    labels.append(str_group)
-        else:
-            labels = ['true', 'false']
-
-        children = []
-        for i, child in enumerate(self.children):
-            child_json = child.to_json_dict(y_metadata, variables=variables, category_names=category_names)
-            child_json.update({"edge_label": labels[i]})
-            children.append(child_json)
-
         return {
             "actual_label": None,
-            "children": children,
+            "children": [],
             "split": self.split.to_json_dict(variables=variables, category_names=category_names)
         }
+
+    def get_json_edge_labels(self, category_names):
+        if not isinstance(self.split, CategoricalMultiSplit):
+            return ['true', 'false']
+        names = None
+        if category_names and self.split.feature in category_names:
+            names = category_names[self.split.feature]
+        labels = []
+        for group in self.split.value_groups:
+            if len(group) == 1:
+                label = group[0] if not names else names[group[0]]
+                labels.append([label])
+            else:
+                str_group = group if not names else [names[v] for v in group]
+                labels.append(str_group)
+        return labels
@@ -26,15 +26,16 @@ class MaxFreqDeterminizer(Determinizer):
 
     @staticmethod
     def get_max_freq_labels(labels):
+        """
+        Chooses the most frequent label of every row, taking the first of the labels with the highest count.
+        :param labels: 2d array of labels padded with -1
+        """
         label_counts = MaxFreqDeterminizer.get_label_counts(labels)
-        new_labels = []
-        for i in range(len(labels)):
-            current = labels[i]
-            current = current[current != -1]
-            max_label = max(list(current), key=lambda l: label_counts[l])
-            assert max_label != -1
-            new_labels.append(max_label)
-        return np.array(new_labels)
+        # -1 indexes the last count, but is masked anyway
+        counts = np.where(labels != -1, label_counts[labels], -1)
+        max_labels = labels[np.arange(len(labels)), np.argmax(counts, axis=1)]
+        assert (max_labels != -1).all()
+        return max_labels
 
     def is_pre_split(self):
         return self.pre_determinize
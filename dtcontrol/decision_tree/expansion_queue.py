@@ -0,0 +1,47 @@
+import heapq
+import itertools
+from collections import deque
+
+class ExpansionQueue:
+    """
+    Holds the nodes waiting to be expanded while a decision tree is built. The order of expansion is one of
+        'dfs': depth-first, expanding the nodes in the same order as a recursive construction
+        'bfs': breadth-first, expanding the tree level by level
+        'best-first': expanding the node whose chosen split has the lowest impurity first
+    For 'best-first', the split of a node has to be chosen before it is pushed, as its impurity is the priority.
+    """
+    ORDERS = ['dfs', 'bfs', 'best-first']
+
+    def __init__(self, order='dfs'):
+        if order not in self.ORDERS:
+            raise ValueError(f'Unknown expansion order {order}. Use one of {", ".join(self.ORDERS)}.')
+        self.order = order
+        self.entries = deque() if order == 'bfs' else []
+        self.counter = itertools.count()  # breaks ties in the order of insertion
+
+    def is_best_first(self):
+        return self.order == 'best-first'
+
+    def push(self, entries, priorities=None):
+        """
+        :param entries: the entries in the order of the children they belong to
+        :param priorities: the impurities of the chosen splits, only used for 'best-first'
+        """
+        if self.order == 'dfs':
+            # the first child has to be on top of the stack
+            self.entries.extend(reversed(entries))
+        elif self.order == 'bfs':
+            self.entries.extend(entries)
+        else:
+            for entry, priority in zip(entries, priorities):
+                heapq.heappush(self.entries, (priority, next(self.counter), entry))
+
+    def pop(self):
+        if self.order == 'dfs':
+            return self.entries.pop()
+        elif self.order == 'bfs':
+            return self.entries.popleft()
+        return heapq.heappop(self.entries)[2]
+
+    def __len__(self):
+        return len(self.entries)
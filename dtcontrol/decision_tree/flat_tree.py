@@ -0,0 +1,120 @@
+from collections import deque
+
+import numpy as np
+
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit
+from dtcontrol.decision_tree.splitting.categorical_single import CategoricalSingleSplit
+from dtcontrol.decision_tree.splitting.linear_split import LinearSplit
+
+LEAF = -1
+AXIS_ALIGNED = 0
+LINEAR = 1
+CATEGORICAL_SINGLE = 2
+OTHER = 3  # e.g. categorical multi, polynomial and richer domain splits
+
+
+class FlatTree:
+    """
+    An array representation of a decision tree, used to predict many examples at once.
+
+    Nodes are numbered in breadth-first order, the root being node 0. For node i:
+        kind[i]:        the kind of split (one of the constants above) or LEAF
+        feature[i]:     the feature of an axis aligned or categorical single split
+        threshold[i]:   the threshold of an axis aligned split or the value of a categorical single split
+        children[i]:    the child indices, padded with -1 (splits can have more than two children)
+        leaf_index[i]:  the row of a leaf in the label tables index_labels and actual_labels
+        splits[i]:      the split object of nodes of kind LINEAR and OTHER, which are evaluated with Split.predict_batch
+                        for all examples at the node at once. Linear splits are not turned into a coefficient matrix,
+                        as a different order of summation could send examples on the hyperplane to the other side.
+    """
+
+    def __init__(self, root):
+        nodes = []
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            nodes.append(node)
+            queue.extend(node.children)
+
+        num_nodes = len(nodes)
+        self.kind = np.full(num_nodes, LEAF)
+        self.feature = np.zeros(num_nodes, dtype=int)
+        self.threshold = np.zeros(num_nodes)
+        self.children = np.full((num_nodes, max(len(node.children) for node in nodes)), -1)
+        self.leaf_index = np.full(num_nodes, -1)
+        self.splits = [None] * num_nodes
+        index_labels = []
+        actual_labels = []
+
+        next_child = 1
+        for i, node in enumerate(nodes):
+            if node.is_leaf():
+                self.leaf_index[i] = len(index_labels)
+                index_labels.append(node.index_label)
+                actual_labels.append(node.actual_label)
+                continue
+            self.children[i, :len(node.children)] = np.arange(next_child, next_child + len(node.children))
+            next_child += len(node.children)
+            split = node.split
+            if isinstance(split, AxisAlignedSplit):
+                self.kind[i] = AXIS_ALIGNED
+                self.feature[i] = split.feature
+                self.threshold[i] = split.threshold
+            elif isinstance(split, CategoricalSingleSplit):
+                self.kind[i] = CATEGORICAL_SINGLE
+                self.feature[i] = split.feature
+                self.threshold[i] = split.value
+            elif isinstance(split, LinearSplit):
+                self.kind[i] = LINEAR
+                self.splits[i] = split
+            else:
+                self.kind[i] = OTHER
+                self.splits[i] = split
+
+        self.index_labels = self.to_object_array(index_labels)
+        self.actual_labels = self.to_object_array(actual_labels)
+
+    @staticmethod
+    def to_object_array(labels):
+        # labels can be tuples or lists, which must not be turned into additional array dimensions
+        array = np.empty(len(labels), dtype=object)
+        for i, label in enumerate(labels):
+            array[i] = label
+        return array
+
+    def predict_leaves(self, x):
+        """
+        Routes all examples through the tree at once, one level per iteration.
+        :param x: the examples of shape (num_examples, num_features)
+        :returns: the index of the leaf (in the label tables) every example ends up in
+        """
+        x = np.asarray(x)
+        nodes = np.zeros(len(x), dtype=int)
+        active = np.arange(len(x)) if self.kind[0] != LEAF else np.arange(0)
+        while len(active) > 0:
+            current = nodes[active]
+            kinds = self.kind[current]
+            branches = np.zeros(len(active), dtype=int)
+
+            selected = kinds == AXIS_ALIGNED
+            if selected.any():
+                rows, split_nodes = active[selected], current[selected]
+                branches[selected] = ~(x[rows, self.feature[split_nodes]] <= self.threshold[split_nodes])
+
+            selected = kinds == CATEGORICAL_SINGLE
+            if selected.any():
+                rows, split_nodes = active[selected], current[selected]
+                branches[selected] = ~(x[rows, self.feature[split_nodes]] == self.threshold[split_nodes])
+
+            selected = np.flatnonzero((kinds == LINEAR) | (kinds == OTHER))
+            for node in np.unique(current[selected]):
+                at_node = selected[current[selected] == node]
+                branches[at_node] = self.splits[node].predict_batch(x[active[at_node]])
+
+            nodes[active] = self.children[current, branches]
+            active = active[self.kind[nodes[active]] != LEAF]
+        return self.leaf_index[nodes]
+
+    def predict(self, x, actual_values=True):
+        labels = self.actual_labels if actual_values else self.index_labels
+        return list(labels[self.predict_leaves(x)])
@@ -8,10 +8,10 @@ from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import Dete
 
 class AUROC(DeterminizingImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
         scores = []
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset_labels = self.determinizer.determinize(dataset.from_mask_optimized(mask))
             scores.append(self.calculate_auroc(dataset.x[mask], subset_labels))
         if any([s == 0 for s in scores]):
@@ -7,3 +7,15 @@ class DeterminizingImpurityMeasure(ImpurityMeasure, ABC):
 
     def __init__(self, determinizer=LabelPowersetDeterminizer()):
         self.determinizer = determinizer
+
+    def get_determinized_count_labels(self, dataset):
+        """
+        Returns the determinized labels of the dataset as a column vector if the determinizer does not depend on the
+        subset it is applied to, i.e. if it uses the pre-split optimization. Otherwise returns None.
+        """
+        if not self.determinizer.is_pre_split():
+            return None
+        labels = self.determinizer.pre_determinized_labels
+        if labels is None:
+            labels = self.determinizer.determinize(dataset)
+        return labels.reshape(-1, 1)
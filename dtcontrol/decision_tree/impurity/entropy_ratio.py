@@ -6,8 +6,8 @@ from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import Dete
 
 class EntropyRatio(DeterminizingImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if any(np.all(mask == False) for mask in split.get_masks(dataset)) or \
-                len(split.get_masks(dataset)) == 1:
+        if any(np.all(mask == False) for mask in split.get_cached_masks(dataset)) or \
+                len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
 
         split_entropy = self.calculate_split_entropy(dataset, split)
@@ -16,7 +16,7 @@ class EntropyRatio(DeterminizingImpurityMeasure):
 
     def calculate_split_entropy(self, dataset, split):
         entropy = 0
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset_labels = self.determinizer.determinize(dataset.from_mask_optimized(mask))
             entropy += (len(subset_labels) / len(dataset)) * EntropyRatio.calculate_entropy(subset_labels)
         assert entropy >= 0
@@ -31,7 +31,7 @@ class EntropyRatio(DeterminizingImpurityMeasure):
 
     def calculate_split_info(self, dataset, split):
         info = 0
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset_labels = self.determinizer.determinize(dataset.from_mask_optimized(mask))
             info -= (len(subset_labels) / len(dataset)) * np.log2((len(subset_labels) / len(dataset)))
         assert info > 0
@@ -6,10 +6,10 @@ from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import Dete
 
 class GiniIndex(DeterminizingImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
         impurity = 0
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset_labels = self.determinizer.determinize(dataset.from_mask_optimized(mask))
             if len(subset_labels) == 0:
                 return sys.maxsize
@@ -23,5 +23,25 @@ class GiniIndex(DeterminizingImpurityMeasure):
         probabilities = [len(y[y == label]) / num_labels for label in unique]
         return 1 - sum(prob * prob for prob in probabilities)
 
+    def get_count_labels(self, dataset):
+        return self.get_determinized_count_labels(dataset)
+
+    def calculate_impurities_from_counts(self, left_counts, left_sizes, right_counts, right_sizes):
+        num_examples = left_sizes + right_sizes
+        return (left_sizes / num_examples) * self.calculate_gini_indices(left_counts, left_sizes) + \
+               (right_sizes / num_examples) * self.calculate_gini_indices(right_counts, right_sizes)
+
+    @staticmethod
+    def calculate_gini_indices(counts, sizes):
+        """
+        Vectorized version of calculate_gini_index, working on the label counts of many subsets at once.
+        """
+        squared_sum = np.zeros(len(counts))
+        # summing up label by label keeps the floating point results identical to calculate_gini_index
+        for label_counts in counts.T:
+            prob = label_counts / sizes
+            squared_sum += np.where(label_counts > 0, prob * prob, 0)
+        return 1 - squared_sum
+
     def get_oc1_name(self):
         return 'gini_index'
@@ -1,6 +1,12 @@
+import sys
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 class ImpurityMeasure(ABC):
+    # the maximum number of mask entries gathered at once when counting the labels of many splits
+    MAX_BLOCK_COUNTS = 2 ** 20
+
     @abstractmethod
     def calculate_impurity(self, dataset, split):
         """
@@ -10,9 +16,90 @@ class ImpurityMeasure(ABC):
         """
         pass
 
+    def calculate_impurities(self, dataset, left_masks):
+        """
+        Computes the impurities of many binary splits at once. If the impurity measure supports counts, the label counts
+        of the left subsets are computed for blocks of splits at once, with at most MAX_BLOCK_COUNTS mask entries per
+        block, and all splits are scored with calculate_impurities_from_counts. Otherwise calculate_impurity is called
+        for every split, but the masks are still computed only once.
+        :param dataset: the training data at the current node
+        :param left_masks: a boolean array of shape (num_splits, num_examples) containing the mask of the left subset of
+                           every split; the right subsets are the complements
+        :returns: an array of shape (num_splits,) containing the impurity of every split
+        """
+        left_masks = np.asarray(left_masks, dtype=bool).reshape(-1, len(dataset))
+        labels = self.get_count_labels(dataset) if self.supports_counts() else None
+        if labels is None:
+            return np.array([self.calculate_impurity(dataset, PrecomputedSplit(mask)) for mask in left_masks])
+
+        flattened_labels = labels.flatten()
+        valid = flattened_labels != -1  # -1 is only a filler
+        label_rows = np.repeat(np.arange(len(labels)), labels.shape[1])[valid]
+        unique_labels, label_indices = np.unique(flattened_labels[valid], return_inverse=True)
+        num_labels = len(unique_labels)
+        # the labels are grouped by their index, so that the count of a label is the sum over a contiguous range of
+        # the gathered mask columns
+        order = np.argsort(label_indices, kind='stable')
+        sorted_rows = label_rows[order]
+        starts = np.searchsorted(label_indices[order], np.arange(num_labels))
+        left_counts = np.empty((len(left_masks), num_labels), dtype=int)
+        block_size = max(1, self.MAX_BLOCK_COUNTS // len(sorted_rows))
+        for start in range(0, len(left_masks), block_size):
+            block = left_masks[start:start + block_size, sorted_rows]
+            left_counts[start:start + block_size] = np.add.reduceat(block, starts, axis=1, dtype=int)
+        right_counts = np.bincount(label_indices, minlength=num_labels) - left_counts
+        left_sizes = left_masks.sum(axis=1)
+        right_sizes = len(dataset) - left_sizes
+        empty = (left_sizes == 0) | (right_sizes == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            impurities = self.calculate_impurities_from_counts(left_counts, left_sizes, right_counts, right_sizes)
+        # like calculate_impurity, splits with an empty side are never chosen
+        impurities[empty] = sys.maxsize
+        return impurities
+
+    def get_count_labels(self, dataset):
+        """
+        Returns the labels whose counts on either side of a binary split fully determine its impurity. Impurity
+        measures that cannot be computed from label counts alone return None.
+        :param dataset: the training data at the current node
+        :returns: an int array of shape (num_examples, k), where -1 is a filler, or None
+        """
+        return None
+
+    def supports_counts(self):
+        """
+        :returns: True if this impurity measure overrides calculate_impurities_from_counts
+        """
+        return type(self).calculate_impurities_from_counts is not ImpurityMeasure.calculate_impurities_from_counts
+
+    def calculate_impurities_from_counts(self, left_counts, left_sizes, right_counts, right_sizes):
+        """
+        Computes the impurities of many binary splits at once. Only supported if supports_counts returns True and
+        get_count_labels does not return None.
+        :param left_counts: array of shape (num_splits, num_labels) containing the label counts of the left subsets
+        :param left_sizes: array of shape (num_splits,) containing the number of examples in the left subsets
+        :param right_counts: the same as left_counts for the right subsets
+        :param right_sizes: the same as left_sizes for the right subsets
+        :returns: an array of shape (num_splits,) containing the impurity of every split
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not support count-based impurity calculation.')
+
     @abstractmethod
     def get_oc1_name(self):
         """
         :return: the string used to identify this impurity measure in OC1 or None if it doesn't support OC1
         """
         pass
+
+
+class PrecomputedSplit:
+    """
+    Stands in for a binary split whose left mask is already known, so that calculate_impurity can be used as a fallback
+    in calculate_impurities.
+    """
+
+    def __init__(self, left_mask):
+        self.left_mask = left_mask
+
+    def get_cached_masks(self, dataset):
+        return [self.left_mask, ~self.left_mask]
@@ -6,10 +6,10 @@ from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import Dete
 
 class MaxMinority(DeterminizingImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
         minorities = []
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset_labels = self.determinizer.determinize(dataset.from_mask_optimized(mask))
             if len(subset_labels) == 0:
                 return sys.maxsize
@@ -21,5 +21,13 @@ class MaxMinority(DeterminizingImpurityMeasure):
         label = np.bincount(y).argmax()
         return len(y[y != label])
 
+    def get_count_labels(self, dataset):
+        return self.get_determinized_count_labels(dataset)
+
+    def calculate_impurities_from_counts(self, left_counts, left_sizes, right_counts, right_sizes):
+        left_minorities = left_sizes - left_counts.max(axis=1)
+        right_minorities = right_sizes - right_counts.max(axis=1)
+        return np.maximum(left_minorities, right_minorities)
+
     def get_oc1_name(self):
         return 'maxminority'
@@ -18,7 +18,7 @@ class MinLabelEntropy(DeterminizingImpurityMeasure):
     for this split is 0 and we definitely select such a spilt.
     """ 
     def calculate_impurity(self, dataset, split):
-        masks = split.get_masks(dataset)
+        masks = split.get_cached_masks(dataset)
         if len(masks) == 1:
             return sys.maxsize
         if self.determinizer.pre_determinized_labels is not None:
@@ -12,3 +12,9 @@ class MultiLabelGiniIndex(MultiLabelImpurityMeasure):
 
     def calculate_impurity(self, dataset, split):
         return self.scaled_bincount.calculate_impurity(dataset, split)
+
+    def get_count_labels(self, dataset):
+        return self.scaled_bincount.get_count_labels(dataset)
+
+    def calculate_impurities_from_counts(self, left_counts, left_sizes, right_counts, right_sizes):
+        return self.scaled_bincount.calculate_impurities_from_counts(left_counts, left_sizes, right_counts, right_sizes)
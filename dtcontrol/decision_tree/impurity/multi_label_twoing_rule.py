@@ -6,12 +6,12 @@ from dtcontrol.decision_tree.impurity.multi_label_impurity_measure import MultiL
 
 class MultiLabelTwoingRule(MultiLabelImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
-        assert len(split.get_masks(dataset)) == 2
+        assert len(split.get_cached_masks(dataset)) == 2
         y = dataset.get_single_labels()
 
-        [left_mask, right_mask] = split.get_masks(dataset)
+        [left_mask, right_mask] = split.get_cached_masks(dataset)
         left = y[left_mask]
         left_flat = left.flatten()
         left_flat = left_flat[left_flat != -1]
@@ -9,11 +9,11 @@ class ScaledBincount(MultiLabelImpurityMeasure):
         self.scaling_function = scaling_function
 
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
         y = dataset.get_single_labels()
         impurity = 0
-        for mask in split.get_masks(dataset):
+        for mask in split.get_cached_masks(dataset):
             subset = y[mask, :]
             if len(subset) == 0:
                 return sys.maxsize
@@ -29,3 +29,25 @@ class ScaledBincount(MultiLabelImpurityMeasure):
         label_counts = label_counts[label_counts != 0].astype('float')
         label_counts = label_counts / len(y)
         return len(label_counts) - sum(self.scaling_function(label_counts))
+
+    def get_count_labels(self, dataset):
+        return dataset.get_single_labels()
+
+    def calculate_impurities_from_counts(self, left_counts, left_sizes, right_counts, right_sizes):
+        num_examples = left_sizes + right_sizes
+        return (left_sizes / num_examples) * self.calculate_scaled_bincounts(left_counts, left_sizes) + \
+               (right_sizes / num_examples) * self.calculate_scaled_bincounts(right_counts, right_sizes)
+
+    def calculate_scaled_bincounts(self, counts, sizes):
+        """
+        Vectorized version of calculate_scaled_bincount, working on the label counts of many subsets at once.
+        """
+        present = counts > 0
+        scaled_sum = np.zeros(len(counts))
+        # summing up label by label keeps the floating point results identical to calculate_scaled_bincount
+        for i in range(counts.shape[1]):
+            label_frequencies = np.where(present[:, i], counts[:, i] / sizes, 1)
+            scaled_sum += np.where(present[:, i], self.scaling_function(label_frequencies), 0)
+        scaled_bincounts = present.sum(axis=1) - scaled_sum
+        scaled_bincounts[np.any(counts == sizes[:, np.newaxis], axis=1)] = 0
+        return scaled_bincounts
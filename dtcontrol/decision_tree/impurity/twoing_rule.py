@@ -6,10 +6,10 @@ from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import Dete
 
 class TwoingRule(DeterminizingImpurityMeasure):
     def calculate_impurity(self, dataset, split):
-        if len(split.get_masks(dataset)) == 1:
+        if len(split.get_cached_masks(dataset)) == 1:
             return sys.maxsize
-        assert len(split.get_masks(dataset)) == 2
-        [left_mask, right_mask] = split.get_masks(dataset)
+        assert len(split.get_cached_masks(dataset)) == 2
+        [left_mask, right_mask] = split.get_cached_masks(dataset)
         left = self.determinizer.determinize(dataset.from_mask_optimized(left_mask))
         right = self.determinizer.determinize(dataset.from_mask_optimized(right_mask))
         if len(left) == 0 or len(right) == 0:
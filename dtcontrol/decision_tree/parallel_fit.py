@@ -0,0 +1,191 @@
+import copy
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from dtcontrol.decision_tree.splitting.context_aware.context_aware_splitting_strategy import \
+    ContextAwareSplittingStrategy
+
+
+# the state of a worker process, set by init_worker
+worker_state = {}
+
+
+class SubtreeCollector:
+    """
+    Stops the construction of subtrees with at least num_examples examples inside a worker, so that they are scheduled
+    as separate tasks instead.
+    """
+
+    def __init__(self, num_examples):
+        self.num_examples = num_examples
+        self.indices = {}  # maps the ids of the collected nodes to the indices of their examples
+
+    def collect(self, node, dataset):
+        if len(dataset) < self.num_examples:
+            return False
+        self.indices[id(node)] = dataset.indices
+        return True
+
+
+class ParallelFit:
+    """
+    Builds a decision tree on a process pool. Every task splits a node in a worker process and builds all subtrees with
+    less than num_examples examples in the same worker. The larger subtrees are returned unbuilt and scheduled as new
+    tasks, so that all workers are busy once the tree has become wide enough.
+
+    The statistics of the root dataset are computed once before the arrays of the dataset are copied into shared memory,
+    so that the workers do not compute them again and the tasks only contain the indices of their examples. Workers
+    return their subtrees in a compact preorder representation, which is grafted into the tree.
+    """
+
+    def __init__(self, node_class, builder, num_jobs, num_examples):
+        """
+        :param node_class: the class of the nodes to build
+        :param builder: the NodeBuilder shared by the nodes
+        :param num_jobs: the number of worker processes
+        :param num_examples: the minimum number of examples of a subtree to be scheduled as a separate task
+        """
+        self.node_class = node_class
+        self.builder = builder
+        self.num_jobs = num_jobs
+        self.num_examples = num_examples
+
+    def fit(self, root, dataset, **kwargs):
+        shared_root = dataset.root if dataset.is_view() else dataset
+        indices = dataset.indices if dataset.is_view() else np.arange(len(dataset))
+        compute_root_statistics(shared_root, self.builder)
+        shell, shared_arrays = share_dataset(shared_root)
+        with ProcessPoolExecutor(self.num_jobs, initializer=init_worker,
+                                 initargs=(shell, shared_arrays, self.node_class, self.builder, self.num_examples,
+                                           kwargs)) as executor:
+            futures = {executor.submit(fit_subtree, indices, root.depth, []): (root, [])}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, ancestors = futures.pop(future)
+                    compact_subtree, collected_indices = future.result()
+                    collected = self.graft(node, ancestors, compact_subtree)
+                    for (child, child_ancestors), child_indices in zip(collected, collected_indices):
+                        futures[executor.submit(fit_subtree, child_indices, child.depth, child_ancestors)] = \
+                            (child, child_ancestors)
+        root.update_num_nodes()
+
+    def graft(self, node, ancestors, compact_subtree):
+        """
+        Rebuilds a subtree from its compact representation (see compact) below the given node.
+        :returns: a list of the collected (unbuilt) nodes together with their ancestor splits
+        """
+        collected = []
+        stack = [(node, ancestors)]
+        for split, index_label, actual_label, num_nodes, num_children, is_collected in compact_subtree:
+            node, ancestors = stack.pop()
+            if is_collected:
+                collected.append((node, ancestors))
+                continue
+            node.split = split
+            node.index_label = index_label
+            node.actual_label = actual_label
+            node.num_nodes = num_nodes
+            node.children = [self.node_class(self.builder, node.depth + 1) for _ in range(num_children)]
+            stack.extend((child, ancestors + [split]) for child in reversed(node.children))
+        return collected
+
+
+def compute_root_statistics(dataset, builder):
+    """
+    Computes the label representations and statistics that views select from their root dataset (see
+    Dataset.get_label_row_ids), so that they are shared with the other arrays instead of being computed by every worker.
+    """
+    dataset.get_single_labels()
+    dataset.get_unique_labels()
+    dataset.get_label_row_ids()
+    dataset.is_x_constant()
+    if builder.use_label_bitsets:
+        dataset.get_label_bitsets()
+
+
+def share_dataset(dataset):
+    """
+    Copies the numpy arrays of a dataset into shared memory.
+    :returns: a shallow copy of the dataset without these arrays and a dict mapping the attribute names to the shared
+              buffers, dtypes and shapes
+    """
+    shell = copy.copy(dataset)
+    shell.extension_to_loader = {}  # the loaders keep references to the loaded arrays
+    shared_arrays = {}
+    for name, value in vars(dataset).items():
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            buffer = multiprocessing.RawArray('B', max(value.nbytes, 1))
+            shared = np.frombuffer(buffer, dtype=value.dtype, count=value.size).reshape(value.shape)
+            shared[...] = value
+            shared_arrays[name] = (buffer, value.dtype, value.shape)
+            setattr(shell, name, None)
+    return shell, shared_arrays
+
+
+def init_worker(shell, shared_arrays, node_class, builder, num_examples, kwargs):
+    for name, (buffer, dtype, shape) in shared_arrays.items():
+        setattr(shell, name, np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape))).reshape(shape))
+    worker_state['dataset'] = shell
+    worker_state['node_class'] = node_class
+    worker_state['builder'] = builder
+    worker_state['num_examples'] = num_examples
+    worker_state['kwargs'] = kwargs  # the keyword arguments of fit are the same for all tasks
+
+
+def fit_subtree(indices, depth, ancestors):
+    """
+    Builds the subtree of the examples with the given indices in a worker process.
+    :param ancestors: the splits on the path from the root to the subtree, which context-aware strategies may inspect
+    :returns: the compact subtree and the indices of the examples of every collected node
+    """
+    node_class = worker_state['node_class']
+    collector = SubtreeCollector(worker_state['num_examples'])
+    builder = copy.copy(worker_state['builder'])
+    builder.subtree_collector = collector
+    node = node_class(builder, depth)
+    root = node
+    for split in reversed(ancestors):
+        parent = node_class(builder)
+        parent.split = split
+        parent.children = [root]
+        root = parent
+    for strategy in builder.splitting_strategies:
+        if isinstance(strategy, ContextAwareSplittingStrategy):
+            strategy.set_root(root)
+            strategy.set_current_node(node if ancestors else None)
+    node.fit(worker_state['dataset'].from_mask(indices), **worker_state['kwargs'])
+    compact_subtree = compact(node, collector)
+    collected_indices = [collector.indices[id(n)] for n in collected_nodes(node, collector)]
+    return compact_subtree, collected_indices
+
+
+def compact(node, collector):
+    """
+    :returns: the subtree as a preorder list of (split, index_label, actual_label, num_nodes, num_children,
+              is_collected) tuples
+    """
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if id(node) in collector.indices:
+            result.append((None, None, None, 0, 0, True))
+            continue
+        result.append((node.split, node.index_label, node.actual_label, node.num_nodes, len(node.children), False))
+        stack.extend(reversed(node.children))
+    return result
+
+
+def collected_nodes(node, collector):
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if id(node) in collector.indices:
+            result.append(node)
+            continue
+        stack.extend(reversed(node.children))
+    return result
@@ -1,27 +1,123 @@
+import numpy as np
+
 from dtcontrol.decision_tree.splitting.split import Split
 from dtcontrol.decision_tree.splitting.splitting_strategy import SplittingStrategy
 
 
 class AxisAlignedSplittingStrategy(SplittingStrategy):
+    # the maximum number of label counts (when sweeping) or mask entries held in memory at once
+    MAX_BLOCK_COUNTS = 2 ** 20
+
+    def __init__(self, sweep=True):
+        """
+        :param sweep: if True and the impurity measure can be computed from label counts, every feature is sorted once
+        and all thresholds are scored in one vectorized pass using cumulative label counts
+        """
+        super().__init__()
+        self.sweep = sweep
+
     def find_split(self, dataset, impurity_measure, **kwargs):
+        if self.sweep and impurity_measure.supports_counts():
+            labels = impurity_measure.get_count_labels(dataset)
+            if labels is not None:
+                return self.find_split_by_sweep(dataset, impurity_measure, labels)
+
         x_numeric = dataset.get_numeric_x()
-        splits = {}
+        block_size = max(1, self.MAX_BLOCK_COUNTS // max(len(dataset), 1))
+        best_impurity = None
+        best_split = None
         for feature in range(x_numeric.shape[1]):
             values = sorted(set(x_numeric[:, feature]))
-            for i in range(len(values) - 1):
-                threshold = (values[i] + values[i + 1]) / 2
-                real_feature = dataset.map_numeric_feature_back(feature)
-                split = AxisAlignedSplit(real_feature, threshold, self.priority)
-                splits[split] = impurity_measure.calculate_impurity(dataset, split)
-        if not splits:
+            thresholds = [(values[i] + values[i + 1]) / 2 for i in range(len(values) - 1)]
+            # the masks of all thresholds of a block are scored with one call of calculate_impurities
+            for start in range(0, len(thresholds), block_size):
+                block = thresholds[start:start + block_size]
+                left_masks = np.array([x_numeric[:, feature] <= threshold for threshold in block])
+                impurities = impurity_measure.calculate_impurities(dataset, left_masks)
+                # the first minimum is taken in order to break ties in the order of the thresholds
+                i = np.argmin(impurities)
+                if best_impurity is None or impurities[i] < best_impurity:
+                    best_impurity = impurities[i]
+                    best_split = AxisAlignedSplit(dataset.map_numeric_feature_back(feature), block[i], self.priority)
+        return best_split
+
+    def find_split_by_sweep(self, dataset, impurity_measure, labels):
+        """
+        Finds the same split as the exhaustive search, but sorts every feature only once and computes the label counts
+        on both sides of all thresholds with a cumulative sum over the groups of equal feature values. The groups are
+        processed in blocks of at most MAX_BLOCK_COUNTS label counts, carrying the left counts from block to block, so
+        that the memory needed does not grow with the product of the numbers of groups and labels.
+        :param labels: the labels returned by impurity_measure.get_count_labels
+        """
+        x_numeric = dataset.get_numeric_x()
+        num_examples = x_numeric.shape[0]
+        flattened_labels = labels.flatten()
+        valid = flattened_labels != -1  # -1 is only a filler
+        label_rows = np.repeat(np.arange(num_examples), labels.shape[1])[valid]
+        unique_labels, label_indices = np.unique(flattened_labels[valid], return_inverse=True)
+        num_labels = len(unique_labels)
+        total_counts = np.bincount(label_indices, minlength=num_labels)
+        block_size = max(1, self.MAX_BLOCK_COUNTS // num_labels)
+
+        best_impurity = None
+        best_candidate = None
+        for feature in range(x_numeric.shape[1]):
+            order = np.argsort(x_numeric[:, feature], kind='stable')
+            sorted_values = x_numeric[order, feature]
+            # boundaries[i] is the number of examples left of the i-th threshold
+            boundaries = np.flatnonzero(sorted_values[1:] != sorted_values[:-1]) + 1
+            if len(boundaries) == 0:
+                continue
+            is_group_start = np.zeros(num_examples, dtype=int)
+            is_group_start[boundaries] = 1
+            row_to_group = np.empty(num_examples, dtype=int)
+            row_to_group[order] = np.cumsum(is_group_start)
+            label_groups = row_to_group[label_rows]
+            if len(boundaries) > block_size:
+                # sort the labels by group, so that the labels of every block are a contiguous slice
+                label_order = np.argsort(label_groups, kind='stable')
+                label_groups = label_groups[label_order]
+                block_labels = label_indices[label_order]
+            else:
+                block_labels = label_indices
+
+            running_counts = np.zeros(num_labels, dtype=int)
+            for start in range(0, len(boundaries), block_size):
+                # the thresholds start, ..., end - 1 lie right of the groups with the same indices
+                end = min(start + block_size, len(boundaries))
+                if len(boundaries) > block_size:
+                    first, last = np.searchsorted(label_groups, [start, end])
+                    groups, indices = label_groups[first:last], block_labels[first:last]
+                else:
+                    groups, indices = label_groups, block_labels
+                in_block = groups < end
+                group_counts = np.bincount((groups[in_block] - start) * num_labels + indices[in_block],
+                                           minlength=(end - start) * num_labels).reshape(end - start, num_labels)
+                left_counts = running_counts + np.cumsum(group_counts, axis=0)
+                running_counts = left_counts[-1]
+                right_counts = total_counts - left_counts
+                block_boundaries = boundaries[start:end]
+                impurities = impurity_measure.calculate_impurities_from_counts(left_counts, block_boundaries,
+                                                                               right_counts,
+                                                                               num_examples - block_boundaries)
+                # the first minimum is taken in order to break ties exactly like the exhaustive search
+                i = np.argmin(impurities)
+                if best_impurity is None or impurities[i] < best_impurity:
+                    best_impurity = impurities[i]
+                    best_candidate = (feature, sorted_values[block_boundaries[i] - 1],
+                                      sorted_values[block_boundaries[i]])
+
+        if best_candidate is None:
             return None
-        return min(splits.keys(), key=splits.get)
+        feature, lower, upper = best_candidate
+        return AxisAlignedSplit(dataset.map_numeric_feature_back(feature), (lower + upper) / 2, self.priority)
 
 
 class AxisAlignedSplit(Split):
     """
     Represents an axis aligned split of the form x[i] <= b.
     """
+    __slots__ = ('feature', 'threshold')
 
     def __init__(self, feature, threshold, priority=1):
         super().__init__()
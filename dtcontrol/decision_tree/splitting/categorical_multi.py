@@ -69,6 +69,8 @@ class CategoricalMultiSplittingStrategy(SplittingStrategy):
 
 
 class CategoricalMultiSplit(Split):
+    __slots__ = ('feature', 'value_groups')
+
     def __init__(self, feature, value_groups=None):
         super().__init__()
         self.feature = feature
@@ -83,6 +85,13 @@ class CategoricalMultiSplit(Split):
                 return i
         assert False
 
+    def predict_batch(self, x):
+        children = np.full(len(x), -1)
+        for i in reversed(range(len(self.value_groups))):
+            children[np.isin(x[:, self.feature], self.value_groups[i])] = i
+        assert np.all(children != -1)
+        return children
+
     def get_masks(self, dataset):
         if not self.value_groups:
             self.value_groups = [[v] for v in sorted(set(dataset.x[:, self.feature]))]
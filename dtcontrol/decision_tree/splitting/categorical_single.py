@@ -5,13 +5,13 @@ from dtcontrol.decision_tree.splitting.splitting_strategy import SplittingStrate
 class CategoricalSingleSplittingStrategy(SplittingStrategy):
     def find_split(self, dataset, impurity_measure, **kwargs):
         x_categorical = dataset.get_categorical_x()
-        splits = {}
+        candidates = []
         for feature in range(x_categorical.shape[1]):
             real_feature = dataset.map_categorical_feature_back(feature)
             for value in set(x_categorical[:, feature]):
-                split = CategoricalSingleSplit(real_feature, value)
-                splits[split] = impurity_measure.calculate_impurity(dataset, split)
+                candidates.append(CategoricalSingleSplit(real_feature, value))
 
+        splits = self.calculate_impurities(dataset, impurity_measure, candidates)
         if not splits:
             return None
         return min(splits.keys(), key=splits.get)
@@ -21,6 +21,7 @@ class CategoricalSingleSplit(Split):
     """
     A split of the form feature == value.
     """
+    __slots__ = ('feature', 'value')
 
     def __init__(self, feature, value):
         super().__init__()
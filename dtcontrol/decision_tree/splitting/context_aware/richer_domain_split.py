@@ -1,6 +1,6 @@
 import warnings
-from copy import deepcopy
 import uuid
+from functools import lru_cache
 from dtcontrol.decision_tree.splitting.split import Split
 import numpy as np
 import sympy as sp
@@ -45,6 +45,9 @@ class RicherDomainSplit(Split):
         # Helper attributes used to speedup get_mask()
         self.get_mask_lookup = None
 
+        # (coef_assignment, compiled term) used inside predict() and get_masks(), see get_assigned_function()
+        self.assigned_function = None
+
         # logger
         self.logger = RicherDomainLogger("RicherDomainSplit_logger", debug)
 
@@ -54,6 +57,65 @@ class RicherDomainSplit(Split):
     def __repr__(self):
         return "RicherDomainSplit: " + str(self.term) + " " + str(self.relation) + " 0"
 
+    def __getstate__(self):
+        # compiled functions can not be pickled, they are compiled again when needed
+        state = super().__getstate__()
+        state['assigned_function'] = None
+        return state
+
+    @staticmethod
+    def symbol_index(symbol):
+        """
+        :return: the index of a column reference or coef, e.g. 3 for x_3 or c_3
+        """
+        return int(str(symbol).split("_")[1])
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile_term(term, coefs):
+        """
+        Compiles a term to NumPy functions which evaluate it for all rows of x at once. Compiled terms are cached, so
+        that every predicate (with a specific combination of fixed coefs) is only compiled once.
+        :param term: sympy expression over column references x_i and the coefs in coefs
+        :param coefs: tuple of the coefs which stay parameters of the compiled functions
+        :return: (function, jacobian) with the signature f(x, *coef_values), where x holds all columns of the dataset.
+                 function returns the term for every row of x (shape (n,)), jacobian the partial derivatives by the
+                 coefs (shape (n, len(coefs))).
+
+            e.g.
+            term = c_0 * x_1 + c_1; coefs = (c_0, c_1)
+            --> function(x, 2, 3) = 2 * x[:, 1] + 3
+            --> jacobian(x, 2, 3) = [x[:, 1], 1]
+        """
+        columns = sorted((symbol for symbol in term.free_symbols if symbol not in coefs), key=RicherDomainSplit.symbol_index)
+        used_args_index = [RicherDomainSplit.symbol_index(column) for column in columns]
+        args = columns + list(coefs)
+        term_function = sp.lambdify(args, term, "numpy")
+        derivative_functions = [sp.lambdify(args, sp.diff(term, coef), "numpy") for coef in coefs]
+
+        def evaluate(f, x, coef_values):
+            # constant terms evaluate to a scalar
+            result = np.asarray(f(*x[:, used_args_index].T, *coef_values), dtype=float)
+            return result if result.shape == (x.shape[0],) else np.full(x.shape[0], result)
+
+        def function(x, *coef_values):
+            return evaluate(term_function, x, coef_values)
+
+        def jacobian(x, *coef_values):
+            return np.column_stack([evaluate(f, x, coef_values) for f in derivative_functions])
+
+        return function, jacobian
+
+    def get_assigned_function(self):
+        """
+        :return: the compiled term with self.coef_assignment substituted, see compile_term()
+        """
+        if self.assigned_function is None or self.assigned_function[0] != self.coef_assignment:
+            term = self.term.subs(self.coef_assignment) if self.coef_assignment is not None else self.term
+            function, _ = RicherDomainSplit.compile_term(term, ())
+            self.assigned_function = (list(self.coef_assignment) if self.coef_assignment is not None else None, function)
+        return self.assigned_function[1]
+
     def helper_str(self):
         return str(self.term) + " " + str(self.relation) + " 0"
 
@@ -140,7 +202,7 @@ class RicherDomainSplit(Split):
             raise RicherDomainSplitException("Aborting: invalid structure of arguments x, y. Check logger or comments for more information.")
 
         # Checking structure of fixed_coefs
-        self.coefs_to_determine = sorted(self.coef_interval, key=lambda x: int(str(x).split("_")[1]))
+        self.coefs_to_determine = sorted(self.coef_interval, key=RicherDomainSplit.symbol_index)
         for (c_i, _) in fixed_coefs:
             if c_i not in self.coef_interval:
                 # Checking if fixed_coefs are valid (every fixed coef must appear inside coef_interval)
@@ -170,11 +232,9 @@ class RicherDomainSplit(Split):
             else:
                 method = 'lm'
 
-        term_copy = deepcopy(self.term)
-
         # Substitution of already fixed coefs in Term (important to improve performance)
-        if fixed_coefs:
-            self.term = self.term.subs(fixed_coefs)
+        term = self.term.subs(fixed_coefs) if fixed_coefs else self.term
+        function, jacobian = RicherDomainSplit.compile_term(term, tuple(self.coefs_to_determine))
 
         # initial guess is very important since otherwise, curve_fit doesn't know how many coefs to fit
         inital_guess = [1. for coef in self.coefs_to_determine]
@@ -185,45 +245,13 @@ class RicherDomainSplit(Split):
 
         # adapter function representing the term (for curve_fit usage)
         def adapter_function(x, *args):
-            out = []
-            subs_list = []
-
-            for i in range(len(args)):
-                subs_list.append((self.coefs_to_determine[i], args[i]))
-            new_term = self.term.subs(subs_list)
-
-            args = sorted(new_term.free_symbols, key=lambda x: int(str(x).split("_")[1]))
-            func = sp.lambdify(args, new_term)
-            used_args_index = [int(str(i).split("_")[1]) for i in args]
-            data = x[:, used_args_index]
-
-            for row in data:
-                result = func(*row)
-                out.append(result)
+            out = function(x, *args)
 
             self.y = out
-            self.coef_fit = subs_list
-            for index in range(len(out)):
-                # Checking the offset
-                if self.relation == "<=":
-                    if not ((out[index] <= 0 and y[index] <= 0) or (out[index] > 0 and y[index] > 0)):
-                        return np.array(out)
-                elif self.relation == ">=":
-                    if not ((out[index] >= 0 and y[index] >= 0) or (out[index] < 0 and y[index] < 0)):
-                        return np.array(out)
-                elif self.relation == ">":
-                    if not ((out[index] > 0 and y[index] > 0) or (out[index] <= 0 and y[index] <= 0)):
-                        return np.array(out)
-                elif self.relation == "<":
-                    if not ((out[index] < 0 and y[index] < 0) or (out[index] >= 0 and y[index] >= 0)):
-                        return np.array(out)
-                elif self.relation == "=":
-                    if not ((out[index] == 0 and y[index] == 0) or (out[index] != 0 and y[index] != 0)):
-                        return np.array(out)
-                else:
-                    self.logger.root_logger.critical("Aborting: invalid relation found.")
-                    raise RicherDomainSplitException(
-                        "Aborting: Split with invalid relation can not be fitted. Check logger or comments for more information.")
+            self.coef_fit = list(zip(self.coefs_to_determine, args))
+            # Checking the offset: every row has to be on the side of its label (NaN is on no side)
+            if np.isnan(out).any() or not np.array_equal(self.check_offset(out), self.check_offset(y)):
+                return out
 
             # For optimization reasons, once the first solution was found (with right accuracy), the loop should end.
             raise Exception('ALREADY FOUND A FIT!')
@@ -232,7 +260,7 @@ class RicherDomainSplit(Split):
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore")
             try:
-                calculated_coefs, cov = curve_fit(adapter_function, x, y, inital_guess, method=method)
+                calculated_coefs, cov = curve_fit(adapter_function, x, y, inital_guess, method=method, jac=jacobian)
             except Exception:
                 # Even if the curve_fit fails, it may have still passed some useful information to self.y or self.coef_fit before stopping.
                 pass
@@ -241,7 +269,6 @@ class RicherDomainSplit(Split):
         if self.y is not None and self.coef_fit is not None:
             self.coef_fit.extend(fixed_coefs)
             self.coef_assignment = self.coef_fit
-            self.term = term_copy
             self.logger.root_logger.info("Fitting done. Result: {}".format(str(self.coef_assignment)))
         else:
             self.logger.root_logger.info("No fit found for {}".format(str(self.coef_assignment)))
@@ -260,7 +287,7 @@ class RicherDomainSplit(Split):
         """
 
         allowed_var_index = x.shape[1] - 1
-        sorted_column_refs = sorted(set(self.column_interval), key=lambda x: int(str(x).split("_")[1]))
+        sorted_column_refs = sorted(set(self.column_interval), key=RicherDomainSplit.symbol_index)
         highest_index = int(str(sorted_column_refs[-1]).split("x_")[1])
         return not highest_index > allowed_var_index
 
@@ -319,15 +346,10 @@ class RicherDomainSplit(Split):
         :returns: the child index (0/1 for a binary split)
         """
 
-        term = self.term.subs(self.coef_assignment) if self.coef_assignment is not None else self.term
-
-        subs_list = []
-        # Iterating over every possible value and creating a substitution list
-        for i in range(len(features[0, :])):
-            subs_list.append(("x_" + str(i), features[0, i]))
+        return 0 if self.check_offset(self.get_assigned_function()(features[:1])[0]) else 1
 
-        result = term.subs(subs_list).evalf()
-        return 0 if self.check_offset(result) else 1
+    def predict_batch(self, x):
+        return (~self.check_offset(self.get_assigned_function()(x))).astype(int)
 
     def get_masks(self, dataset):
         """
@@ -336,27 +358,13 @@ class RicherDomainSplit(Split):
         :return: a list of the masks corresponding to each subset after the split
         """
 
-        mask = []
         if self.get_mask_lookup is not None:
             return self.get_mask_lookup
         elif self.y is not None:
-            for result in self.y:
-                mask.append(self.check_offset(result))
+            mask = np.asarray(self.check_offset(np.asarray(self.y)))
         else:
-            term = self.term.subs(self.coef_assignment) if self.coef_assignment is not None else self.term
-
-            args = sorted(term.free_symbols, key=lambda x: int(str(x).split("_")[1]))
-            func = sp.lambdify(args, term)
-            # Prepare dataset for required args
-            data = dataset.get_numeric_x()
-            used_args_index = [int(str(i).split("_")[1]) for i in args]
-            data_filtered = data[:, used_args_index]
-
-            for row in data_filtered:
-                result = func(*row)
-                mask.append(self.check_offset(result))
+            mask = np.asarray(self.check_offset(self.get_assigned_function()(dataset.get_numeric_x())))
 
-        mask = np.array(mask)
         self.get_mask_lookup = [mask, ~mask]
         return [mask, ~mask]
 
@@ -2,10 +2,12 @@ from dtcontrol.decision_tree.splitting.context_aware.context_aware_splitting_str
     ContextAwareSplittingStrategy
 from dtcontrol.decision_tree.splitting.context_aware.predicate_parser import PredicateParser
 import numpy as np
+import sympy as sp
 from copy import deepcopy
 from dtcontrol.decision_tree.determinization.label_powerset_determinizer import LabelPowersetDeterminizer
 from dtcontrol.decision_tree.splitting.context_aware.richer_domain_exceptions import RicherDomainStrategyException
 from dtcontrol.decision_tree.splitting.context_aware.richer_domain_logger import RicherDomainLogger
+from dtcontrol.decision_tree.splitting.context_aware.richer_domain_split import RicherDomainSplit
 
 
 class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
@@ -33,6 +35,11 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
         # Checks whether predicate without coefs was already used in current dt path. Can lead in small(!) dt to performance boost.
         self.optimized_tree_check_version = True
 
+        # Number of significant digits of the coefs compared when checking for duplicate predicates (see get_term_key())
+        self.duplicate_check_digits = 10
+        # Whether terms which are not polynomials are compared by their values at fixed probe points (see get_term_key())
+        self.numeric_fingerprint = True
+
         """
         {‘lm’, ‘trf’, ‘dogbox’, 'optimized'}
         "The method ‘lm’ won’t work when the number of observations is less than the number of variables, use ‘trf’ or ‘dogbox’ in this 
@@ -102,11 +109,63 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
             print("No parent splits yet")
         print("----------------------------")
 
-    def get_all_splits(self, dataset, impurity_measure):
+    def format_number(self, value):
+        """
+        :return: a string of the value rounded to self.duplicate_check_digits significant digits (-0 is formatted as 0)
+        """
+        value = complex(value)
+        if value.imag != 0:
+            return "{:.{d}g}{:+.{d}g}j".format(value.real + 0., value.imag + 0., d=self.duplicate_check_digits)
+        return "{:.{d}g}".format(value.real + 0., d=self.duplicate_check_digits)
+
+    def get_term_key(self, term):
+        """
+        :param term: sympy expression only containing column references
+        :return: a hashable canonical form of the term. Two terms with the same key are considered duplicates.
+
+        Procedure:
+            1. Polynomials are expanded and represented by their monomials with coefs rounded to
+                self.duplicate_check_digits significant digits, sorted by the exponents of the column references.
+                e.g.
+                (x_0 + 1) * x_1 - 0.50000000000001 --> (('x_0', 'x_1'), (((0, 0), '-0.5'), ((0, 1), '1'), ((1, 1), '1')))
+            2. Other terms are represented by their rounded values at fixed probe points (if self.numeric_fingerprint
+                and all values are finite), otherwise by their expanded expression tree.
+        """
+        expanded = sp.expand(term)
+        columns = sorted(expanded.free_symbols, key=RicherDomainSplit.symbol_index)
+        names = tuple(str(column) for column in columns)
+        if not columns:
+            return "constant", self.format_number(expanded)
+        if expanded.is_polynomial(*columns):
+            monomials = sp.Poly(expanded, *columns).terms()
+            return "polynomial", names, tuple(sorted((monom, self.format_number(coef)) for monom, coef in monomials))
+        if self.numeric_fingerprint:
+            function, _ = RicherDomainSplit.compile_term(expanded, ())
+            probe_points = self.get_probe_points(RicherDomainSplit.symbol_index(columns[-1]) + 1)
+            with np.errstate(all="ignore"):
+                try:
+                    values = function(probe_points)
+                except (TypeError, ValueError, ZeroDivisionError):
+                    values = None
+            if values is not None and np.isfinite(values).all():
+                return "numeric", names, tuple(self.format_number(value) for value in values)
+        return "symbolic", sp.srepr(expanded)
+
+    @staticmethod
+    def get_probe_points(num_columns, num_points=16):
+        """
+        :return: fixed points used to fingerprint terms, with positive and negative values in every column
+        """
+        magnitudes = np.random.default_rng(0).uniform(0.1, 3, size=(num_points, num_columns))
+        signs = np.where(np.arange(num_points) % 2 == 0, 1, -1)
+        return magnitudes * signs[:, np.newaxis]
+
+    def get_all_splits(self, dataset, impurity_measure, **kwargs):
 
         """
         :param dataset: the subset of data at the current split
         :param impurity_measure: the impurity measure to determine the quality of a potential split
+        :param kwargs: the keyword arguments of find_split, which are not used here
         :returns: dict with all user given splits + impurity
 
         Procedure:
@@ -118,7 +177,8 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
                     - Compute impurity and store in dict
                 2.2 If predicate does contain coefs:
                     - Iterate over all unique labels and fit those coefs to that specific label mask
-            3. Return dict with key:split object and value:Impurity of the split
+            3. Compute the impurities of all splits at once with calculate_impurities
+            4. Return dict with key:split object and value:Impurity of the split
         """
 
         x_numeric = dataset.get_numeric_x()
@@ -175,8 +235,9 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
         All adjusted predicate/split objects will be stored inside the dict 'splits' 
         Key: split object   Value:Impurity of the split
         """
-        splits = {}
-        term_collection = []
+        candidates = []
+        # canonical forms of the terms of all candidates, used to skip duplicates
+        term_keys = set()
         # Similar approach as in linear_classifier.py
         for single_split in predicate_list:
             """
@@ -224,13 +285,10 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
                             # Checking whether fitting was successful
                             if split_copy.coef_assignment is not None:
                                 # Checking for duplicates
-                                evaluated_term = split_copy.term.subs(split_copy.coef_assignment)
-                                for t in term_collection:
-                                    if evaluated_term.equals(t):
-                                        break
-                                else:
-                                    term_collection.append(evaluated_term)
-                                    splits[split_copy] = impurity_measure.calculate_impurity(dataset, split_copy)
+                                term_key = self.get_term_key(split_copy.term.subs(split_copy.coef_assignment))
+                                if term_key not in term_keys:
+                                    term_keys.add(term_key)
+                                    candidates.append(split_copy)
                 else:
                     # Predicate only contains fixed or no coefs
                     combinations = single_split.get_fixed_coef_combinations()
@@ -241,18 +299,15 @@ class RicherDomainSplittingStrategy(ContextAwareSplittingStrategy):
                         split_copy.priority = self.priority
 
                         # Checking for duplicates
-                        evaluated_term = split_copy.term.subs(split_copy.coef_assignment)
-                        for t in term_collection:
-                            if evaluated_term.equals(t):
-                                break
-                        else:
-                            term_collection.append(evaluated_term)
-                            splits[split_copy] = impurity_measure.calculate_impurity(dataset, split_copy)
+                        term_key = self.get_term_key(split_copy.term.subs(split_copy.coef_assignment))
+                        if term_key not in term_keys:
+                            term_keys.add(term_key)
+                            candidates.append(split_copy)
             self.logger.root_logger.info(
                 "Finished processing predicate {} / {}".format(predicate_list.index(single_split) + 1, len(predicate_list)))
 
-        # Returning dict containing all possible splits with their impurity
-        return splits
+        # Returning dict containing all possible splits with their impurity, computed in one batch
+        return self.calculate_impurities(dataset, impurity_measure, candidates)
 
     def find_split(self, dataset, impurity_measure, **kwargs):
 
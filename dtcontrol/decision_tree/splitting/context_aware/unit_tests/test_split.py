@@ -1,3 +1,4 @@
+import pickle
 import unittest
 from hypothesis import given
 import sympy as sp
@@ -334,6 +335,51 @@ class TestSplitCurveFit(unittest.TestCase):
         self.assertEqual(split.predict(np.array([[2., 93., 1., 2.]])), 0)
 
 
+class TestSplitCompiledTerm(unittest.TestCase):
+    """
+    Test cases for the compiled terms used inside fit(), get_masks() and predict() of RicherDomainSplit Objects
+    """
+    x_0, x_1, c_0, c_1, c_2 = sp.symbols('x_0 x_1 c_0 c_1 c_2')
+    term = c_0 * x_0 ** 2 + c_1 * sp.sin(x_1) + c_2
+    data_x = np.random.default_rng(0).uniform(-3, 3, size=(50, 2))
+
+    def test_compile_term(self):
+        function, jacobian = RicherDomainSplit.compile_term(self.term, (self.c_0, self.c_1, self.c_2))
+        self.assertIs(function, RicherDomainSplit.compile_term(self.term, (self.c_0, self.c_1, self.c_2))[0])
+        np.testing.assert_allclose(function(self.data_x, 2., -1., 0.5),
+                                   2 * self.data_x[:, 0] ** 2 - np.sin(self.data_x[:, 1]) + 0.5)
+        expected_jacobian = np.column_stack([self.data_x[:, 0] ** 2, np.sin(self.data_x[:, 1]), np.ones(50)])
+        np.testing.assert_allclose(jacobian(self.data_x, 2., -1., 0.5), expected_jacobian)
+
+        # constant terms
+        function, jacobian = RicherDomainSplit.compile_term(self.c_0 + 1, (self.c_0,))
+        np.testing.assert_array_equal(function(self.data_x, 2.), np.full(50, 3.))
+        np.testing.assert_array_equal(jacobian(self.data_x, 2.), np.ones((50, 1)))
+
+    def test_masks_and_predict(self):
+        split = RicherDomainSplit({self.x_0: sp.Interval(sp.S.NegativeInfinity, sp.S.Infinity),
+                                   self.x_1: sp.Interval(sp.S.NegativeInfinity, sp.S.Infinity)},
+                                  {self.c_0: sp.Interval(sp.S.NegativeInfinity, sp.S.Infinity),
+                                   self.c_1: sp.Interval(sp.S.NegativeInfinity, sp.S.Infinity),
+                                   self.c_2: sp.Interval(sp.S.NegativeInfinity, sp.S.Infinity)}, self.term, "<=")
+        split.coef_assignment = [(self.c_0, 1.5), (self.c_1, -2.), (self.c_2, -4.)]
+
+        class Dataset:
+            def get_numeric_x(inner_self):
+                return self.data_x
+
+        expected = [bool(self.term.subs(split.coef_assignment).subs([(self.x_0, row[0]), (self.x_1, row[1])]) <= 0)
+                    for row in self.data_x]
+        mask, inverse = split.get_masks(Dataset())
+        self.assertEqual(expected, list(mask))
+        self.assertEqual([not m for m in expected], list(inverse))
+        self.assertEqual([0 if m else 1 for m in expected], [split.predict(row.reshape(1, -1)) for row in self.data_x])
+        self.assertEqual([0 if m else 1 for m in expected], list(split.predict_batch(self.data_x)))
+
+        # the compiled term is not pickled and compiled again for a new assignment
+        copy = pickle.loads(pickle.dumps(split))
+        copy.coef_assignment = [(self.c_0, -1.5), (self.c_1, 2.), (self.c_2, 4.)]
+        self.assertEqual([1 if m else 0 for m in expected], list(copy.predict_batch(self.data_x)))
 
 
 if __name__ == '__main__':
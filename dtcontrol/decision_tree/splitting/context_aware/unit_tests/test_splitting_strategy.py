@@ -0,0 +1,57 @@
+import unittest
+import sympy as sp
+import numpy as np
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.splitting.context_aware.richer_domain_splitting_strategy import RicherDomainSplittingStrategy
+
+
+class TestDuplicateCheck(unittest.TestCase):
+    """
+    Test cases for the duplicate check inside get_all_splits() of RicherDomainSplittingStrategy (richer_domain_splitting_strategy.py)
+    """
+    x_0, x_1, x_2 = sp.symbols('x_0 x_1 x_2')
+
+    def setUp(self):
+        self.strategy = RicherDomainSplittingStrategy(user_given_splits="x_0 <= 0")
+
+    def test_polynomial_keys(self):
+        key = self.strategy.get_term_key
+        self.assertEqual(key((self.x_0 + 1) * self.x_1 - sp.Rational(1, 2)), key(self.x_0 * self.x_1 + self.x_1 - 0.5))
+        self.assertEqual(key(2 * self.x_0 + 1), key(2.00000000000001 * self.x_0 + 1))
+        self.assertEqual(key(-0.0 * self.x_0 + self.x_1), key(self.x_1))
+        self.assertNotEqual(key(2 * self.x_0 + 1), key(2.001 * self.x_0 + 1))
+        self.assertNotEqual(key(self.x_0 ** 2), key(self.x_0 * self.x_1))
+        self.assertNotEqual(key(self.x_0 + self.x_2), key(self.x_1 + self.x_2))
+
+    def test_non_polynomial_keys(self):
+        key = self.strategy.get_term_key
+        self.assertEqual("numeric", key(sp.sin(self.x_0) + self.x_1)[0])
+        self.assertEqual(key(sp.sin(2 * self.x_0) + self.x_1), key(2 * sp.sin(self.x_0) * sp.cos(self.x_0) + self.x_1))
+        self.assertNotEqual(key(sp.sin(self.x_0)), key(sp.cos(self.x_0)))
+        # not finite at the probe points
+        self.assertEqual("symbolic", key(sp.sqrt(self.x_0))[0])
+        self.assertNotEqual(key(sp.sqrt(self.x_0)), key(sp.sqrt(self.x_0) + 1))
+
+        self.strategy.numeric_fingerprint = False
+        self.assertEqual("symbolic", key(sp.sin(self.x_0) + self.x_1)[0])
+
+    def test_get_all_splits(self):
+        strategy = RicherDomainSplittingStrategy(
+            user_given_splits="x_0 + c_0 <= 0; c_0 in {1, 2}\n(x_0 + c_0)*(x_1 + 1) - c_0*x_1 - x_0*x_1 <= 0; c_0 in {1, 2}\n"
+                              "x_0*(x_1 + 1) - 3 <= 0\n"
+                              "x_0*x_1 + x_0 - 3 <= 0\nx_1 - c_0 <= 0; c_0 in {0.5, 1/2}")
+        x = np.array([[-2., 1.], [-1., 2.], [0., 0.], [1., 3.], [2., 1.], [3., 2.]])
+        ds = SingleOutputDataset('duplicates.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        ds.y = np.array([[1], [1], [2], [2], [1], [2]])
+        ds.index_to_actual = {1: 1.0, 2: 2.0}
+        strategy.optimized_tree_check_version = False
+        splits = strategy.get_all_splits(ds, Entropy())
+        self.assertEqual(["c_0 + x_0 <= 0", "c_0 + x_0 <= 0", "x_0*(x_1 + 1) - 3 <= 0", "-c_0 + x_1 <= 0"],
+                         [split.helper_str() for split in splits])
+
+
+if __name__ == '__main__':
+    unittest.main()
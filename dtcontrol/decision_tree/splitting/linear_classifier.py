@@ -1,3 +1,7 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from dtcontrol.decision_tree.determinization.label_powerset_determinizer import LabelPowersetDeterminizer
@@ -6,32 +10,97 @@ from dtcontrol.decision_tree.splitting.splitting_strategy import SplittingStrate
 
 
 class LinearClassifierSplittingStrategy(SplittingStrategy):
-    def __init__(self, classifier_class, determinizer=LabelPowersetDeterminizer(), **kwargs):
+    def __init__(self, classifier_class, determinizer=LabelPowersetDeterminizer(), num_jobs=1,
+                 warm_start_from_parent=False, max_num_labels=None, **kwargs):
+        """
+        :param classifier_class: the sklearn classifier fitted to separate every label from the others
+        :param num_jobs: the number of threads fitting the classifiers of a node
+        :param warm_start_from_parent: if True, the classifier of a label starts from the coefficients fitted for the
+                                       same label at the parent node. The classifier must have a warm_start parameter
+                                       (e.g. LogisticRegression, but not LinearSVC); note that some configurations
+                                       ignore it, such as LogisticRegression with the liblinear solver.
+        :param max_num_labels: if not None, only the classifiers of this many most frequent labels are fitted
+        :param kwargs: the arguments of the classifier
+        """
         super().__init__()
+        if warm_start_from_parent and 'warm_start' not in classifier_class(**kwargs).get_params():
+            raise ValueError(f'{classifier_class.__name__} cannot be warm-started from the parent node.')
+        self.logger = logging.getLogger("linear_classifier_logger")
         self.determinizer = determinizer
         self.classifier_class = classifier_class
+        self.num_jobs = num_jobs
+        self.warm_start_from_parent = warm_start_from_parent
+        self.max_num_labels = max_num_labels
         self.kwargs = kwargs
+        # the label fits of the nodes that are not done yet and of the parents of the nodes to be built next, see
+        # begin_node and end_node
+        self.node_fits = {}
+        self.parent_fits = {}
+        self.current_node = None
+        self.warm_starts = {}
 
     def find_split(self, dataset, impurity_measure, **kwargs):
+        node, warm_starts = self.current_node, self.warm_starts
+        self.current_node, self.warm_starts = None, {}
         x_numeric = dataset.get_numeric_x()
         if x_numeric.shape[1] == 0:
             return None
 
+        start = time.time()
         y = self.determinizer.determinize(dataset)
-        splits = {}
-        for label in np.unique(y):
+        labels, counts = np.unique(y, return_counts=True)
+        if self.max_num_labels is not None and len(labels) > self.max_num_labels:
+            labels = np.sort(labels[np.argsort(-counts, kind='stable')[:self.max_num_labels]])
+
+        def fit(label):
             new_y = np.copy(y)
             label_mask = (new_y == label)
             new_y[label_mask] = 1
             new_y[~label_mask] = -1
-            classifier = self.classifier_class(**self.kwargs)
+            classifier = self.create_classifier(warm_starts.get(label))
             classifier.fit(x_numeric, new_y)
+            return classifier
+
+        if self.num_jobs > 1:
+            with ThreadPoolExecutor(self.num_jobs) as executor:
+                classifiers = list(executor.map(fit, labels))
+        else:
+            classifiers = [fit(label) for label in labels]
+        candidates = []
+        for classifier in classifiers:
             real_features = LinearSplit.map_numeric_coefficients_back(classifier.coef_[0], dataset)
-            split = LinearClassifierSplit(classifier, real_features, dataset.numeric_columns, self.priority)
-            splits[split] = impurity_measure.calculate_impurity(dataset, split)
+            candidates.append(LinearClassifierSplit(classifier, real_features, dataset.numeric_columns, self.priority))
+        if node is not None:
+            self.node_fits[node] = {label: (c.coef_, c.intercept_) for label, c in zip(labels, classifiers)}
+        self.logger.debug(f"Fitted {len(classifiers)} linear classifiers for {len(dataset)} examples in "
+                          f"{time.time() - start:.3f}s")
 
+        splits = self.calculate_impurities(dataset, impurity_measure, candidates)
         return min(splits.keys(), key=splits.get)
 
+    def begin_node(self, node):
+        if self.warm_start_from_parent:
+            self.current_node = node
+            self.warm_starts = self.parent_fits.pop(node, {})
+
+    def end_node(self, node, children):
+        # the nodes are the keys (and not their ids), so they cannot be confused with nodes created later
+        label_fits = self.node_fits.pop(node, None)
+        if label_fits is not None:
+            for child in children:
+                self.parent_fits[child] = label_fits
+
+    def create_classifier(self, warm_start):
+        """
+        :param warm_start: the coefficients and intercept to start from, or None
+        """
+        classifier = self.classifier_class(**self.kwargs)
+        if warm_start is not None:
+            classifier.set_params(warm_start=True)
+            classifier.coef_ = np.copy(warm_start[0])
+            classifier.intercept_ = np.copy(warm_start[1])
+        return classifier
+
 
 class LinearClassifierSplit(LinearSplit):
     def __init__(self, classifier, real_coefficients, numeric_columns, priority=1):
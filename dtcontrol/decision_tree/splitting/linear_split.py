@@ -9,6 +9,7 @@ class LinearSplit(Split, ABC):
     """
     Represents a linear split of the form wTx + b <= 0.
     """
+    __slots__ = ('coefficients', 'intercept', 'real_coefficients', 'numeric_columns')
 
     def __init__(self, coefficients, intercept, real_coefficients, numeric_columns):
         """
@@ -34,12 +35,23 @@ class LinearSplit(Split, ABC):
             new_coefficients[dataset.map_numeric_feature_back(i)] = numeric_coefficients[i]
         return np.array(new_coefficients)
 
+    def evaluate(self, numeric_x):
+        """
+        Computes the value of the hyperplane for every row. Unlike np.dot, whose order of summation depends on the
+        number of rows and the memory layout, every row is summed up independently in the same order, so that an
+        example on the hyperplane takes the same branch in training, in predict and in predict_batch.
+        """
+        return np.ascontiguousarray(numeric_x * self.coefficients).sum(axis=1) + self.intercept
+
     def get_masks(self, dataset):
-        mask = np.dot(dataset.get_numeric_x(), self.coefficients) + self.intercept <= 0
+        mask = self.evaluate(dataset.get_numeric_x()) <= 0
         return [mask, ~mask]
 
     def predict(self, features):
-        return 0 if np.dot(features[:, self.numeric_columns], self.coefficients) + self.intercept <= 0 else 1
+        return 0 if self.evaluate(features[:, self.numeric_columns])[0] <= 0 else 1
+
+    def predict_batch(self, x):
+        return (self.evaluate(x[:, self.numeric_columns]) > 0).astype(int)
 
     def print_dot(self, variables=None, category_names=None):
         return self.get_hyperplane_str(rounded=True, newlines=True, variables=variables)
@@ -1,8 +1,10 @@
+import ctypes
 import logging
 import os
-import re
 import shutil
 import subprocess
+import tempfile
+import threading
 from os.path import exists
 
 import numpy as np
@@ -16,23 +18,71 @@ from dtcontrol.decision_tree.splitting.splitting_strategy import SplittingStrate
 from dtcontrol.util import log_without_newline
 
 class OC1SplittingStrategy(SplittingStrategy):
-    def __init__(self, determinizer=LabelPowersetDeterminizer(), num_restarts=10, num_jumps=5, delete_tmp=True):
+    """
+    Finds oblique splits with OC1. By default, OC1 is loaded as a shared library and called on the data of the node
+    directly. With in_process=False, the mktree executable is run on a data file instead. Every run uses its own
+    temporary directory and is registered in dtcontrol.globals.oc1_pids, so that several runs can take place at the
+    same time.
+    """
+
+    # the shared library, loaded once by load_oc1_library
+    oc1_library = None
+    # the shared library uses global state and must not be called concurrently
+    oc1_library_lock = threading.Lock()
+
+    def __init__(self, determinizer=LabelPowersetDeterminizer(), num_restarts=10, num_jumps=5, delete_tmp=True,
+                 in_process=True):
         super().__init__()
         self.determinizer = determinizer
         self.oc1_path = 'decision_tree/OC1_source/mktree'
-        self.header_file = 'decision_tree/OC1_source/oc1.h'
-        self.tmp_path = '.dtcontrol_tmp'
-        self.output_file = f'{self.tmp_path}/output'
-        self.data_file = f'{self.tmp_path}/data.csv'
-        self.dt_file = f'{self.tmp_path}/dt'
-        self.log_file = f'{self.tmp_path}/log'
+        self.tmp_path = '.dtcontrol_tmp'  # every run of mktree gets its own directory inside
         self.num_restarts = num_restarts
         self.num_jumps = num_jumps
         self.delete_tmp = delete_tmp
-        self.regex_pattern = re.compile(r'IMPURITY (.+) \(\)')
-        if not os.path.exists(self.oc1_path):
+        self.in_process = in_process
+        if self.in_process:
+            self.load_oc1_library()
+        elif not os.path.exists(self.oc1_path):
             self.compile_oc1()
 
+    @classmethod
+    def load_oc1_library(cls):
+        if cls.oc1_library is not None:
+            return
+        for path in dtcontrol.__path__:
+            oc1_src = f"{path}/decision_tree/OC1_source"
+            if os.path.exists(oc1_src):
+                if not cls.is_up_to_date(oc1_src, "liboc1.so"):
+                    log_without_newline("Compiling OC1... ")
+                    if subprocess.call(["make", "liboc1.so"], cwd=oc1_src) != 0:
+                        raise EnvironmentError("Compiling OC1 failed")
+                    logging.info("Compiled OC1")
+                library = ctypes.CDLL(oc1_src + "/liboc1.so")
+                library.oc1_find_split.restype = ctypes.c_int
+                library.oc1_find_split.argtypes = [np.ctypeslib.ndpointer(np.float32, flags='C_CONTIGUOUS'),
+                                                   np.ctypeslib.ndpointer(np.intc, flags='C_CONTIGUOUS'),
+                                                   ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+                                                   ctypes.c_int,
+                                                   np.ctypeslib.ndpointer(np.float32, flags='C_CONTIGUOUS')]
+                library.oc1_get_error.restype = ctypes.c_char_p
+                library.oc1_get_error.argtypes = []
+                cls.oc1_library = library
+                return
+        raise EnvironmentError("Could not find OC1 files")
+
+    @staticmethod
+    def is_up_to_date(oc1_src, target):
+        """
+        :returns: True if the target exists and, as far as make can tell, was built from the current sources
+        """
+        if not os.path.exists(f"{oc1_src}/{target}"):
+            return False
+        try:
+            return subprocess.call(["make", "-q", target], cwd=oc1_src, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL) == 0
+        except OSError:  # make is not available, so the existing build is used
+            return True
+
     def compile_oc1(self):
         for path in dtcontrol.__path__:
             oc1_src = f"{path}/decision_tree/OC1_source"
@@ -55,52 +105,64 @@ class OC1SplittingStrategy(SplittingStrategy):
         if x_numeric.shape[1] == 0:
             return None
         y = self.determinizer.determinize(dataset)
-        if not os.path.exists(self.tmp_path):
-            os.mkdir(self.tmp_path)
-        self.save_data_to_file(x_numeric, y)
-        self.set_impurity_measure(impurity_measure)
-        self.execute_oc1()
-        split = self.parse_oc1_dt(dataset)
-        if self.delete_tmp:
-            shutil.rmtree(self.tmp_path)
-        return split
+        if self.in_process:
+            return self.find_split_in_process(x_numeric, y, impurity_measure, dataset)
+        os.makedirs(self.tmp_path, exist_ok=True)
+        directory = tempfile.mkdtemp(dir=self.tmp_path)
+        try:
+            self.save_data_to_file(x_numeric, y, directory)
+            self.execute_oc1(impurity_measure, directory)
+            return self.parse_oc1_dt(dataset, directory)
+        finally:
+            if self.delete_tmp:
+                shutil.rmtree(directory)
+                try:
+                    os.rmdir(self.tmp_path)
+                except OSError:  # other runs are still using it
+                    pass
 
-    def set_impurity_measure(self, impurity_measure):
-        for path in dtcontrol.__path__:
-            header = f'{path}/decision_tree/OC1_source/oc1.h'
-            if os.path.exists(header):
-                self.header_file = header
-        with open(self.header_file, 'r') as infile:
-            content = infile.read()
-        match = re.search(self.regex_pattern, content)
-        assert match
-        if match.group(1) == impurity_measure.get_oc1_name():
-            return
-        new_content = re.sub(self.regex_pattern, f'IMPURITY {impurity_measure.get_oc1_name()} ()', content)
-        with open(self.header_file, 'w') as outfile:
-            outfile.write(new_content)
-        logging.disable(logging.INFO)
-        self.compile_oc1()
-        logging.disable(logging.NOTSET)
+    def find_split_in_process(self, x, y, impurity_measure, dataset):
+        self.load_oc1_library()  # the class attribute is not set in spawned worker processes
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.intc)
+        hyperplane = np.zeros(x.shape[1] + 1, dtype=np.float32)
+        with self.oc1_library_lock:
+            found = self.oc1_library.oc1_find_split(x, y, x.shape[0], x.shape[1],
+                                                    impurity_measure.get_oc1_name().encode(), self.num_restarts,
+                                                    self.num_jumps, hyperplane)
+            # errors inside OC1 do not exit the process, but are reported by this return code
+            if found == -2:
+                raise RuntimeError(f'OC1 failed: {self.oc1_library.oc1_get_error().decode()}')
+        if found < 0:
+            raise ValueError(f'OC1 does not support the impurity measure {impurity_measure.get_oc1_name()}.')
+        if not found:
+            return None
+        return self.create_split([float(c) for c in hyperplane[:-1]], float(hyperplane[-1]), dataset)
 
-    def save_data_to_file(self, x, y):
+    @staticmethod
+    def save_data_to_file(x, y, directory):
         data = np.c_[x, y]
         num_float_columns = data.shape[1] - 1
-        np.savetxt(self.data_file, data, fmt=' '.join(['%f'] * num_float_columns + ['%d']), delimiter='\t')
+        np.savetxt(f'{directory}/data.csv', data, fmt=' '.join(['%f'] * num_float_columns + ['%d']), delimiter='\t')
 
-    def execute_oc1(self):
-        command = f'{self.oc1_path} -t {self.data_file} -D {self.dt_file} -p0 -i{self.num_restarts} ' \
-                  f'-j{self.num_jumps} -l {self.log_file}'
-        with open(self.output_file, 'w+') as out:
-            p = subprocess.Popen(command.split(' '), stdout=out)
-            dtcontrol.globals.oc1_pid = p.pid
-            p.wait()
-            dtcontrol.globals.oc1_pid = None
+    def execute_oc1(self, impurity_measure, directory):
+        command = [self.oc1_path, '-t', f'{directory}/data.csv', '-D', f'{directory}/dt', '-p0',
+                   f'-i{self.num_restarts}', f'-j{self.num_jumps}', f'-I{impurity_measure.get_oc1_name()}', '-l',
+                   f'{directory}/log']
+        with open(f'{directory}/output', 'w+') as out:
+            p = subprocess.Popen(command, stdout=out)
+            dtcontrol.globals.oc1_pids.add(p.pid)
+            try:
+                p.wait()
+            finally:
+                dtcontrol.globals.oc1_pids.discard(p.pid)
 
-    def parse_oc1_dt(self, dataset):
-        if not exists(self.dt_file):
+    @staticmethod
+    def parse_oc1_dt(dataset, directory):
+        dt_file = f'{directory}/dt'
+        if not exists(dt_file):
             return None
-        with open(self.dt_file) as infile:
+        with open(dt_file) as infile:
             while not infile.readline().startswith('Root'):
                 pass
             hyperplane_str = infile.readline()
@@ -116,6 +178,10 @@ class OC1SplittingStrategy(SplittingStrategy):
                 j = j + 1
             else:
                 coefficients.append(0)
+        return OC1SplittingStrategy.create_split(coefficients, intercept, dataset)
+
+    @staticmethod
+    def create_split(coefficients, intercept, dataset):
         if len([c for c in coefficients if c != 0]) == 1:
             for i in range(len(coefficients)):
                 if coefficients[i] != 0:
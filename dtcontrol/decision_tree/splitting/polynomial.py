@@ -48,12 +48,12 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
         """
         transforms a list of vectors [(x_0, …, x_n)] to a higher dimensional space:
         -> [(x_0^2, x_1^2, …, x_0*x_1, …, x_0, x_1, …, 1)]
+        the products x_i*x_j with i <= j are ordered by j, then i (x_n+1 = 1)
         """
-        def phi(X):
-            X = np.append(X, 1)
-            return np.array([X[i]*X[j] for j in range(len(X)) for i in range(j+1)])
-
-        return np.apply_along_axis(phi, 1, X)
+        X = np.c_[X, np.ones(len(X))]
+        j, i = np.tril_indices(X.shape[1])
+        # C order, as the sums over the columns (e.g. when standardizing) depend on the memory layout
+        return np.ascontiguousarray(X[:, i] * X[:, j])
 
     @staticmethod
     def get_coefficients(standardizer, classifier):
@@ -96,7 +96,8 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
         # to the non-standardized form.
         self.logger.debug("prettifying..")
         baseAccurarcy = pipeline.score(x, y)
-        basePred = pipeline.predict(x)
+        # keeps track of the predictions while single coefficients are changed, see PredictionChecker
+        checker = PredictionChecker(std.transform(x), svc)
         coefs = svc.coef_[0]  # reference which we write into
         enabledFeatures = np.ones(len(coefs), dtype=bool) #bool flag if enabled
 
@@ -112,7 +113,7 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
 
         def accuracy_still_good():
             #return pipeline.score(x, y) >= baseAccurarcy
-            return (basePred == pipeline.predict(x)).all()
+            return checker.predictions_unchanged()
 
         # sort by increasing order -> round small coefficients to 0 first
         # last index is intercept, has to be done last
@@ -129,13 +130,13 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
                 continue
             # try setting it to 0 without retraining (is much faster if it works)
             orgCoef = coefs[coefInd]
-            coefs[coefInd] = 0 + \
-                (FLOAT_PRECISION if coefs[coefInd] < 0 else -FLOAT_PRECISION)
+            checker.set_coefficient(coefInd, 0 + \
+                (FLOAT_PRECISION if coefs[coefInd] < 0 else -FLOAT_PRECISION))
             if accuracy_still_good():
-                coefs[coefInd] = 0
+                checker.set_coefficient(coefInd, 0)
                 enabledFeatures[coefInd] = False
                 continue
-            coefs[coefInd] = orgCoef
+            checker.set_coefficient(coefInd, orgCoef)
             # try removing feature and retraining
             enabledFeatures[coefInd] = False
             if test_in_alt():
@@ -143,10 +144,11 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
                 coefs[enabledFeatures] = alt_svc.coef_[0]
                 coefs[~enabledFeatures] = 0
                 svc.intercept_[0] = alt_svc.intercept_[0]
+                checker.recompute()
                 continue
             enabledFeatures[coefInd] = True
 
-        basePred = pipeline.predict(x)
+        checker.reset_predictions()
 
         # step 2: take one coefficient and fix it to 1 (scale the entire equation)
         # choose the one closest to 1, distance is abs(log10(abs(x)))
@@ -160,6 +162,7 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
                         if coefs[coefTo1]*std.scale_[coefTo1] != 0 else 1
         coefs *= scaleFac
         svc.intercept_[0] *= scaleFac
+        checker.recompute()
         if not accuracy_still_good():
             # can happen if precision error occur for very high coefs
             # will be dealt with later in check_reasonable_coefs
@@ -190,18 +193,18 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
                 if eqCoefGoal == 0:
                     continue  # we have already tried it and for this, the over-approximation is not valid
                 if lastInd:
-                    svc.intercept_[0] = interceptBase + \
-                        (eqCoefGoal - eqCoef) * (1+FLOAT_PRECISION)
+                    checker.set_coefficient(None, interceptBase + \
+                        (eqCoefGoal - eqCoef) * (1+FLOAT_PRECISION))
                     if accuracy_still_good():
-                        svc.intercept_[0] = interceptBase + eqCoefGoal - eqCoef
+                        checker.set_coefficient(None, interceptBase + eqCoefGoal - eqCoef)
                         break
                 else:
                     # it has to be correct even when faced with relative rounding errors:
                     overApproxFac = (
                         1+FLOAT_PRECISION if abs(eqCoefGoal) > abs(eqCoef) else 1-FLOAT_PRECISION)
-                    coefs[coefInd] = eqCoefGoal * scale * overApproxFac
+                    checker.set_coefficient(coefInd, eqCoefGoal * scale * overApproxFac)
                     if accuracy_still_good():
-                        coefs[coefInd] = eqCoefGoal * scale  # without overApproxFac
+                        checker.set_coefficient(coefInd, eqCoefGoal * scale)  # without overApproxFac
                         break
             else: # should never happen
                 self.logger.warn(f"Could not find rounded value for variable with index {coefInd}")
@@ -263,13 +266,22 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
 
         return eqCoef
     
-    def transform_x(self, dataset, transformer, key):
-        try:
-            if dataset.tranformed_x.get(key) is None:
-                dataset.tranformed_x[key] = transformer(dataset.get_numeric_x())
-        except AttributeError:
-            dataset.transformed_x = {key: transformer(dataset.get_numeric_x())}
-        return dataset.transformed_x[key]
+    @staticmethod
+    def transform_x(dataset, transformer, key):
+        """
+        Returns the transformed numeric x of the dataset. The transformation is cached in the dataset. For a view, it is
+        computed once for all examples of the root dataset, and the rows of the view are selected from it.
+        """
+        dataset.get_numeric_x()
+        root = dataset.root if dataset.is_view() else dataset
+        cache_key = (key, tuple(dataset.numeric_columns))
+        if not hasattr(root, 'transformed_x'):
+            root.transformed_x = {}
+        if cache_key not in root.transformed_x:
+            root.transformed_x[cache_key] = transformer(root.select_columns(dataset.numeric_columns))
+        if dataset.is_view():
+            return root.transformed_x[cache_key][dataset.indices]
+        return root.transformed_x[cache_key]
     
     def calc_all_feature_importance(self, dataset):
         """
@@ -393,11 +405,86 @@ class PolynomialClassifierSplittingStrategy(SplittingStrategy):
         return bestSplit
 
 
+class PredictionChecker:
+    """
+    Checks whether the predictions of a fitted linear classifier on x stay the same while its coefficients are changed
+    one at a time. Instead of predicting x again after every change, which costs O(n*d), the scores are updated in O(n).
+    The scores are only recomputed if one of them is too close to 0 to be sure of the sign that predict would compute,
+    given bounds on the rounding errors of the updates and of predict itself. So the result is always the same as
+    comparing the predictions directly.
+    """
+
+    def __init__(self, x, classifier):
+        """
+        :param x: the input of the classifier, which has to be standardized already
+        :param classifier: a fitted binary linear classifier, whose coef_ and intercept_ are changed
+        """
+        self.x = x
+        self.classifier = classifier
+        self.x_max = np.abs(x).max()
+        self.scores = None
+        self.error = None  # a bound on the difference between the scores and the exact scores
+        self.base_predictions = None  # the predictions that have to be kept
+        self.reset_predictions()
+
+    def recompute(self):
+        """
+        Recomputes the scores, which is needed after several coefficients were changed without set_coefficient.
+        """
+        self.scores = self.classifier.decision_function(self.x)
+        self.error = self.get_predict_error()
+
+    def reset_predictions(self):
+        """
+        Makes the current predictions the ones that have to be kept.
+        """
+        self.recompute()
+        self.base_predictions = self.scores > 0
+
+    def get_predict_error(self):
+        """
+        :returns: a bound on the rounding error of the scores computed by predict for the current coefficients
+        """
+        coefs = self.classifier.coef_[0]
+        magnitude = self.x_max * np.abs(coefs).sum() + abs(self.classifier.intercept_[0])
+        return 2 * (len(coefs) + 2) * np.finfo(float).eps * magnitude
+
+    def set_coefficient(self, index, value):
+        """
+        Sets the coefficient with the given index (None for the intercept) and updates the scores.
+        """
+        if index is None:
+            delta = value - self.classifier.intercept_[0]
+            self.classifier.intercept_[0] = value
+            self.scores = self.scores + delta
+            change = abs(delta)
+        else:
+            delta = value - self.classifier.coef_[0][index]
+            self.classifier.coef_[0][index] = value
+            self.scores = self.scores + delta * self.x[:, index]
+            change = abs(delta) * self.x_max
+        self.error += 2 * np.finfo(float).eps * (change + np.abs(self.scores).max())
+
+    def predictions_unchanged(self):
+        """
+        :returns: True if predict gives the same predictions as when reset_predictions was last called
+        """
+        bound = self.error + self.get_predict_error()
+        certain = np.abs(self.scores) > bound
+        if (certain & ((self.scores > 0) != self.base_predictions)).any():
+            return False
+        if certain.all():
+            return True
+        self.recompute()
+        return ((self.scores > 0) == self.base_predictions).all()
+
+
 class PolynomialSplit(Split, ABC):
     """
       Represents a polynomial split of the form p(x) <= 0.
       Right now, the polynomial is quadratic.
     """
+    __slots__ = ('coefficients', 'relevant_columns', 'pipeline')
 
     def __init__(self, pipeline, coefs, numeric_columns, priority=1):
         """
@@ -413,7 +500,8 @@ class PolynomialSplit(Split, ABC):
         self.priority = priority
 
     def get_masks(self, dataset):
-        x_transf = PolynomialClassifierSplittingStrategy().transform_x(dataset, PolynomialClassifierSplittingStrategy.transform_quadratic, KEY_QUAD)
+        x_transf = PolynomialClassifierSplittingStrategy.transform_x(
+            dataset, PolynomialClassifierSplittingStrategy.transform_quadratic, KEY_QUAD)
         mask = np.dot(x_transf, self.coefficients) <= 0
         return [mask, ~mask]
 
@@ -422,6 +510,10 @@ class PolynomialSplit(Split, ABC):
                                             features[:, self.relevant_columns])
         return 0 if np.dot(x_transf, self.coefficients) <= 0 else 1
 
+    def predict_batch(self, x):
+        x_transf = PolynomialClassifierSplittingStrategy.transform_quadratic(x[:, self.relevant_columns])
+        return (~(np.dot(x_transf, self.coefficients) <= 0)).astype(int)
+
     def __repr__(self):
         return "PolynomialSplit: " + self.get_equation_str(rounded=True)
 
@@ -1,8 +1,55 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 class Split(ABC):
+    # Splits hold only their decision data in slots, as large trees contain many of them. Subclasses that carry
+    # additional objects (e.g. a fitted classifier) may omit __slots__ and keep those in a __dict__.
+    __slots__ = ('priority', 'mask_cache')
+
     def __init__(self):
         self.priority = 1
+        self.mask_cache = None  # (dataset, masks) of the last call of get_cached_masks
+
+    def __setattr__(self, name, value):
+        # the cached masks belong to the current parameters of the split (e.g. refitted or rounded coefficients)
+        if name != 'mask_cache' and name != 'priority':
+            object.__setattr__(self, 'mask_cache', None)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        # the cache holds a reference to the dataset, which must not be pickled with the tree
+        state['mask_cache'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def get_cached_masks(self, dataset):
+        """
+        Returns the masks of get_masks, computing them only once per dataset. The masks are kept until
+        clear_mask_cache is called, an attribute of the split other than the priority is assigned or the masks of
+        another dataset are requested, so that the impurity measures and the final partition of a node can reuse the
+        masks computed during the search. Parameters changed in place (e.g. coefficients[0] = 1) are not noticed, so
+        splits assign new values instead.
+        :param dataset: the dataset to be split
+        :return: a list of the masks corresponding to each subset after the split
+        """
+        cache = getattr(self, 'mask_cache', None)
+        if cache is not None and cache[0] is dataset:
+            return cache[1]
+        masks = self.get_masks(dataset)
+        self.mask_cache = (dataset, masks)
+        return masks
+
+    def clear_mask_cache(self):
+        self.mask_cache = None
 
     @abstractmethod
     def predict(self, features):
@@ -13,13 +60,21 @@ class Split(ABC):
         """
         pass
 
+    def predict_batch(self, x):
+        """
+        Determines the child indices of the split for many instances at once.
+        :param x: the features of the instances, of shape (num_instances, num_features)
+        :returns: an int array containing the child index of every instance
+        """
+        return np.array([self.predict(row.reshape(1, -1)) for row in x], dtype=int)
+
     def split(self, dataset):
         """
         Splits the dataset into subsets.
         :param dataset: the dataset to be split
         :return: a list of the subsets
         """
-        return [dataset.from_mask(mask) for mask in self.get_masks(dataset)]
+        return [dataset.from_mask(mask) for mask in self.get_cached_masks(dataset)]
 
     @abstractmethod
     def get_masks(self, dataset):
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class SplittingStrategy(ABC):
     def __init__(self):
@@ -13,3 +15,30 @@ class SplittingStrategy(ABC):
         :returns: a split object
         """
         pass
+
+    def begin_node(self, node):
+        """
+        Called with the node whose split is searched next, before find_split. Strategies that pass state from a node to
+        its children (see LinearClassifierSplittingStrategy) use this together with end_node.
+        """
+        pass
+
+    def end_node(self, node, children):
+        """
+        Called when a node is done, with the children of the node that are built next. The list is empty if the node
+        became a leaf.
+        """
+        pass
+
+    @staticmethod
+    def calculate_impurities(dataset, impurity_measure, splits):
+        """
+        Computes the impurities of binary splits with a single call of ImpurityMeasure.calculate_impurities. The masks
+        are cached on the splits, so that they are not computed again for the split that is finally chosen.
+        :param splits: a list of binary splits
+        :returns: a dict mapping the splits to their impurities, in the order of the list
+        """
+        if not splits:
+            return {}
+        left_masks = np.array([split.get_cached_masks(dataset)[0] for split in splits])
+        return dict(zip(splits, impurity_measure.calculate_impurities(dataset, left_masks)))
@@ -0,0 +1,271 @@
+"""
+A compact struct-of-arrays representation of a tree, saved as an .npz file. Instead of pickling every node and split
+object, the nodes are stored in preorder as one entry of every per-node array:
+    num_children, num_nodes, num_inner_nodes
+    kind:       the kind of split as in FlatTree (with CATEGORICAL_MULTI added) or LEAF
+    feature:    the feature of an axis aligned, categorical single or categorical multi split
+    threshold:  the threshold of an axis aligned split or the value of a categorical single split
+    priority:   the priority of the split
+
+The variable-length data is concatenated into one array and split again using offsets: the coefficients of linear
+splits, the value groups of categorical multi splits and the leaf labels. Splits of kind OTHER (e.g. polynomial and
+richer domain splits) are pickled one by one, so loading a tree containing such splits unpickles them and must only be
+done for trusted files, as for pickled classifiers. Linear splits are restored as LinearSplit, so a linear classifier split
+keeps its hyperplane (which is all that is used for prediction and printing), but not the fitted classifier.
+"""
+import gc
+import pickle
+from contextlib import contextmanager
+from itertools import chain
+
+import numpy as np
+
+from dtcontrol.decision_tree.flat_tree import AXIS_ALIGNED, CATEGORICAL_SINGLE, LEAF, LINEAR, OTHER
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit
+from dtcontrol.decision_tree.splitting.categorical_multi import CategoricalMultiSplit
+from dtcontrol.decision_tree.splitting.categorical_single import CategoricalSingleSplit
+from dtcontrol.decision_tree.splitting.linear_split import LinearSplit
+
+CATEGORICAL_MULTI = 4
+
+# the kinds of labels
+NO_LABEL = 0
+SINGLE = 1
+SINGLE_TUPLE = 2
+LIST = 3
+LIST_OF_TUPLES = 4
+LABEL_ARRAYS = ['label_kind', 'tuple_length', 'values', 'value_is_int', 'offsets']
+
+
+def save(root, filename):
+    np.savez_compressed(filename, **to_arrays(root))
+
+
+def load(filename, node_class, allow_pickle=True):
+    """
+    :param allow_pickle: whether the pickled splits of kind OTHER may be loaded. The arrays themselves never contain
+                         pickled objects.
+    :raises ValueError: if allow_pickle is False and the file contains pickled splits
+    """
+    with np.load(filename, allow_pickle=False) as arrays:
+        arrays = dict(arrays)
+    if not allow_pickle and len(arrays['pickled_splits_offsets']) > 1:
+        raise ValueError(f'{filename} contains pickled splits, which cannot be loaded with allow_pickle=False.')
+    return from_arrays(arrays, node_class)
+
+
+def to_arrays(root):
+    with paused_gc():
+        return create_arrays(root)
+
+
+def create_arrays(root):
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(reversed(node.children))
+
+    kinds, features, thresholds, priorities = [], [], [], []
+    linear = []
+    multi_groups = []
+    other = []
+    index_labels = []
+    actual_labels = []
+    for node in nodes:
+        if node.is_leaf():
+            kinds.append(LEAF)
+            features.append(0)
+            thresholds.append(0)
+            priorities.append(1)
+            index_labels.append(node.index_label)
+            actual_labels.append(node.actual_label)
+            continue
+        split = node.split
+        priorities.append(split.priority)
+        if isinstance(split, AxisAlignedSplit):
+            kinds.append(AXIS_ALIGNED)
+            features.append(split.feature)
+            thresholds.append(split.threshold)
+            continue
+        if isinstance(split, CategoricalSingleSplit):
+            kinds.append(CATEGORICAL_SINGLE)
+            features.append(split.feature)
+            thresholds.append(split.value)
+            continue
+        if isinstance(split, CategoricalMultiSplit):
+            kinds.append(CATEGORICAL_MULTI)
+            features.append(split.feature)
+            multi_groups.append(split.value_groups)
+        elif isinstance(split, LinearSplit):
+            kinds.append(LINEAR)
+            features.append(0)
+            linear.append(split)
+        else:
+            kinds.append(OTHER)
+            features.append(0)
+            other.append(pickle.dumps(split))
+        thresholds.append(0)
+
+    arrays = {
+        'num_children': np.array([len(node.children) for node in nodes], dtype=np.int32),
+        'num_nodes': np.array([node.num_nodes for node in nodes], dtype=np.int64),
+        'num_inner_nodes': np.array([node.num_inner_nodes for node in nodes], dtype=np.int64),
+        'kind': np.array(kinds, dtype=np.int8),
+        'feature': np.array(features, dtype=np.int64),
+        'threshold': np.array(thresholds, dtype=float),
+        'priority': np.array(priorities, dtype=float),
+        'intercepts': np.array([split.intercept for split in linear], dtype=float)
+    }
+    for name, dtype in [('coefficients', float), ('real_coefficients', float), ('numeric_columns', np.int64)]:
+        arrays[name], arrays[name + '_offsets'] = pack([getattr(split, name) for split in linear], dtype=dtype)
+    groups = [group for value_groups in multi_groups for group in value_groups]
+    arrays['group_values'], arrays['group_offsets'] = pack(groups, dtype=float)
+    arrays['num_groups'] = np.array([len(value_groups) for value_groups in multi_groups], dtype=np.int64)
+    arrays['pickled_splits'], arrays['pickled_splits_offsets'] = pack(other, dtype=np.uint8)
+    for prefix, labels in [('index', index_labels), ('actual', actual_labels)]:
+        arrays.update({f'{prefix}_{name}': array for name, array in pack_labels(labels).items()})
+    return arrays
+
+
+def from_arrays(arrays, node_class):
+    with paused_gc():
+        return create_nodes(arrays, node_class)
+
+
+def create_nodes(arrays, node_class):
+    coefficients = unpack(arrays['coefficients'], arrays['coefficients_offsets'])
+    real_coefficients = unpack(arrays['real_coefficients'], arrays['real_coefficients_offsets'])
+    numeric_columns = unpack(arrays['numeric_columns'], arrays['numeric_columns_offsets'])
+    linear = iter(LinearSplit(c, i, r, n.tolist()) for c, i, r, n in
+                  zip(coefficients, arrays['intercepts'].tolist(), real_coefficients, numeric_columns))
+    groups = iter([v.tolist() for v in unpack(arrays['group_values'], arrays['group_offsets'])])
+    multi_groups = iter([[next(groups) for _ in range(num_groups)] for num_groups in arrays['num_groups']])
+    other = iter(pickle.loads(pickled.tobytes())
+                 for pickled in unpack(arrays['pickled_splits'], arrays['pickled_splits_offsets']))
+    index_labels = iter(unpack_labels({name: arrays[f'index_{name}'] for name in LABEL_ARRAYS}))
+    actual_labels = iter(unpack_labels({name: arrays[f'actual_{name}'] for name in LABEL_ARRAYS}))
+
+    kinds = arrays['kind'].tolist()
+    features = arrays['feature'].tolist()
+    thresholds = arrays['threshold'].tolist()
+    priorities = arrays['priority'].tolist()
+    root = node_class()
+    # the nodes are created in preorder, the stack contains the nodes whose attributes are still to be set
+    stack = [root]
+    for i, (num_children, num_nodes, num_inner_nodes) in enumerate(zip(arrays['num_children'].tolist(),
+                                                                       arrays['num_nodes'].tolist(),
+                                                                       arrays['num_inner_nodes'].tolist())):
+        node = stack.pop()
+        node.num_nodes = num_nodes
+        node.num_inner_nodes = num_inner_nodes
+        kind = kinds[i]
+        if kind == LEAF:
+            node.index_label = next(index_labels)
+            node.actual_label = next(actual_labels)
+            continue
+        if kind == AXIS_ALIGNED:
+            node.split = AxisAlignedSplit(features[i], thresholds[i])
+        elif kind == CATEGORICAL_SINGLE:
+            node.split = CategoricalSingleSplit(features[i], thresholds[i])
+        elif kind == CATEGORICAL_MULTI:
+            node.split = CategoricalMultiSplit(features[i], next(multi_groups))
+        elif kind == LINEAR:
+            node.split = next(linear)
+        else:
+            node.split = next(other)
+        node.split.priority = priorities[i]
+        node.children = [node_class(depth=node.depth + 1) for _ in range(num_children)]
+        stack.extend(reversed(node.children))
+    return root
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pauses the garbage collector while the nodes of a large tree are converted. None of the many objects created is
+    garbage, so the collections triggered by their allocation would take most of the time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def pack(sequences, dtype):
+    """
+    :param sequences: a list of sequences (e.g. lists, arrays or bytes) of numbers
+    :returns: the concatenation of the sequences and the offsets of the sequences in it
+    """
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(sequence) for sequence in sequences])
+    return np.fromiter(chain.from_iterable(sequences), dtype=dtype, count=offsets[-1]), offsets
+
+
+def unpack(values, offsets):
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def pack_labels(labels):
+    """
+    Packs leaf labels, which can be None, a single label, a single tuple, a list of labels or a list of tuples, into
+    arrays. The labels must be numbers; whether a number is an int is stored along with it.
+    """
+    label_kinds = []
+    tuple_lengths = []
+    values = []
+    for label in labels:
+        tuple_length = 0
+        if label is None:
+            label_kind = NO_LABEL
+            values.append([])
+        elif isinstance(label, tuple):
+            label_kind = SINGLE_TUPLE
+            tuple_length = len(label)
+            values.append(label)
+        elif isinstance(label, list) and label and isinstance(label[0], tuple):
+            label_kind = LIST_OF_TUPLES
+            tuple_length = len(label[0])
+            values.append([v for tup in label for v in tup])
+        elif isinstance(label, list):
+            label_kind = LIST
+            values.append(label)
+        else:
+            label_kind = SINGLE
+            values.append([label])
+        label_kinds.append(label_kind)
+        tuple_lengths.append(tuple_length)
+    flat_values, offsets = pack(values, dtype=float)
+    is_int = [isinstance(v, (int, np.integer)) for label_values in values for v in label_values]
+    return {
+        'label_kind': np.array(label_kinds, dtype=np.int8),
+        'tuple_length': np.array(tuple_lengths, dtype=np.int64),
+        'values': flat_values,
+        'value_is_int': np.array(is_int, dtype=bool),
+        'offsets': offsets
+    }
+
+
+def unpack_labels(arrays):
+    flat_values = [int(v) if is_int else v for v, is_int in
+                   zip(arrays['values'].tolist(), arrays['value_is_int'].tolist())]
+    offsets = arrays['offsets'].tolist()
+    labels = []
+    for i, (label_kind, tuple_length) in enumerate(zip(arrays['label_kind'].tolist(),
+                                                       arrays['tuple_length'].tolist())):
+        values = flat_values[offsets[i]:offsets[i + 1]]
+        if label_kind == NO_LABEL:
+            labels.append(None)
+        elif label_kind == SINGLE:
+            labels.append(values[0])
+        elif label_kind == SINGLE_TUPLE:
+            labels.append(tuple(values))
+        elif label_kind == LIST:
+            labels.append(values)
+        else:
+            labels.append([tuple(values[j:j + tuple_length]) for j in range(0, len(values), tuple_length)])
+    return labels
@@ -1 +1 @@
-oc1_pid = None
+oc1_pids = set()  # the process ids of the running mktree processes
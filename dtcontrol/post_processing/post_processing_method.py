@@ -24,6 +24,9 @@ class PostProcessingMethod(BenchmarkSuiteClassifier, ABC):
     def predict(self, dataset, actual_values=True):
         return self.classifier.predict(dataset, actual_values)
 
+    def compute_accuracy(self, dataset):
+        return self.classifier.compute_accuracy(dataset)
+
     def get_stats(self):
         return self.classifier.get_stats()
 
@@ -33,5 +36,17 @@ class PostProcessingMethod(BenchmarkSuiteClassifier, ABC):
     def print_dot(self, x_metadata, y_metadata):
         return self.classifier.print_dot(x_metadata, y_metadata)
 
+    def write_dot(self, file, x_metadata, y_metadata):
+        self.classifier.write_dot(file, x_metadata, y_metadata)
+
     def print_c(self):
         return self.classifier.print_c()
+
+    def write_c(self, file):
+        self.classifier.write_c(file)
+
+    def toJSON(self, x_metadata, y_metadata):
+        return self.classifier.toJSON(x_metadata, y_metadata)
+
+    def write_json(self, file, x_metadata, y_metadata):
+        self.classifier.write_json(file, x_metadata, y_metadata)
@@ -16,11 +16,26 @@ class SafePruning(PostProcessingMethod):
         self.prune(self.classifier.root, self.rounds)
 
     def prune(self, node, rounds):
+        """
+        Prunes the subtree of node from the leaves upwards, using an explicit stack instead of recursion.
+        :returns: the number of remaining rounds or None if rounds is None
+        """
+        preorder = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            preorder.append(n)
+            stack.extend(n.children)
+        remaining = {}  # maps the ids of the pruned nodes to their remaining rounds
+        for n in reversed(preorder):
+            remaining[id(n)] = self.prune_node(n, rounds, [remaining[id(child)] for child in n.children])
+        return remaining[id(node)]
+
+    def prune_node(self, node, rounds, children_remaining_rounds):
         if node.is_leaf():
             return None if rounds is None else rounds
         remaining_rounds = None if rounds is None else sys.maxsize
-        for child in node.children:
-            r = self.prune(child, rounds)
+        for r in children_remaining_rounds:
             if rounds is not None and r < remaining_rounds:
                 remaining_rounds = r
         if rounds is not None:
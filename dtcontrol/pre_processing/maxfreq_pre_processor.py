@@ -12,7 +12,7 @@ class MaxFreqPreProcessor(LabelPreProcessor):
         super().__init__()
 
     def preprocess_single_output(self, dataset):
-        return np.array([ [x] for x in MaxFreqDeterminizer.get_max_freq_labels(dataset.get_single_labels()) ])
+        return MaxFreqDeterminizer.get_max_freq_labels(dataset.get_single_labels()).reshape((-1, 1))
 
     def preprocess_multi_output(self, dataset):
         return self.unstack(np.array([ [dataset.map_single_label_back(x)] for x in MaxFreqDeterminizer.get_max_freq_labels(dataset.get_single_labels()) ]),2)
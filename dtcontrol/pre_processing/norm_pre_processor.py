@@ -12,17 +12,44 @@ class NormPreProcessor(LabelPreProcessor):
         :param comp: the comparison function to be used, either min or max
         """
         super().__init__()
+        if comp is not min and comp is not max:
+            raise ValueError("The comparison function has to be min or max.")
         self.comp = comp
 
     def preprocess_single_output(self, dataset):
-        return np.apply_along_axis(lambda x: self.comp(x[x != -1], key=lambda i: dataset.index_to_actual[i] ** 2),
-                                   axis=1,
-                                   arr=dataset.y).reshape((-1, 1))
+        return self.choose(dataset.y, self.get_squares(dataset.index_to_actual, dataset.y)).reshape((-1, 1))
 
     def preprocess_multi_output(self, dataset):
         zipped = np.stack(dataset.y, axis=2)
-        result = []
-        for arr in zipped:
-            result.append(self.comp([t for t in arr if t[0] != -1],
-                                    key=lambda t: sum(dataset.index_to_actual[j] ** 2 for j in t)))
-        return np.array(np.split(np.array(result), len(dataset.y), 1))
+        squares = self.get_squares(dataset.index_to_actual, zipped)
+        # summed in the order of the outputs
+        norms = squares[..., 0]
+        for i in range(1, zipped.shape[2]):
+            norms = norms + squares[..., i]
+        result = self.choose(zipped[..., 0], norms, zipped)
+        return np.array(np.split(result, len(dataset.y), 1))
+
+    @staticmethod
+    def get_squares(index_to_actual, y):
+        """
+        :returns: the squares of the actual values of the labels in y. The squares are looked up in a table indexed by
+                  the label, so every label is only squared once.
+        """
+        table = np.zeros(max(max(index_to_actual, default=-1), y.max(initial=-1)) + 1)
+        for index, actual in index_to_actual.items():
+            table[index] = actual ** 2
+        # -1 indexes the last entry, but is masked in choose
+        return table[y]
+
+    def choose(self, labels, norms, choices=None):
+        """
+        Chooses the label with the minimal (or maximal) norm of every row, taking the first one in case of ties.
+        :param labels: 2d array of labels padded with -1
+        :param norms: the norms of the labels
+        :param choices: the array the chosen entries are taken from, by default the labels
+        """
+        if self.comp is min:
+            index = np.argmin(np.where(labels != -1, norms, np.inf), axis=1)
+        else:
+            index = np.argmax(np.where(labels != -1, norms, -np.inf), axis=1)
+        return (labels if choices is None else choices)[np.arange(len(labels)), index]
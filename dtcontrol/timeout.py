@@ -57,6 +57,24 @@ def call_with_timeout(obj, method, *args, timeout=60):
             signal.signal(signal.SIGALRM, signal.SIG_IGN)
 
 def kill_oc1():
-    if dtcontrol.globals.oc1_pid is not None:
-        psutil.Process(dtcontrol.globals.oc1_pid).terminate()
-        dtcontrol.globals.oc1_pid = None
+    for pid in list(dtcontrol.globals.oc1_pids):
+        try:
+            psutil.Process(pid).terminate()
+        except psutil.NoSuchProcess:
+            pass
+        dtcontrol.globals.oc1_pids.discard(pid)
+
+def kill_process_tree(pid):
+    """
+    Kills the process with the given pid and all of its descendants, e.g. a benchmark worker and its OC1 process.
+    """
+    try:
+        process = psutil.Process(pid)
+        processes = process.children(recursive=True) + [process]
+    except psutil.NoSuchProcess:
+        return
+    for p in processes:
+        try:
+            p.kill()
+        except psutil.NoSuchProcess:
+            pass
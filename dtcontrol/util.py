@@ -60,6 +60,31 @@ class Caller(Enum):
     WEBUI = 3
 
 
+class ChunkedWriter:
+    """
+    Collects the many small strings of an exported tree and writes them to a file object in chunks. This is faster than
+    writing every string on its own, and unlike joining all strings, the memory used does not depend on the size of the
+    output.
+    """
+
+    def __init__(self, file, chunk_size=4096):
+        """
+        :param chunk_size: the number of strings written at once
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+        if len(self.parts) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(''.join(self.parts))
+        self.parts = []
+
+
 def ignore_convergence_warnings():
     logging.captureWarnings(capture=True)
     logger = logging.getLogger("py.warnings")
@@ -100,6 +125,30 @@ def make_set(v):
         return {v}
 
 
+def get_unique_rows(rows):
+    """
+    Finds the unique rows of a 2d array like np.unique(rows, axis=0), but a lot faster, by encoding every row as a single
+    int. Unique rows are numbered from 0 in the order of their first occurrence.
+    :returns: the index of the first occurrence of every unique row and the unique row number of every row
+    """
+    rows = np.asarray(rows)
+    keys = np.zeros(len(rows), dtype=np.int64)
+    num_keys = 1
+    for column in rows.T:
+        values, value_ids = np.unique(column, return_inverse=True)
+        if num_keys * len(values) >= 2 ** 62:
+            # compress the keys so far to avoid overflows
+            _, keys = np.unique(keys, return_inverse=True)
+            num_keys = int(keys.max()) + 1
+        keys = keys * len(values) + value_ids.reshape(-1)
+        num_keys *= len(values)
+    _, first_occurrences, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first_occurrences)
+    row_numbers = np.empty(len(first_occurrences), dtype=int)
+    row_numbers[order] = np.arange(len(first_occurrences))
+    return first_occurrences[order], row_numbers[inverse.reshape(-1)]
+
+
 def objround(obj, precision):
     if isinstance(obj, list) or isinstance(obj, np.ndarray):
         return [objround(o, precision) for o in obj]
@@ -11,4 +11,7 @@ dtcontrol -i examples/prism/firewire_abst.prism --use-preset singlesplit --rerun
 dtcontrol -i examples/cartpole.scs --use-preset mlentropy --rerun
 
 # Linear and multi-dim label
-dtcontrol -i examples/10rooms.scs --use-preset maxfreqlc --rerun
\ No newline at end of file
+dtcontrol -i examples/10rooms.scs --use-preset maxfreqlc --rerun
+
+# Parallel tree construction
+dtcontrol -i examples/cartpole.scs --use-preset cart --tree-jobs 2 --rerun
@@ -0,0 +1,115 @@
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree
+from dtcontrol.decision_tree.determinization.max_freq_determinizer import MaxFreqDeterminizer
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.entropy_ratio import EntropyRatio
+from dtcontrol.decision_tree.impurity.gini_index import GiniIndex
+from dtcontrol.decision_tree.impurity.max_minority import MaxMinority
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.impurity.multi_label_gini_index import MultiLabelGiniIndex
+from dtcontrol.decision_tree.impurity.sum_minority import SumMinority
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+
+class TestAxisAlignedSweep(unittest.TestCase):
+    def test_same_splits_single_output(self):
+        for impurity_measure, kwargs in [
+            (Entropy, {}),
+            (GiniIndex, {}),
+            (MaxMinority, {}),
+            (SumMinority, {}),
+            (lambda: Entropy(MaxFreqDeterminizer()), {'early_stopping': True, 'early_stopping_optimized': True}),
+            (MultiLabelEntropy, {'early_stopping': True, 'early_stopping_optimized': True}),
+            (MultiLabelGiniIndex, {'early_stopping': True})
+        ]:
+            self.assert_same_tree(self.create_single_output_dataset, impurity_measure, kwargs)
+
+    def test_same_splits_multi_output(self):
+        for impurity_measure, kwargs in [
+            (Entropy, {}),
+            (GiniIndex, {}),
+            (MultiLabelEntropy, {'early_stopping': True, 'early_stopping_optimized': True})
+        ]:
+            self.assert_same_tree(self.create_multi_output_dataset, impurity_measure, kwargs)
+
+    def test_same_splits_in_blocks(self):
+        for max_block_counts in [1, 5, 16]:
+            for impurity_measure, kwargs in [
+                (Entropy, {}),
+                (MultiLabelEntropy, {'early_stopping': True, 'early_stopping_optimized': True})
+            ]:
+                self.assert_same_tree(self.create_single_output_dataset, impurity_measure, kwargs, max_block_counts)
+            self.assert_same_tree(self.create_multi_output_dataset, Entropy, {}, max_block_counts)
+
+    def test_hand_checked_splits(self):
+        for x, y, feature, threshold in [
+            # both features separate the labels perfectly, the first feature is taken
+            ([[1, 5], [2, 5], [3, 6], [4, 6]], [1, 1, 2, 2], 0, 2.5),
+            # 1.5 and 3.5 both have the weighted entropy 3/4 * H(1/3, 2/3) and 2.5 has 1, the first one is taken
+            ([[1], [2], [3], [4]], [1, 2, 2, 1], 0, 1.5),
+            # the threshold lies halfway between two distinct values, equal values are never separated
+            ([[0.5, 0], [1, 1], [1, 0], [2, 1], [3, 0]], [1, 1, 1, 2, 2], 0, 1.5)
+        ]:
+            for sweep in [False, True]:
+                ds = SingleOutputDataset('hand.csv')
+                ds.x = np.array(x, dtype=float)
+                ds.y = np.array(y).reshape(-1, 1)
+                ds.x_metadata['categorical'] = []
+                ds.index_to_actual = {1: 1.0, 2: 2.0}
+                split = AxisAlignedSplittingStrategy(sweep=sweep).find_split(ds, Entropy())
+                self.assertEqual((feature, threshold), (split.feature, split.threshold))
+
+    def test_supports_counts(self):
+        self.assertTrue(Entropy().supports_counts())
+        self.assertTrue(MultiLabelGiniIndex().supports_counts())
+        self.assertFalse(EntropyRatio().supports_counts())
+
+    def assert_same_tree(self, create_dataset, impurity_measure, kwargs, max_block_counts=None):
+        trees = []
+        for sweep in [False, True]:
+            strategy = AxisAlignedSplittingStrategy(sweep=sweep)
+            if max_block_counts is not None:
+                strategy.MAX_BLOCK_COUNTS = max_block_counts
+            dt = DecisionTree([strategy], impurity_measure(), 'sweep', **kwargs)
+            dt.fit(create_dataset())
+            trees.append(self.describe(dt.root))
+        self.assertEqual(trees[0], trees[1])
+
+    def describe(self, node):
+        if node.is_leaf():
+            return node.index_label
+        return node.split.feature, node.split.threshold, [self.describe(c) for c in node.children]
+
+    @staticmethod
+    def create_single_output_dataset():
+        rng = np.random.default_rng(42)
+        ds = SingleOutputDataset('sweep.csv')
+        ds.x = (rng.integers(0, 8, size=(200, 3)) * 0.3).astype(np.float32)
+        ds.y = np.full((200, 2), -1)
+        ds.y[:, 0] = rng.integers(1, 5, size=200)
+        nondet = rng.random(200) < 0.3
+        ds.y[nondet, 1] = (ds.y[nondet, 0] % 4) + 1
+        ds.x_metadata['categorical'] = []
+        ds.index_to_actual = {i: float(i) for i in range(1, 5)}
+        return ds
+
+    @staticmethod
+    def create_multi_output_dataset():
+        rng = np.random.default_rng(42)
+        ds = MultiOutputDataset('sweep.csv')
+        ds.x = (rng.integers(0, 8, size=(200, 3)) * 0.3).astype(np.float32)
+        ds.y = np.full((2, 200, 2), -1)
+        ds.y[:, :, 0] = rng.integers(1, 4, size=(2, 200))
+        nondet = rng.random(200) < 0.3
+        ds.y[0, nondet, 1] = (ds.y[0, nondet, 0] % 3) + 1
+        ds.y[1, nondet, 1] = ds.y[1, nondet, 0]
+        ds.x_metadata['categorical'] = []
+        ds.index_to_actual = {i: float(i) for i in range(1, 4)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.impurity.auroc import AUROC
+from dtcontrol.decision_tree.impurity.determinizing_impurity_measure import DeterminizingImpurityMeasure
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.entropy_ratio import EntropyRatio
+from dtcontrol.decision_tree.impurity.gini_index import GiniIndex
+from dtcontrol.decision_tree.impurity.impurity_measure import PrecomputedSplit
+from dtcontrol.decision_tree.impurity.max_minority import MaxMinority
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.impurity.multi_label_gini_index import MultiLabelGiniIndex
+from dtcontrol.decision_tree.impurity.multi_label_twoing_rule import MultiLabelTwoingRule
+from dtcontrol.decision_tree.impurity.sum_minority import SumMinority
+from dtcontrol.decision_tree.impurity.twoing_rule import TwoingRule
+
+class TestBatchedImpurity(unittest.TestCase):
+    def test_same_impurities(self):
+        rng = np.random.default_rng(11)
+        ds = SingleOutputDataset('batched.csv')
+        ds.x = rng.random((60, 2))
+        ds.y = np.full((60, 2), -1)
+        ds.y[:, 0] = rng.integers(1, 4, size=60)
+        nondet = rng.random(60) < 0.4
+        ds.y[nondet, 1] = 4
+        left_masks = rng.random((20, 60)) < rng.random((20, 1))
+        left_masks[0] = True
+        left_masks[1] = False
+        for impurity_measure in [Entropy(), GiniIndex(), MaxMinority(), SumMinority(), EntropyRatio(), TwoingRule(),
+                                 AUROC(), MultiLabelEntropy(), MultiLabelGiniIndex(), MultiLabelTwoingRule()]:
+            if isinstance(impurity_measure, DeterminizingImpurityMeasure):
+                # as in Node.choose_split
+                impurity_measure.determinizer.pre_determinized_labels = None
+                impurity_measure.determinizer.pre_determinized_labels = impurity_measure.determinizer.determinize(ds)
+            expected = [impurity_measure.calculate_impurity(ds, PrecomputedSplit(mask)) for mask in left_masks]
+            actual = impurity_measure.calculate_impurities(ds, left_masks)
+            self.assertEqual(len(left_masks), len(actual))
+            self.assertEqual(sys.maxsize, actual[0])
+            self.assertEqual(sys.maxsize, actual[1])
+            for e, a in zip(expected, actual):
+                self.assertEqual(e, a, type(impurity_measure).__name__)
+            if isinstance(impurity_measure, DeterminizingImpurityMeasure):
+                impurity_measure.determinizer.pre_determinized_labels = None
+
+    def test_same_counts_in_blocks(self):
+        rng = np.random.default_rng(12)
+        ds = SingleOutputDataset('batched.csv')
+        ds.x = rng.random((50, 2))
+        ds.y = np.full((50, 3), -1)
+        ds.y[:, 0] = rng.integers(1, 6, size=50)
+        ds.y[rng.random(50) < 0.5, 1] = 7
+        ds.y[rng.random(50) < 0.3, 2] = 9
+        left_masks = rng.random((30, 50)) < rng.random((30, 1))
+        for impurity_measure in [Entropy(), MultiLabelEntropy()]:
+            expected = impurity_measure.calculate_impurities(ds, left_masks)
+            # at least one split per block, up to a block of all splits
+            for max_block_counts in [1, 100, 1000, 10 ** 6]:
+                impurity_measure.MAX_BLOCK_COUNTS = max_block_counts
+                self.assertTrue(np.array_equal(expected, impurity_measure.calculate_impurities(ds, left_masks)))
+
+if __name__ == '__main__':
+    unittest.main()
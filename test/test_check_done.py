@@ -0,0 +1,101 @@
+import unittest
+from functools import reduce
+
+import numpy as np
+
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import Node, NodeBuilder
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+
+class TestCheckDone(unittest.TestCase):
+    def test_label_row_ids(self):
+        ds = self.create_dataset(np.array([[1, 2, -1], [2, 1, -1], [1, 2, -1], [3, -1, -1]]))
+        ids = ds.get_label_row_ids()
+        self.assertEqual(ids[0], ids[2])
+        self.assertEqual(3, len(set(ids)))
+        view = ds.from_mask(np.array([True, False, True, False]))
+        self.assertTrue(np.array_equal(ids[[0, 2]], view.get_label_row_ids()))
+
+    def test_label_bitsets(self):
+        ds = self.create_dataset(np.array([[1, 2, -1], [63, -1, -1], [64, 127, 2]]))
+        bitsets = ds.get_label_bitsets()
+        self.assertEqual((3, 2), bitsets.shape)
+        self.assertEqual([[6, 0], [1 << 63, 0], [4, 1 | (1 << 63)]], bitsets.tolist())
+        self.assertEqual([[1 << 63, 0]], ds.from_mask(np.array([False, True, False])).get_label_bitsets().tolist())
+        # more words than labels per row
+        self.assertIsNone(self.create_dataset(np.array([[1, 200], [2, -1]])).get_label_bitsets())
+
+    def test_x_constant(self):
+        ds = self.create_dataset(np.array([[1], [2], [1], [2]]))
+        ds.x = np.array([[0., 1.], [1., 1.], [1., 1.], [1., 2.]])
+        self.assertFalse(ds.is_x_constant())
+        self.assertTrue(ds.from_mask(np.array([False, True, True, False])).is_x_constant())
+        self.assertFalse(ds.from_mask(np.array([True, False, True, False])).is_x_constant())
+        ds.x = np.array([[3., 1.], [3., 1.], [3., 1.], [3., 1.]])
+        ds.x_min = ds.x_max = None
+        self.assertFalse(ds.is_x_constant())
+        ds.x[:, 1] = 3.
+        ds.x_min = ds.x_max = None
+        self.assertTrue(ds.from_mask(np.array([True, True, False, False])).is_x_constant())
+
+    def test_same_as_full_check(self):
+        rng = np.random.default_rng(0)
+        y = np.full((400, 3), -1)
+        y[:, 0] = rng.integers(1, 4, size=400)
+        y[rng.random(400) < 0.6, 1] = 5
+        y[rng.random(400) < 0.3, 2] = 6
+        ds = self.create_dataset(y)
+        ds.x = rng.integers(0, 2, size=(400, 2)).astype(float)
+        for use_bitsets in [False, True]:
+            for optimized in [False, True]:
+                for _ in range(200):
+                    view = ds.from_mask(rng.random(400) < rng.choice([0.005, 0.02, 0.1]))
+                    if len(view) == 0:
+                        continue
+                    node = Node(NodeBuilder([AxisAlignedSplittingStrategy()], Entropy(), early_stopping=True,
+                                            early_stopping_optimized=optimized, use_label_bitsets=use_bitsets))
+                    done = node.check_done(view)
+                    self.assertEqual(self.full_check(view, optimized), (done, node.index_label))
+            # the bitsets are only cached if enabled
+            self.assertEqual(use_bitsets, ds.label_bitsets is not None)
+
+    def test_label_intersection(self):
+        ds = self.create_dataset(np.array([[1, 2, 3], [3, 1, -1], [2, 3, 1]]))
+        for use_bitsets in [False, True]:
+            self.assertEqual([1, 3], Node.get_label_intersection(ds, use_bitsets).tolist())
+            view = ds.from_mask(np.array([True, False, True]))
+            self.assertEqual([1, 2, 3], Node.get_label_intersection(view, use_bitsets).tolist())
+
+    @staticmethod
+    def full_check(dataset, optimized):
+        """
+        The checks of Node.check_done on the whole label and feature arrays.
+        """
+        y = dataset.get_single_labels()
+        if len(np.unique(y, axis=0)) <= 1:
+            labels = [label for label in y[0] if label != -1]
+            return True, labels[0] if len(labels) == 1 else labels
+        flattened = y.flatten()
+        counts = np.bincount(flattened[flattened != -1])[1:]
+        if np.any(counts == len(dataset)):
+            if optimized:
+                return True, np.where(counts == len(dataset))[0][0] + 1
+            intersection = reduce(np.intersect1d, y)
+            labels = list(intersection[intersection != -1])
+            return True, labels[0] if len(labels) == 1 else labels
+        if len(np.unique(dataset.x)) <= 1:
+            return True, None
+        return False, None
+
+    @staticmethod
+    def create_dataset(y):
+        ds = SingleOutputDataset('check_done.csv')
+        ds.x = np.arange(len(y), dtype=float).reshape(-1, 1)
+        ds.y = y
+        ds.x_metadata['categorical'] = []
+        ds.index_to_actual = {i: float(i) for i in range(1, y.max() + 1)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from dtcontrol.dataset.csv_dataset_loader import CSVDatasetLoader
+
+CSV_FILE = '''#PERMISSIVE
+#BEGIN 2 2
+0,1,5,0.5
+1,1,6,0.5
+0,1,6,0.25
+2,0,5,0.25
+0,1,7,0.5
+1,1,5,0.5
+'''
+
+class TestCSVLoader(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'controller.csv')
+            with open(filename, 'w') as f:
+                f.write(CSV_FILE)
+            for chunk_size in [None, 1, 4]:
+                x, x_metadata, y, y_metadata, index_to_actual = CSVDatasetLoader(chunk_size)._load_dataset(filename)
+                value_to_index = {v: k for k, v in index_to_actual.items()}
+                self.assertEqual({5, 6, 7, 0.5, 0.25}, set(value_to_index))
+                self.assertTrue(np.array_equal([[0, 1], [1, 1], [2, 0]], x))
+                expected = [[[5, 6, 7], [6, 5, None], [5, None, None]],
+                            [[0.5, 0.25, 0.5], [0.5, 0.5, None], [0.25, None, None]]]
+                expected = [[[value_to_index.get(v, -1) for v in row] for row in output] for output in expected]
+                self.assertTrue(np.array_equal(expected, y))
+                self.assertEqual(np.int16, y.dtype)
+
+    def test_same_result_in_chunks(self):
+        filename = os.path.join(os.path.dirname(__file__), 'golf_multi.csv')
+        expected = CSVDatasetLoader()._load_dataset(filename)
+        for chunk_size in [1, 5]:
+            actual = CSVDatasetLoader(chunk_size)._load_dataset(filename)
+            self.assertTrue(np.array_equal(expected[0], actual[0]))
+            self.assertTrue(np.array_equal(expected[2], actual[2]))
+            self.assertEqual(expected[4], actual[4])
+
+    def test_chunk_size(self):
+        filename = os.path.join(os.path.dirname(__file__), 'golf_multi.csv')
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DTCONTROL_CSV_CHUNK_SIZE', None)
+            self.assertIsNone(CSVDatasetLoader().get_chunk_size(filename))
+            self.assertEqual(3, CSVDatasetLoader(3).get_chunk_size(filename))
+            loader = CSVDatasetLoader()
+            loader.CHUNKING_THRESHOLD = 10
+            self.assertEqual(CSVDatasetLoader.DEFAULT_CHUNK_SIZE, loader.get_chunk_size(filename))
+            os.environ['DTCONTROL_CSV_CHUNK_SIZE'] = '7'
+            self.assertEqual(7, CSVDatasetLoader().get_chunk_size(filename))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.csv_dataset_loader import CSVDatasetLoader
+from dtcontrol.dataset.dataset_cache import DatasetCache
+
+CSV_FILE = '''#PERMISSIVE
+#BEGIN 2 1
+0,1,5
+1,1,6
+2,0,5
+'''
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        self.filename = os.path.join(self.directory, 'controller.csv')
+        with open(self.filename, 'w') as f:
+            f.write(CSV_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_content_hash(self):
+        cache = DatasetCache(self.cache_directory)
+        entry = cache.get_entry(self.filename, 'CSVDatasetLoader')
+        copy = os.path.join(self.directory, 'copy', 'controller.csv')
+        os.makedirs(os.path.dirname(copy))
+        shutil.copy(self.filename, copy)
+        self.assertEqual(entry, cache.get_entry(copy, 'CSVDatasetLoader'))
+        os.utime(self.filename, ns=(0, 0))
+        self.assertEqual(entry, cache.get_entry(self.filename, 'CSVDatasetLoader'))
+        self.assertNotEqual(entry, cache.get_entry(self.filename, 'ScotsDatasetLoader'))
+        with open(os.path.join(self.directory, 'controller_config.json'), 'w') as f:
+            f.write('{"x_column_names": ["a", "b"]}')
+        self.assertNotEqual(entry, cache.get_entry(self.filename, 'CSVDatasetLoader'))
+        with open(self.filename, 'a') as f:
+            f.write('0,0,6\n')
+        self.assertNotEqual(entry, cache.get_entry(self.filename, 'CSVDatasetLoader'))
+
+    def test_loader_uses_cache(self):
+        cache = DatasetCache(self.cache_directory)
+        loader = CSVDatasetLoader()
+        loader.cache = cache
+        x, _, y, _, index_to_actual = loader.load_dataset(self.filename)
+        entry = cache.get_entry(self.filename, 'CSVDatasetLoader')
+        self.assertTrue(os.path.exists(os.path.join(entry, 'X_train.npy')))
+        loader = CSVDatasetLoader()
+        loader.cache = cache
+        cached_x, _, cached_y, _, cached_index_to_actual = loader.load_dataset(self.filename)
+        self.assertIsInstance(cached_x, np.memmap)
+        self.assertTrue(np.array_equal(x, cached_x))
+        self.assertTrue(np.array_equal(y, cached_y))
+        self.assertEqual(index_to_actual, cached_index_to_actual)
+
+    def test_eviction(self):
+        cache = DatasetCache(self.cache_directory, max_size=2500)
+        entries = [os.path.join(self.cache_directory, f'entry{i}') for i in range(3)]
+        for i, entry in enumerate(entries):
+            cache.save(entry, np.zeros((100, 1)), {}, np.zeros((10, 1)), {}, {})
+            os.utime(entry, (i, i))
+        self.assertEqual([False, True, True], [os.path.exists(entry) for entry in entries])
+        self.assertIsNotNone(cache.load(entries[1]))
+        cache.save(os.path.join(self.cache_directory, 'entry3'), np.zeros((100, 1)), {}, np.zeros((10, 1)), {}, {})
+        self.assertEqual([False, True, False], [os.path.exists(entry) for entry in entries])
+        self.assertIsNone(cache.load(entries[2]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+
+class TestDatasetView(unittest.TestCase):
+    def test_single_output_view(self):
+        ds = SingleOutputDataset('view.csv')
+        ds.x = np.arange(12, dtype=float).reshape(6, 2)
+        ds.y = np.array([[1, -1], [2, -1], [1, 2], [2, -1], [1, -1], [1, 2]])
+        ds.x_metadata['categorical'] = [1]
+
+        first = ds.from_mask(np.array([True, False, True, True, False, True]))
+        second = first.from_mask(np.array([False, True, True, False]))
+        self.assertIs(ds, second.root)
+        self.assertEqual([2, 3], list(second.indices))
+        self.assertEqual(2, len(second))
+        self.assertTrue(np.array_equal(ds.x[[2, 3]], second.x))
+        self.assertTrue(np.array_equal(ds.y[[2, 3]], second.y))
+        self.assertTrue(np.array_equal(ds.x[[2, 3]][:, [0]], second.get_numeric_x()))
+        self.assertTrue(np.array_equal(ds.get_unique_labels()[[2, 3]], second.get_unique_labels()))
+        self.assertEqual([1, 2], second.map_unique_label_back(second.get_unique_labels()[0]))
+
+        second.release_materialized_arrays()
+        self.assertIsNone(second._x)
+        self.assertTrue(np.array_equal(ds.x[[2, 3]], second.x))
+
+    def test_multi_output_view(self):
+        ds = MultiOutputDataset('view.csv')
+        ds.x = np.arange(4, dtype=float).reshape(4, 1)
+        ds.y = np.array([[[1, 2], [1, -1], [2, -1], [1, 2]],
+                         [[3, 3], [4, -1], [3, -1], [3, 3]]])
+        ds.x_metadata['categorical'] = []
+
+        view = ds.from_mask(np.array([False, True, True, True]))
+        self.assertTrue(np.array_equal(ds.y[:, 1:], view.y))
+        self.assertTrue(np.array_equal(ds.get_tuple_ids()[1:], view.get_tuple_ids()))
+        self.assertEqual((1, 3), view.map_single_label_back(view.get_single_labels()[2, 0]))
+        self.assertTrue(np.array_equal(ds.get_tuples()[1:], view.get_tuples()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree, Node
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit, AxisAlignedSplittingStrategy
+from dtcontrol.post_processing.safe_pruning import SafePruning
+
+class TestExpansionOrder(unittest.TestCase):
+    def test_same_tree_as_recursive_construction(self):
+        for dataset_class, tree in [
+            (SingleOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'CART',
+                                                                **kwargs)),
+            (SingleOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], MultiLabelEntropy(),
+                                                                'multilabel', early_stopping=True, **kwargs)),
+            (MultiOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'CART',
+                                                               **kwargs))
+        ]:
+            recursive = tree()
+            recursive.root = Node(recursive.create_builder())
+            self.fit_recursively(recursive.root, self.create_dataset(dataset_class), {})
+            for order in ['dfs', 'bfs', 'best-first']:
+                dt = tree(expansion_order=order)
+                dt.fit(self.create_dataset(dataset_class))
+                if order == 'dfs':
+                    self.assertEqual(self.describe(recursive.root), self.describe(dt.root))
+                self.assertEqual(recursive.print_dot({}, {}), dt.print_dot({}, {}))
+                self.assertEqual(recursive.print_c(), dt.print_c())
+                self.assertEqual(recursive.toJSON({}, {}), dt.toJSON({}, {}))
+
+    def fit_recursively(self, node, dataset, kwargs):
+        """
+        The recursive construction that Node.fit replaces.
+        """
+        if node.choose_split(dataset, kwargs) is None:
+            return
+        for child, subset, child_kwargs in node.create_children(dataset, kwargs):
+            self.fit_recursively(child, subset, child_kwargs)
+        node.num_nodes = 1 + sum([c.num_nodes for c in node.children])
+        node.num_inner_nodes = 1 + sum([c.num_inner_nodes for c in node.children])
+
+    def test_deep_tree(self):
+        depth = 2 * sys.getrecursionlimit()
+        root = node = Node()
+        for i in range(depth):
+            node.split = AxisAlignedSplit(0, i + 0.5)
+            node.children = [Node(), Node()]
+            node.children[0].index_label = node.children[0].actual_label = 1
+            node.children[0].num_nodes = 1
+            node = node.children[1]
+        node.index_label = node.actual_label = 1
+        node.num_nodes = 1
+        root.update_num_nodes()
+        self.assertEqual(2 * depth + 1, root.num_nodes)
+        self.assertEqual(depth, root.print_dot({}, {}).count('style="dashed"'))
+        self.assertEqual(depth, root.print_c().count('else {'))
+        json_dict = root.to_json_dict({})
+        for _ in range(depth):
+            self.assertEqual('false', json_dict['children'][1]['edge_label'])
+            json_dict = json_dict['children'][1]
+        self.assertEqual(['1'], json_dict['actual_label'])
+
+        dt = DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'deep')
+        dt.root = root
+        SafePruning(dt).run()
+        self.assertTrue(root.is_leaf())
+        self.assertEqual(1, root.index_label)
+
+    @staticmethod
+    def create_dataset(dataset_class):
+        rng = np.random.default_rng(7)
+        x = np.array(np.meshgrid(np.arange(6), np.arange(5), np.arange(4))).reshape(3, -1).T.astype(float)
+        n = len(x)
+        ds = dataset_class('expansion.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        nondet = rng.random(n) < 0.3
+        if dataset_class is SingleOutputDataset:
+            ds.y = np.full((n, 2), -1)
+            ds.y[:, 0] = rng.integers(1, 4, size=n)
+            ds.y[nondet, 1] = 4
+        else:
+            ds.y = np.full((2, n, 2), -1)
+            ds.y[:, :, 0] = rng.integers(1, 3, size=(2, n))
+            ds.y[:, nondet, 1] = 3
+        ds.index_to_actual = {i: float(i) / 2 for i in range(1, 5)}
+        return ds
+
+    @staticmethod
+    def describe(root):
+        description = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            description.append((str(node.split), str(node.index_label), str(node.actual_label), node.num_nodes,
+                                node.num_inner_nodes, node.depth))
+            stack.extend(node.children)
+        return description
+
+if __name__ == '__main__':
+    unittest.main()
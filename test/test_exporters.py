@@ -0,0 +1,90 @@
+import io
+import json
+import unittest
+
+import numpy as np
+
+from dtcontrol import util
+from dtcontrol.benchmark_suite import BenchmarkSuite, multi_output_c_template, single_output_c_template
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+from dtcontrol.decision_tree.splitting.categorical_multi import CategoricalMultiSplittingStrategy
+from dtcontrol.util import ChunkedWriter
+
+class TestExporters(unittest.TestCase):
+    def test_chunked_writer(self):
+        file = io.StringIO()
+        writer = ChunkedWriter(file, chunk_size=3)
+        for text in ['a', 'b', 'c', 'd']:
+            writer.write(text)
+        self.assertEqual('abc', file.getvalue())
+        writer.flush()
+        self.assertEqual('abcd', file.getvalue())
+
+    def test_same_as_strings(self):
+        x_metadata = {'variables': ['x0', 'x1', 'x2']}
+        y_metadata = {}
+        for dt, ds in self.create_trees():
+            file = io.StringIO()
+            dt.write_dot(file, x_metadata, y_metadata)
+            self.assertEqual(dt.print_dot(x_metadata, y_metadata), file.getvalue())
+            file = io.StringIO()
+            dt.write_c(file)
+            self.assertEqual(dt.print_c(), file.getvalue())
+            file = io.StringIO()
+            dt.write_json(file, x_metadata, y_metadata)
+            expected = dt.root.to_json_dict(y_metadata, variables=x_metadata['variables'])
+            self.assertEqual(json.dumps(expected, indent=4, default=util.convert), file.getvalue())
+            self.assertEqual(expected, json.loads(dt.toJSON(x_metadata, y_metadata)))
+
+    def test_c_file(self):
+        for dt, ds in self.create_trees():
+            num_outputs = 1 if len(ds.y.shape) <= 2 else len(ds.y)
+            template = multi_output_c_template if num_outputs > 1 else single_output_c_template
+            example = f'{{{",".join(str(i) + (".f" if isinstance(i, np.integer) else "f") for i in ds.x[0])}}}'
+            file = io.StringIO()
+            BenchmarkSuite.write_c_file(file, dt, ds)
+            self.assertEqual(template.render(example=example, num_outputs=num_outputs, code=dt.print_c()),
+                             file.getvalue())
+
+    def create_trees(self):
+        trees = []
+        for dataset_class, strategies, impurity_measure, kwargs in [
+            (SingleOutputDataset, [AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (SingleOutputDataset, [AxisAlignedSplittingStrategy()], MultiLabelEntropy(), {'early_stopping': True}),
+            (SingleOutputDataset, [CategoricalMultiSplittingStrategy(), AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (MultiOutputDataset, [AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (MultiOutputDataset, [AxisAlignedSplittingStrategy()], MultiLabelEntropy(), {'early_stopping': True})
+        ]:
+            ds = self.create_dataset(dataset_class, strategies[0])
+            dt = DecisionTree(strategies, impurity_measure, 'exporters', **kwargs)
+            dt.fit(ds)
+            trees.append((dt, ds))
+        return trees
+
+    @staticmethod
+    def create_dataset(dataset_class, first_strategy):
+        rng = np.random.default_rng(3)
+        x = np.array(np.meshgrid(np.arange(6), np.arange(5), np.arange(4))).reshape(3, -1).T.astype(float)
+        n = len(x)
+        ds = dataset_class('exporters.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = [0] if isinstance(first_strategy, CategoricalMultiSplittingStrategy) else []
+        nondet = rng.random(n) < 0.3
+        if dataset_class is SingleOutputDataset:
+            ds.y = np.full((n, 2), -1)
+            ds.y[:, 0] = rng.integers(1, 4, size=n)
+            ds.y[nondet, 1] = 4
+        else:
+            ds.y = np.full((2, n, 2), -1)
+            ds.y[:, :, 0] = rng.integers(1, 3, size=(2, n))
+            ds.y[:, nondet, 1] = 3
+        ds.index_to_actual = {i: float(i) / 2 for i in range(1, 5)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
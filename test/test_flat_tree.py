@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree, Node
+from dtcontrol.decision_tree.flat_tree import FlatTree
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+from dtcontrol.decision_tree.splitting.categorical_multi import CategoricalMultiSplittingStrategy
+from dtcontrol.decision_tree.splitting.linear_classifier import LinearClassifierSplittingStrategy
+from dtcontrol.decision_tree.splitting.linear_split import LinearSplit
+
+class TestFlatTree(unittest.TestCase):
+    def test_single_output(self):
+        for strategies, impurity_measure, kwargs in [
+            ([AxisAlignedSplittingStrategy()], Entropy(), {}),
+            ([AxisAlignedSplittingStrategy()], MultiLabelEntropy(), {'early_stopping': True}),
+            ([AxisAlignedSplittingStrategy(), LinearClassifierSplittingStrategy(LogisticRegression, solver='lbfgs')],
+             Entropy(), {}),
+            ([CategoricalMultiSplittingStrategy(), AxisAlignedSplittingStrategy()], Entropy(), {})
+        ]:
+            ds = self.create_dataset(SingleOutputDataset, strategies[0])
+            self.assert_same_predictions(DecisionTree(strategies, impurity_measure, 'flat', **kwargs), ds)
+
+    def test_multi_output(self):
+        for impurity_measure, kwargs in [(Entropy(), {}), (MultiLabelEntropy(), {'early_stopping': True})]:
+            ds = self.create_dataset(MultiOutputDataset, None)
+            self.assert_same_predictions(DecisionTree([AxisAlignedSplittingStrategy()], impurity_measure, 'flat',
+                                                      **kwargs), ds)
+
+    def test_examples_on_hyperplane(self):
+        rng = np.random.default_rng(0)
+        numeric_columns = [c for c in range(12) if c != 3]
+        for _ in range(50):
+            coefficients = rng.normal(size=len(numeric_columns))
+            x = rng.normal(size=(20, 12))
+            # the first example lies exactly on the hyperplane
+            intercept = -np.sum(x[0, numeric_columns] * coefficients)
+            real_coefficients = np.zeros(12)
+            real_coefficients[numeric_columns] = coefficients
+            root = Node()
+            root.split = LinearSplit(coefficients, intercept, real_coefficients, numeric_columns)
+            root.children = [Node(), Node()]
+            for label, child in enumerate(root.children):
+                child.index_label = child.actual_label = label
+            self.assertEqual(0, root.predict(x[:1])[0])
+            self.assertEqual(root.predict(x), FlatTree(root).predict(x))
+
+    def assert_same_predictions(self, dt, ds):
+        dt.fit(ds)
+        for actual_values in [False, True]:
+            self.assertEqual(dt.root.predict(ds.x, actual_values), dt.predict(ds, actual_values))
+        self.assertEqual(ds.compute_accuracy(dt.root.predict(ds.x, actual_values=False)), dt.compute_accuracy(ds))
+        self.assertEqual(1.0, dt.compute_accuracy(ds))
+
+    @staticmethod
+    def create_dataset(dataset_class, first_strategy):
+        rng = np.random.default_rng(7)
+        x = np.array(np.meshgrid(np.arange(6), np.arange(5), np.arange(4))).reshape(3, -1).T.astype(float)
+        n = len(x)
+        ds = dataset_class('flat.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = [0] if isinstance(first_strategy, CategoricalMultiSplittingStrategy) else []
+        nondet = rng.random(n) < 0.3
+        if dataset_class is SingleOutputDataset:
+            ds.y = np.full((n, 2), -1)
+            ds.y[:, 0] = rng.integers(1, 4, size=n)
+            ds.y[nondet, 1] = 4
+        else:
+            ds.y = np.full((2, n, 2), -1)
+            ds.y[:, :, 0] = rng.integers(1, 3, size=(2, n))
+            ds.y[:, nondet, 1] = 3
+        ds.index_to_actual = {i: float(i) / 2 for i in range(1, 5)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from functools import reduce
+
+import numpy as np
+
+import dtcontrol.dataset.label_bitsets as label_bitsets
+
+class TestLabelBitsets(unittest.TestCase):
+    def test_conversions(self):
+        labels = np.array([[1, 2, -1], [3, -1, -1], [2, 3, 1], [70, 64, -1]])
+        bitsets = label_bitsets.to_bitsets(labels)
+        self.assertEqual(np.uint64, bitsets.dtype)
+        self.assertEqual([[6, 0], [8, 0], [14, 0], [0, 1 | (1 << 6)]], bitsets.tolist())
+        self.assertEqual([[1, 2, -1], [3, -1, -1], [1, 2, 3], [64, 70, -1]],
+                         label_bitsets.from_bitsets(bitsets).tolist())
+        self.assertEqual([[1, 2, -1, -1]], label_bitsets.from_bitsets(bitsets[:1], width=4).tolist())
+        with self.assertRaises(ValueError):
+            label_bitsets.from_bitsets(bitsets, width=2)
+        self.assertEqual((4, 3), label_bitsets.to_bitsets(labels, num_labels=150).shape)
+
+    def test_random_labels(self):
+        rng = np.random.default_rng(0)
+        for num_labels in [5, 64, 65, 300]:
+            labels = self.create_labels(rng, (3, 200), num_labels)
+            bitsets = label_bitsets.to_bitsets(labels, num_labels)
+            self.assertEqual((3, 200, label_bitsets.get_num_words(num_labels)), bitsets.shape)
+            expected = np.sort(np.where(labels == -1, num_labels, labels), axis=-1)
+            expected[expected == num_labels] = -1
+            self.assertTrue(np.array_equal(expected, label_bitsets.from_bitsets(bitsets, width=4)))
+            self.assertTrue(np.array_equal((labels != -1).sum(axis=-1), label_bitsets.popcount(bitsets)))
+            flattened = labels[0].flatten()
+            self.assertTrue(np.array_equal(np.bincount(flattened[flattened != -1], minlength=num_labels),
+                                           label_bitsets.count_labels(bitsets[0], num_labels)))
+            self.assertTrue(np.array_equal(np.bincount(flattened[flattened != -1],
+                                                       minlength=bitsets.shape[-1] * label_bitsets.WORD_SIZE),
+                                           label_bitsets.count_labels(bitsets[0])))
+
+    def test_intersect(self):
+        rng = np.random.default_rng(1)
+        for num_labels in [3, 100]:
+            labels = self.create_labels(rng, (50,), num_labels)
+            labels[:, 0] = num_labels - 1  # a label allowed everywhere
+            others = labels[:, 1:]
+            others[others == num_labels - 1] = -1
+            for rows in [labels[:1], labels[:2], labels]:
+                expected = np.unique(reduce(np.intersect1d, rows))
+                bitset = label_bitsets.intersect(label_bitsets.to_bitsets(rows, num_labels))
+                self.assertEqual(list(expected[expected != -1]), list(label_bitsets.get_labels(bitset)))
+
+    @staticmethod
+    def create_labels(rng, shape, num_labels, width=4):
+        """
+        :returns: up to width distinct labels per row, in random order and padded with -1
+        """
+        labels = np.argsort(rng.random(shape + (num_labels,)), axis=-1)[..., :width]
+        lengths = rng.integers(0, min(width, num_labels) + 1, size=shape)
+        labels[np.arange(labels.shape[-1]) >= lengths[..., np.newaxis]] = -1
+        return labels
+
+if __name__ == '__main__':
+    unittest.main()
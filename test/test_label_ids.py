@@ -0,0 +1,28 @@
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.dataset import Dataset
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+
+class TestLabelIds(unittest.TestCase):
+    def test_unique_labels_from_2d(self):
+        labels = np.array([[3, -1, -1], [1, 2, -1], [2, 1, -1], [3, -1, -1], [10, 2, 1], [-1, -1, -1]])
+        unique_labels, int_to_label = Dataset.get_unique_labels_from_2d(labels)
+        self.assertEqual([1, 2, 2, 1, 3, 4], list(unique_labels))
+        self.assertEqual([1, 2, 3, 4], list(int_to_label))
+        self.assertEqual([1, 2, -1], list(int_to_label[2]))
+        self.assertEqual([10, 2, 1], list(int_to_label[3]))
+
+    def test_tuple_ids(self):
+        ds = MultiOutputDataset('ids.csv')
+        ds.x = np.zeros((4, 1))
+        ds.y = np.array([[[0, -1, -1], [0, -1, -1], [0, -1, -1], [1, 2, 0]],
+                         [[0, -1, -1], [0, -1, -1], [0, -1, -1], [0, 0, 0]]])
+        self.assertTrue(np.array_equal([[2, -1, -1], [2, -1, -1], [2, -1, -1], [3, 4, 2]], ds.get_tuple_ids()))
+        self.assertEqual({(-1, -1): -1, (0, 0): 2, (1, 0): 3, (2, 0): 4}, ds.tuple_to_tuple_id)
+        self.assertEqual((1, 0), ds.tuple_id_to_tuple[3])
+        self.assertEqual([1, 1, 1, 2], list(ds.get_unique_labels()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.determinization.max_freq_determinizer import MaxFreqDeterminizer
+from dtcontrol.pre_processing.norm_pre_processor import NormPreProcessor
+
+class TestLabelPreProcessing(unittest.TestCase):
+    def test_max_freq_labels(self):
+        labels = np.array([[1, 2, -1], [3, -1, -1], [2, 1, -1], [3, 1, 2], [4, 3, -1]])
+        # counts: 1 -> 3, 2 -> 3, 3 -> 3, 4 -> 1; ties are broken by the order in the row
+        self.assertEqual([1, 3, 2, 3, 3], list(MaxFreqDeterminizer.get_max_freq_labels(labels)))
+
+        rng = np.random.default_rng(0)
+        labels = self.create_labels(rng, 500, 4, 6)
+        label_counts = MaxFreqDeterminizer.get_label_counts(labels)
+        expected = [max(list(row[row != -1]), key=lambda l: label_counts[l]) for row in labels]
+        self.assertEqual(expected, list(MaxFreqDeterminizer.get_max_freq_labels(labels)))
+
+    def test_norm_single_output(self):
+        ds = SingleOutputDataset('norm.csv')
+        ds.y = np.array([[1, 2, -1], [3, -1, -1], [2, 4, 1], [4, 2, -1]])
+        ds.index_to_actual = {1: -2.0, 2: 0.5, 3: 1.0, 4: -0.5}
+        self.assertEqual([[2], [3], [2], [4]], NormPreProcessor(min).preprocess_single_output(ds).tolist())
+        self.assertEqual([[1], [3], [1], [4]], NormPreProcessor(max).preprocess_single_output(ds).tolist())
+
+    def test_norm_multi_output(self):
+        rng = np.random.default_rng(1)
+        ds = MultiOutputDataset('norm.csv')
+        lengths = rng.integers(1, 5, size=300)
+        ds.y = np.array([self.create_labels(rng, 300, 4, 5, lengths) for _ in range(3)])
+        ds.index_to_actual = {i: float(rng.integers(-3, 4)) for i in range(1, 6)}
+        for comp in [min, max]:
+            expected = []
+            for arr in np.stack(ds.y, axis=2):
+                expected.append(comp([t for t in arr if t[0] != -1],
+                                     key=lambda t: sum(ds.index_to_actual[j] ** 2 for j in t)))
+            expected = np.array(np.split(np.array(expected), len(ds.y), 1))
+            self.assertTrue(np.array_equal(expected, NormPreProcessor(comp).preprocess_multi_output(ds)))
+
+    def test_invalid_comparison(self):
+        with self.assertRaises(ValueError):
+            NormPreProcessor(sorted)
+
+    @staticmethod
+    def create_labels(rng, num_rows, max_num_labels, num_labels, lengths=None):
+        labels = rng.integers(1, num_labels + 1, size=(num_rows, max_num_labels))
+        if lengths is None:
+            lengths = rng.integers(1, max_num_labels + 1, size=num_rows)
+        labels[np.arange(max_num_labels) >= lengths[:, np.newaxis]] = -1
+        return labels
+
+if __name__ == '__main__':
+    unittest.main()
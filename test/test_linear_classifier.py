@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+from dtcontrol.decision_tree.splitting.linear_classifier import LinearClassifierSplittingStrategy
+
+class RecordingLogisticRegression(LogisticRegression):
+    """
+    Records the number of examples of every fit together with the coefficients it starts from and ends with.
+    """
+    fits = []
+
+    def fit(self, X, y, sample_weight=None):
+        start = np.copy(self.coef_) if hasattr(self, 'coef_') else None
+        result = super().fit(X, y, sample_weight)
+        RecordingLogisticRegression.fits.append((len(X), start, np.copy(self.coef_)))
+        return result
+
+class TestLinearClassifier(unittest.TestCase):
+    def setUp(self):
+        RecordingLogisticRegression.fits = []
+
+    def test_parallel_fits(self):
+        trees = []
+        for num_jobs in [1, 3]:
+            strategy = LinearClassifierSplittingStrategy(LogisticRegression, num_jobs=num_jobs, solver='lbfgs')
+            dt = DecisionTree([AxisAlignedSplittingStrategy(), strategy], Entropy(), 'logreg')
+            dt.fit(self.create_dataset())
+            trees.append(dt)
+        self.assertEqual(trees[0].print_c(), trees[1].print_c())
+        self.assertGreater(trees[0].root.num_nodes, 3)
+
+    def test_max_num_labels(self):
+        dataset = self.create_dataset()
+        strategy = LinearClassifierSplittingStrategy(RecordingLogisticRegression, max_num_labels=2, solver='lbfgs')
+        strategy.find_split(dataset, Entropy())
+        self.assertEqual(2, len(RecordingLogisticRegression.fits))
+        self.assertEqual(4, len(np.unique(strategy.determinizer.determinize(dataset))))
+
+        RecordingLogisticRegression.fits = []
+        strategy = LinearClassifierSplittingStrategy(RecordingLogisticRegression, max_num_labels=10, solver='lbfgs')
+        strategy.find_split(dataset, Entropy())
+        self.assertEqual(4, len(RecordingLogisticRegression.fits))
+
+    def test_warm_start_from_parent(self):
+        strategy = LinearClassifierSplittingStrategy(RecordingLogisticRegression, warm_start_from_parent=True,
+                                                     solver='lbfgs')
+        dt = DecisionTree([strategy], Entropy(), 'logreg')
+        with self.assertLogs('linear_classifier_logger', 'DEBUG') as logs:
+            dt.fit(self.create_dataset())
+        self.assertIn('linear classifiers for 200 examples', logs.output[0])
+        self.assertGreaterEqual(len(logs.output), dt.root.num_inner_nodes)
+        root_fits = [(start, coef) for num_examples, start, coef in RecordingLogisticRegression.fits
+                     if num_examples == 200]
+        child_starts = [start for num_examples, start, _ in RecordingLogisticRegression.fits if num_examples < 200]
+        self.assertTrue(all(start is None for start, _ in root_fits))
+        # the first child starts from the coefficients fitted at the root
+        self.assertIsNotNone(child_starts[0])
+        self.assertTrue(any(np.array_equal(child_starts[0], coef) for _, coef in root_fits))
+        self.assertGreater(dt.root.num_nodes, 3)
+        # the fits are dropped once the children of a node have started
+        self.assertEqual({}, strategy.node_fits)
+        self.assertEqual({}, strategy.parent_fits)
+
+    def test_warm_start_best_first(self):
+        strategy = LinearClassifierSplittingStrategy(RecordingLogisticRegression, warm_start_from_parent=True,
+                                                     solver='lbfgs')
+        dt = DecisionTree([AxisAlignedSplittingStrategy(), strategy], Entropy(), 'logreg', expansion_order='best-first')
+        dt.fit(self.create_dataset())
+        self.assertTrue(any(start is not None for _, start, _ in RecordingLogisticRegression.fits))
+        self.assertEqual({}, strategy.node_fits)
+        self.assertEqual({}, strategy.parent_fits)
+
+    def test_warm_start_not_supported(self):
+        with self.assertRaises(ValueError):
+            LinearClassifierSplittingStrategy(LinearSVC, warm_start_from_parent=True)
+        LinearClassifierSplittingStrategy(LinearSVC)
+
+    @staticmethod
+    def create_dataset():
+        rng = np.random.default_rng(5)
+        n = 200
+        x = rng.uniform(-5, 5, size=(n, 2))
+        ds = SingleOutputDataset('linear.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        ds.y = np.full((n, 1), -1)
+        ds.y[:, 0] = (x[:, 0] + x[:, 1] > 0) + 2 * (x[:, 0] - 2 * x[:, 1] > 1) + 1
+        ds.index_to_actual = {i: float(i) for i in range(1, 5)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.twoing_rule import TwoingRule
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit
+from dtcontrol.decision_tree.splitting.splitting_strategy import SplittingStrategy
+
+class CountingSplit(AxisAlignedSplit):
+    num_created = 0
+    num_calls = 0
+
+    def __init__(self, feature, threshold, priority=1):
+        super().__init__(feature, threshold, priority)
+        CountingSplit.num_created += 1
+
+    def get_masks(self, dataset):
+        CountingSplit.num_calls += 1
+        return super().get_masks(dataset)
+
+class MedianSplittingStrategy(SplittingStrategy):
+    """
+    Proposes a split at the median of every feature.
+    """
+
+    def find_split(self, dataset, impurity_measure, **kwargs):
+        candidates = []
+        for feature in range(dataset.x.shape[1]):
+            values = np.unique(dataset.x[:, feature])
+            if len(values) > 1:
+                candidates.append(CountingSplit(feature, (values[len(values) // 2 - 1] + values[len(values) // 2]) / 2))
+        splits = self.calculate_impurities(dataset, impurity_measure, candidates)
+        return min(splits.keys(), key=splits.get) if splits else None
+
+class TestMaskCache(unittest.TestCase):
+    def test_masks_computed_once(self):
+        for impurity_measure in [Entropy(), TwoingRule()]:
+            CountingSplit.num_created = 0
+            CountingSplit.num_calls = 0
+            dt = DecisionTree([MedianSplittingStrategy()], impurity_measure, 'median')
+            ds = self.create_dataset()
+            dt.fit(ds)
+            self.assertEqual(3, dt.root.num_inner_nodes)
+            # the impurity, the choice of the split and the partition of a node all use the masks of the search
+            self.assertEqual(CountingSplit.num_created, CountingSplit.num_calls)
+            self.assertEqual(1.0, dt.compute_accuracy(ds))
+
+            stack = [dt.root]
+            while stack:
+                node = stack.pop()
+                self.assertIsNone(node.split.mask_cache if node.split else None)
+                stack.extend(node.children)
+
+    def test_invalidation(self):
+        ds = self.create_dataset()
+        split = CountingSplit(0, 2.5)
+        CountingSplit.num_calls = 0
+        masks = split.get_cached_masks(ds)
+        self.assertIs(masks, split.get_cached_masks(ds))
+        self.assertEqual(1, CountingSplit.num_calls)
+        restored = pickle.loads(pickle.dumps(split))
+        self.assertIsNone(restored.mask_cache)
+        split.priority = 0.5
+        self.assertIs(masks, split.get_cached_masks(ds))
+        split.threshold = 0.5
+        self.assertIsNone(split.mask_cache)
+        self.assertEqual(np.sum(ds.x[:, 0] <= 0.5), np.sum(split.get_cached_masks(ds)[0]))
+        self.assertEqual(2, CountingSplit.num_calls)
+        other = self.create_dataset()
+        split.get_cached_masks(other)
+        self.assertEqual(3, CountingSplit.num_calls)
+
+    @staticmethod
+    def create_dataset():
+        x = np.array(np.meshgrid(np.arange(6), np.arange(5))).reshape(2, -1).T.astype(float)
+        ds = SingleOutputDataset('masks.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        ds.y = np.full((len(x), 1), -1)
+        ds.y[:, 0] = (x[:, 0] >= 3).astype(int) + 2 * (x[:, 1] >= 2).astype(int) + 1
+        ds.index_to_actual = {i: float(i) for i in range(1, 5)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import dtcontrol.globals
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.determinization.label_powerset_determinizer import LabelPowersetDeterminizer
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.entropy_ratio import EntropyRatio
+from dtcontrol.decision_tree.impurity.gini_index import GiniIndex
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit
+from dtcontrol.decision_tree.splitting.linear_split import LinearSplit
+from dtcontrol.decision_tree.splitting.oc1 import OC1SplittingStrategy
+from dtcontrol.timeout import kill_oc1
+
+class TestOC1(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def test_same_split_as_mktree(self):
+        for seed in range(5):
+            dataset = self.create_dataset(seed)
+            in_process = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer())
+            subprocess = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer(), in_process=False)
+            expected = subprocess.find_split(dataset, Entropy())
+            split = in_process.find_split(dataset, Entropy())
+            self.assertIs(type(expected), type(split))
+            if isinstance(split, LinearSplit):
+                # mktree writes the hyperplane with 9 significant digits
+                np.testing.assert_allclose(expected.coefficients, split.coefficients, rtol=1e-7)
+                self.assertAlmostEqual(expected.intercept, split.intercept, places=6)
+            else:
+                self.assertEqual(expected.feature, split.feature)
+                self.assertAlmostEqual(expected.threshold, split.threshold, places=6)
+            self.assertFalse(os.path.exists('.dtcontrol_tmp'))
+
+    def test_concurrent_runs(self):
+        impurity_measures = [Entropy(), GiniIndex()] * 4
+        datasets = [self.create_dataset(seed) for seed in range(len(impurity_measures))]
+        in_process = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer())
+        subprocess = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer(), in_process=False)
+        expected = [in_process.find_split(ds, measure) for ds, measure in zip(datasets, impurity_measures)]
+        with ThreadPoolExecutor(4) as executor:
+            in_process_futures = [executor.submit(in_process.find_split, ds, measure)
+                                  for ds, measure in zip(datasets, impurity_measures)]
+            subprocess_futures = [executor.submit(subprocess.find_split, ds, measure)
+                                  for ds, measure in zip(datasets, impurity_measures)]
+            for split, in_process_future, subprocess_future in zip(expected, in_process_futures, subprocess_futures):
+                self.assertEqual(split.print_c(), in_process_future.result().print_c())
+                self.assertEqual(type(split), type(subprocess_future.result()))
+        self.assertEqual(set(), dtcontrol.globals.oc1_pids)
+        self.assertFalse(os.path.exists('.dtcontrol_tmp'))
+
+    def test_kill_oc1(self):
+        processes = [subprocess.Popen(['sleep', '60']) for _ in range(2)]
+        dtcontrol.globals.oc1_pids.update(p.pid for p in processes)
+        kill_oc1()
+        for p in processes:
+            self.assertIsNotNone(p.wait(timeout=10))
+        self.assertEqual(set(), dtcontrol.globals.oc1_pids)
+
+    def test_no_split(self):
+        dataset = self.create_dataset(0)
+        dataset.y[:, 0] = 1
+        dataset.y[:, 1] = -1
+        self.assertIsNone(OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer()).find_split(dataset,
+                                                                                                     Entropy()))
+
+    def test_axis_aligned_split(self):
+        dataset = self.create_dataset(0)
+        dataset.y[:, 0] = (dataset.x[:, 1] > 2) + 1
+        dataset.y[:, 1] = -1
+        split = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer()).find_split(dataset, Entropy())
+        self.assertIsInstance(split, AxisAlignedSplit)
+        self.assertEqual(1, split.feature)
+        self.assertTrue(2 <= split.threshold < 3)
+
+    def test_unsupported_impurity_measure(self):
+        class UnknownImpurity(EntropyRatio):
+            def get_oc1_name(self):
+                return 'unknown'
+
+        with self.assertRaises(ValueError):
+            OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer()).find_split(self.create_dataset(0),
+                                                                                      UnknownImpurity())
+
+    def test_error_does_not_exit(self):
+        strategy = OC1SplittingStrategy(determinizer=LabelPowersetDeterminizer())
+        dataset = self.create_dataset(0)
+        # OC1 rejects empty data with its error routine, which would otherwise exit the whole process
+        with self.assertRaisesRegex(RuntimeError, 'No points'):
+            strategy.find_split_in_process(np.zeros((0, 3)), np.zeros(0), Entropy(), dataset)
+        # the library is still usable afterwards
+        self.assertIsNotNone(strategy.find_split(dataset, Entropy()))
+
+    @staticmethod
+    def create_dataset(seed):
+        rng = np.random.default_rng(seed)
+        n = 200
+        x = rng.integers(-10, 10, size=(n, 3)).astype(float)
+        ds = SingleOutputDataset('oc1.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        ds.y = np.full((n, 2), -1)
+        ds.y[:, 0] = (x[:, 0] + 2 * x[:, 1] - x[:, 2] > seed).astype(int) + 1 + seed * 5
+        ds.y[rng.random(n) < 0.2, 1] = 30
+        ds.index_to_actual = {i: float(i) for i in range(1, 31)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from dtcontrol.benchmark_suite import BenchmarkSuite
+from dtcontrol.decision_tree.decision_tree import DecisionTree
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplittingStrategy
+
+class SlowTree(DecisionTree):
+    def fit(self, dataset):
+        time.sleep(60)
+
+class FailingTree(DecisionTree):
+    def fit(self, dataset):
+        raise RuntimeError('cannot fit')
+
+class TestParallelBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name, shift in [('a', 0), ('b', 1), ('c', 2)]:
+            with open(os.path.join(self.directory, f'{name}.csv'), 'w') as f:
+                f.write('#PERMISSIVE\n#BEGIN 2 1\n')
+                for x0 in range(8):
+                    for x1 in range(4):
+                        f.write(f'{x0},{x1},{(x0 + shift) // 3}\n')
+                        if x1 % 2 == 0:
+                            f.write(f'{x0},{x1},{x1 + 5}\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_suite(self, name, jobs, timeout=None):
+        suite = BenchmarkSuite(benchmark_file=os.path.join(self.directory, name), timeout=timeout,
+                               output_folder=os.path.join(self.directory, f'{name}_trees'), rerun=True, jobs=jobs)
+        suite.add_datasets(self.directory)
+        return suite
+
+    @staticmethod
+    def create_classifiers():
+        return [DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'CART'),
+                DecisionTree([AxisAlignedSplittingStrategy()], MultiLabelEntropy(), 'multilabel',
+                             early_stopping=True)]
+
+    def test_same_results(self):
+        sequential = self.create_suite('sequential', jobs=1)
+        sequential.benchmark(self.create_classifiers())
+        parallel = self.create_suite('parallel', jobs=3)
+        parallel.benchmark(self.create_classifiers())
+        self.assertEqual(['a', 'b', 'c'], sorted(parallel.results))
+        for ds in sequential.results:
+            for classifier, cell in sequential.results[ds]['classifiers'].items():
+                self.assertEqual(cell['stats'], parallel.results[ds]['classifiers'][classifier]['stats'])
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'parallel.html')))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'parallel_trees', 'CART', 'b', 'CART.dot')))
+
+    def test_timeout(self):
+        suite = self.create_suite('timeout', jobs=2, timeout=1)
+        classifiers = [SlowTree([AxisAlignedSplittingStrategy()], Entropy(), 'slow')] + self.create_classifiers()
+        start = time.time()
+        suite.benchmark(classifiers)
+        self.assertLess(time.time() - start, 30)
+        for ds in ['a', 'b', 'c']:
+            cells = suite.results[ds]['classifiers']
+            self.assertEqual('timeout', cells['slow'])
+            self.assertIn('stats', cells['CART'])
+            self.assertIn('stats', cells['multilabel'])
+
+    def test_failed_and_parallel_classifiers(self):
+        suite = self.create_suite('failed', jobs=2)
+        classifiers = [FailingTree([AxisAlignedSplittingStrategy()], Entropy(), 'failing'),
+                       DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'parallel', num_jobs=2,
+                                    parallel_num_examples=10)]
+        suite.benchmark(classifiers)
+        for ds in ['a', 'b', 'c']:
+            cells = suite.results[ds]['classifiers']
+            self.assertEqual('failed to fit', cells['failing'])
+            self.assertIn('stats', cells['parallel'])
+
+if __name__ == '__main__':
+    unittest.main()
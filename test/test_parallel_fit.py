@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.decision_tree import DecisionTree, Node, NodeBuilder
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.parallel_fit import compute_root_statistics, init_worker, share_dataset, worker_state
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit, AxisAlignedSplittingStrategy
+from dtcontrol.decision_tree.splitting.context_aware.context_aware_splitting_strategy import \
+    ContextAwareSplittingStrategy
+
+class AncestorSplittingStrategy(ContextAwareSplittingStrategy):
+    """
+    Splits at the median of a feature that depends on the splits of all ancestors of the current node.
+    """
+
+    def find_split(self, dataset, impurity_measure, **kwargs):
+        ancestors = self.get_ancestors(self.root, []) if self.current_node is not None else []
+        if ancestors is None:
+            raise AssertionError('The current node is not part of the tree.')
+        feature = (len(ancestors) + sum(node.split.feature for node in ancestors)) % dataset.x.shape[1]
+        values = np.unique(dataset.x[:, feature])
+        if len(values) < 2:
+            return None
+        return AxisAlignedSplit(feature, (values[len(values) // 2 - 1] + values[len(values) // 2]) / 2)
+
+    def get_ancestors(self, node, path):
+        if node is self.current_node:
+            return path
+        for child in node.children:
+            result = self.get_ancestors(child, path + [node])
+            if result is not None:
+                return result
+        return None
+
+class TestParallelFit(unittest.TestCase):
+    def test_same_tree(self):
+        for dataset_class, tree in [
+            (SingleOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'CART',
+                                                                **kwargs)),
+            (SingleOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], MultiLabelEntropy(),
+                                                                'multilabel', early_stopping=True, **kwargs)),
+            (MultiOutputDataset, lambda **kwargs: DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'CART',
+                                                               **kwargs)),
+            (SingleOutputDataset, lambda **kwargs: DecisionTree([AncestorSplittingStrategy()], Entropy(), 'context',
+                                                                **kwargs))
+        ]:
+            sequential = tree()
+            sequential.fit(self.create_dataset(dataset_class))
+            parallel = tree(num_jobs=2, parallel_num_examples=40)
+            parallel.fit(self.create_dataset(dataset_class))
+            self.assertEqual(self.describe(sequential.root), self.describe(parallel.root))
+            self.assertEqual(sequential.get_stats(), parallel.get_stats())
+            self.assertGreater(parallel.root.num_nodes, 20)
+
+    def test_shared_statistics(self):
+        for dataset_class, expected in [(SingleOutputDataset, {'unique_labels'}),
+                                        (MultiOutputDataset, {'unique_labels', 'tuple_ids'})]:
+            for use_bitsets in [False, True]:
+                dataset = self.create_dataset(dataset_class)
+                builder = NodeBuilder([AxisAlignedSplittingStrategy()], Entropy(), use_label_bitsets=use_bitsets)
+                compute_root_statistics(dataset, builder)
+                shell, shared_arrays = share_dataset(dataset)
+                statistics = expected | {'label_row_ids', 'x_min', 'x_max'}
+                if use_bitsets:
+                    statistics.add('label_bitsets')
+                self.assertLessEqual(statistics, set(shared_arrays))
+                self.assertEqual(use_bitsets, 'label_bitsets' in shared_arrays)
+                init_worker(shell, shared_arrays, Node, builder, 40, {})
+                view = worker_state['dataset'].from_mask(np.arange(0, 600, 2))
+                self.assertTrue(np.array_equal(dataset.get_label_row_ids()[::2], view.get_label_row_ids()))
+                self.assertTrue(np.array_equal(dataset.get_unique_labels()[::2], view.get_unique_labels()))
+                worker_state.clear()
+
+    @staticmethod
+    def describe(root):
+        description = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            description.append((str(node.split), str(node.index_label), str(node.actual_label), node.num_nodes,
+                                node.num_inner_nodes, node.depth))
+            stack.extend(node.children)
+        return description
+
+    @staticmethod
+    def create_dataset(dataset_class):
+        rng = np.random.default_rng(3)
+        n = 600
+        x = rng.integers(0, 20, size=(n, 3)).astype(float)
+        ds = dataset_class('parallel.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        nondet = rng.random(n) < 0.3
+        if dataset_class is SingleOutputDataset:
+            ds.y = np.full((n, 2), -1)
+            ds.y[:, 0] = ((x[:, 0] * 3 + x[:, 1] * 7 + x[:, 2]) // 11) % 4 + 1
+            ds.y[nondet, 1] = 5
+        else:
+            ds.y = np.full((2, n, 2), -1)
+            ds.y[0, :, 0] = ((x[:, 0] * 3 + x[:, 1] * 7) // 11) % 3 + 1
+            ds.y[1, :, 0] = ((x[:, 2] * 5 + x[:, 1]) // 13) % 3 + 1
+            ds.y[:, nondet, 1] = 4
+        ds.index_to_actual = {i: float(i) for i in range(1, 6)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
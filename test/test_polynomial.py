@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import LinearSVC
+
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+from dtcontrol.decision_tree.splitting.polynomial import PolynomialClassifierSplittingStrategy, PredictionChecker
+
+class TestPolynomial(unittest.TestCase):
+    def test_transform_quadratic(self):
+        def phi(x):
+            x = np.append(x, 1)
+            return np.array([x[i] * x[j] for j in range(len(x)) for i in range(j + 1)])
+
+        x = np.random.default_rng(0).normal(size=(50, 3))
+        transformed = PolynomialClassifierSplittingStrategy.transform_quadratic(x)
+        self.assertTrue(np.array_equal(np.apply_along_axis(phi, 1, x), transformed))
+        self.assertTrue(transformed.flags['C_CONTIGUOUS'])
+
+    def test_transform_x_cached_on_root(self):
+        dataset = self.create_dataset()
+        calls = []
+
+        def transformer(x):
+            calls.append(len(x))
+            return PolynomialClassifierSplittingStrategy.transform_quadratic(x)
+
+        left, right = dataset.from_mask(dataset.x[:, 0] < 0), dataset.from_mask(dataset.x[:, 0] >= 0)
+        for view in [left, right, left.from_mask(left.x[:, 1] < 0)]:
+            transformed = PolynomialClassifierSplittingStrategy.transform_x(view, transformer, 'quadratic')
+            expected = PolynomialClassifierSplittingStrategy.transform_quadratic(view.get_numeric_x())
+            self.assertTrue(np.array_equal(expected, transformed))
+        self.assertEqual([len(dataset)], calls)
+
+    def test_prediction_checker(self):
+        dataset = self.create_dataset()
+        x = PolynomialClassifierSplittingStrategy.transform_quadratic(dataset.x)
+        y = np.where(dataset.x[:, 0] ** 2 + dataset.x[:, 1] > 1, 1, -1)
+        pipeline = make_pipeline(StandardScaler(), LinearSVC(max_iter=10000, dual=False)).fit(x, y)
+        std, svc = pipeline.steps[0][1], pipeline.steps[1][1]
+        checker = PredictionChecker(std.transform(x), svc)
+        base = pipeline.predict(x)
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            index = rng.integers(-1, x.shape[1])
+            index = None if index < 0 else index
+            old = svc.intercept_[0] if index is None else svc.coef_[0][index]
+            checker.set_coefficient(index, old * rng.choice([0, 0.9, 1.1]))
+            unchanged = checker.predictions_unchanged()
+            self.assertEqual((base == pipeline.predict(x)).all(), unchanged)
+            if not unchanged:
+                checker.set_coefficient(index, old)
+
+    @staticmethod
+    def create_dataset():
+        x = np.random.default_rng(2).uniform(-2, 2, size=(120, 2))
+        ds = SingleOutputDataset('polynomial.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = []
+        ds.y = np.full((len(x), 1), -1)
+        ds.y[:, 0] = (x[:, 0] ** 2 + x[:, 1] > 1) + 1
+        ds.index_to_actual = {1: 1.0, 2: 2.0}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
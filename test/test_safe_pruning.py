@@ -57,7 +57,7 @@ class TestSafePruning(TestCase):
 
     @staticmethod
     def create_leaf(label):
-        node = Node(None, None)
+        node = Node()
         node.num_nodes = 1
         node.index_label = label
         node.actual_label = label
@@ -65,7 +65,7 @@ class TestSafePruning(TestCase):
 
     @staticmethod
     def create_parent(left, right):
-        node = Node(None, None)
+        node = Node()
         node.children = [left, right]
         node.num_nodes = 1 + left.num_nodes + right.num_nodes
         return node
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.scots_dataset_loader import ScotsDatasetLoader
+
+SCOTS_FILE = '''#SCOTS:v0.2
+#TYPE:STATICCONTROLLER
+#MEMBER:STATE_SPACE
+#TYPE:UNIFORMGRID
+#MEMBER:DIM
+2
+#VECTOR:ETA
+#BEGIN:2
+0.5
+1.0
+#END
+#VECTOR:LOWER_LEFT
+#BEGIN:2
+0.0
+-1.0
+#END
+#VECTOR:UPPER_RIGHT
+#BEGIN:2
+1.0
+1.0
+#END
+#MEMBER:INPUT_SPACE
+#TYPE:UNIFORMGRID
+#MEMBER:DIM
+1
+#VECTOR:ETA
+#BEGIN:1
+0.2
+#END
+#VECTOR:LOWER_LEFT
+#BEGIN:1
+-0.2
+#END
+#VECTOR:UPPER_RIGHT
+#BEGIN:1
+0.2
+#END
+#TYPE:WINNINGDOMAIN
+#MEMBER:NO_STATES
+#MATRIX:DATA
+#BEGIN:3 2
+0 1 2
+5 0
+7 2
+#END
+'''
+
+class TestScotsLoader(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'controller.scs')
+            with open(filename, 'w') as f:
+                f.write(SCOTS_FILE)
+            for chunk_size in [8, ScotsDatasetLoader.CHUNK_SIZE]:
+                loader = ScotsDatasetLoader()
+                loader.CHUNK_SIZE = chunk_size
+                x, x_metadata, y, y_metadata, index_to_actual = loader._load_dataset(filename)
+                self.assertTrue(np.array_equal(np.array([[0, -1], [1, 0], [0.5, 1]], dtype=np.float32), x))
+                self.assertTrue(np.array_equal([[1, 2], [3, -1], [2, -1]], y))
+                self.assertEqual({1: np.float32(0), 2: np.float32(0.2), 3: np.float32(-0.2)}, index_to_actual)
+                self.assertEqual([0.0, -1.0], x_metadata['min_inner'])
+                self.assertEqual([np.float32(-0.2)], y_metadata['min'])
+
+if __name__ == '__main__':
+    unittest.main()
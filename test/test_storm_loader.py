@@ -0,0 +1,40 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.storm_dataset_loader import StormDatasetLoader
+
+STORM_FILE = '''[
+{"s": {"x": 0, "b": true}, "c": [{"origin": {"action-label": "go", "commands": [1]}}]},
+{"s": {"x": 3, "b": false}, "c": [{"origin": {"commands": [2]}}, {"origin": {"action-label": "go", "commands": [1]}}]},
+{"s": {"x": 5, "b": false}, "c": [{"v": 0}]},
+{"s": {"x": 7, "b": true}, "c": [{"origin": {"commands": [2]}}]}
+]
+'''
+
+class TestStormLoader(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'scheduler.storm.json')
+            with open(filename, 'w') as f:
+                f.write(STORM_FILE)
+            x, x_metadata, y, y_metadata, index_to_actual = StormDatasetLoader()._load_dataset(filename)
+        self.assertTrue(np.array_equal([[0, 1], [3, 0], [7, 1]], x))
+        self.assertEqual(['x', 'b'], x_metadata['variables'])
+        self.assertTrue(np.array_equal([[1, -1], [2, 1], [2, -1]], y))
+        self.assertEqual(['go0', 'act1'], y_metadata['category_names'][0])
+
+    def test_iterate_entries(self):
+        for buffer_size in [1, 5, 1 << 20]:
+            entries = list(StormDatasetLoader.iterate_entries(io.StringIO(STORM_FILE), buffer_size))
+            self.assertEqual(4, len(entries))
+            self.assertEqual({'x': 7, 'b': True}, entries[-1]['s'])
+        self.assertEqual([], list(StormDatasetLoader.iterate_entries(io.StringIO(' [ ] '))))
+        with self.assertRaises(ValueError):
+            list(StormDatasetLoader.iterate_entries(io.StringIO('[{"s": {}}')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from dtcontrol.dataset.multi_output_dataset import MultiOutputDataset
+from dtcontrol.dataset.single_output_dataset import SingleOutputDataset
+import dtcontrol.decision_tree.tree_arrays as tree_arrays
+from dtcontrol.decision_tree.decision_tree import DecisionTree, Node
+from dtcontrol.decision_tree.impurity.entropy import Entropy
+from dtcontrol.decision_tree.impurity.multi_label_entropy import MultiLabelEntropy
+from dtcontrol.decision_tree.splitting.axis_aligned import AxisAlignedSplit, AxisAlignedSplittingStrategy
+from dtcontrol.decision_tree.splitting.categorical_multi import CategoricalMultiSplittingStrategy
+from dtcontrol.decision_tree.splitting.categorical_single import CategoricalSingleSplit
+from dtcontrol.decision_tree.splitting.linear_classifier import LinearClassifierSplittingStrategy
+from dtcontrol.decision_tree.splitting.polynomial import PolynomialSplit
+
+class TestTreeArrays(unittest.TestCase):
+    def test_round_trip(self):
+        for dataset_class, strategies, impurity_measure, kwargs in [
+            (SingleOutputDataset, [AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (SingleOutputDataset, [AxisAlignedSplittingStrategy()], MultiLabelEntropy(), {'early_stopping': True}),
+            (SingleOutputDataset, [AxisAlignedSplittingStrategy(),
+                                   LinearClassifierSplittingStrategy(LogisticRegression, solver='lbfgs')], Entropy(),
+             {}),
+            (SingleOutputDataset, [CategoricalMultiSplittingStrategy(), AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (MultiOutputDataset, [AxisAlignedSplittingStrategy()], Entropy(), {}),
+            (MultiOutputDataset, [AxisAlignedSplittingStrategy()], MultiLabelEntropy(), {'early_stopping': True})
+        ]:
+            ds = self.create_dataset(dataset_class, strategies[0])
+            dt = DecisionTree(strategies, impurity_measure, 'arrays', **kwargs)
+            dt.fit(ds)
+            self.assert_same_tree(dt, ds)
+
+    def test_other_splits(self):
+        root = Node()
+        root.split = CategoricalSingleSplit(0, 2.0)
+        root.children = [Node(depth=1), Node(depth=1)]
+        root.children[1].split = PolynomialSplit(None, np.array([1., 0., -1., 0., 0., -0.5]), [1, 2])
+        root.children[1].children = [Node(depth=2), Node(depth=2)]
+        for node, label in zip([root.children[0]] + root.children[1].children, [1, 2, 3]):
+            node.index_label = label
+            node.actual_label = label / 2
+            node.num_nodes = 1
+        root.update_num_nodes()
+        dt = DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'other')
+        dt.root = root
+        ds = self.create_dataset(SingleOutputDataset, None)
+        self.assert_same_tree(dt, ds)
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'other.npz')
+            dt.save(filename)
+            with self.assertRaises(ValueError):
+                tree_arrays.load(filename, Node, allow_pickle=False)
+            root.children[1] = root.children[1].children[0]
+            root.update_num_nodes()
+            dt.save(filename)
+            loaded = tree_arrays.load(filename, Node, allow_pickle=False)
+            self.assertEqual((3, 2.0), (loaded.num_nodes, loaded.split.value))
+
+    def test_slim_nodes(self):
+        ds = self.create_dataset(SingleOutputDataset, None)
+        dt = DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'slim')
+        dt.fit(ds)
+        self.assertFalse(hasattr(dt.root, '__dict__'))
+        self.assertFalse(hasattr(dt.root.split, '__dict__'))
+        self.assertIsNone(dt.root.builder)
+        copy = pickle.loads(pickle.dumps(dt.root))
+        self.assertEqual(dt.root.num_nodes, copy.num_nodes)
+        self.assertEqual(dt.root.print_c(), copy.print_c())
+        self.assertEqual(dt.root.split.threshold, copy.split.threshold)
+
+    def assert_same_tree(self, dt, ds):
+        with tempfile.TemporaryDirectory() as folder:
+            for filename in ['tree.npz', 'tree.saved']:
+                loaded = DecisionTree([AxisAlignedSplittingStrategy()], Entropy(), 'loaded')
+                dt.save(os.path.join(folder, filename))
+                loaded.load(os.path.join(folder, filename))
+                self.assertEqual(self.describe(dt.root), self.describe(loaded.root))
+                self.assertEqual(dt.print_dot({}, {}), loaded.print_dot({}, {}))
+                self.assertEqual(dt.print_c(), loaded.print_c())
+                self.assertEqual(dt.toJSON({}, {}), loaded.toJSON({}, {}))
+                for actual_values in [False, True]:
+                    self.assertEqual(dt.predict(ds, actual_values), loaded.predict(ds, actual_values))
+
+    @staticmethod
+    def describe(root):
+        """
+        :returns: the preorder list of the labels, sizes and depths of the nodes
+        """
+        result = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            result.append((node.index_label, node.actual_label, node.num_nodes, node.num_inner_nodes, node.depth,
+                           None if node.split is None else node.split.priority))
+            stack.extend(reversed(node.children))
+        return result
+
+    @staticmethod
+    def create_dataset(dataset_class, first_strategy):
+        rng = np.random.default_rng(7)
+        x = np.array(np.meshgrid(np.arange(6), np.arange(5), np.arange(4))).reshape(3, -1).T.astype(float)
+        n = len(x)
+        ds = dataset_class('arrays.csv')
+        ds.x = x
+        ds.x_metadata['categorical'] = [0] if isinstance(first_strategy, CategoricalMultiSplittingStrategy) else []
+        nondet = rng.random(n) < 0.3
+        if dataset_class is SingleOutputDataset:
+            ds.y = np.full((n, 2), -1)
+            ds.y[:, 0] = rng.integers(1, 4, size=n)
+            ds.y[nondet, 1] = 4
+        else:
+            ds.y = np.full((2, n, 2), -1)
+            ds.y[:, :, 0] = rng.integers(1, 3, size=(2, n))
+            ds.y[:, nondet, 1] = 3
+        ds.index_to_actual = {i: float(i) / 2 for i in range(1, 5)}
+        return ds
+
+if __name__ == '__main__':
+    unittest.main()
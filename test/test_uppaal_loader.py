@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dtcontrol.dataset.uppaal_dataset_loader import UppaalDatasetLoader
+
+UPPAAL_FILE = '''Strategy to avoid losing:
+State: ( Car.Choose Env.idle ) x=0 v=0 gua=3
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := -1 }
+
+State: ( Car.Wait Env.idle ) x=0 v=0 gua=3
+When you are in (x<5), take transition Car.Wait->Car.Idle { 1, tau, 1 }
+
+State: ( Car.Choose Env.idle ) x=1 v=2 gua=0
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := 1 }
+When you are in (x<7), take transition Car.Choose->Car.Go { 1, tau, acc := 0 }
+
+State: ( Car.Wait Env.idle ) x=4 v=2 gua=0
+When you are in (x<5), take transition Car.Wait->Car.Idle { 1, tau, 1 }
+
+State: ( Car.Choose Env.idle ) x=1 v=2 gua=5
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := 1 }
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := -1 }
+
+State: ( Car.Choose Env.idle ) x=-1 v=1 gua=5
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := 0 }
+When you are in (x<5), take transition Car.Choose->Car.Go { 1, tau, acc := -1 }
+
+'''
+
+class TestUppaalLoader(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'strategy.dump')
+            with open(filename, 'w') as f:
+                f.write(UPPAAL_FILE)
+            loader = UppaalDatasetLoader()
+            loader.BUFFER_SIZE = 64
+            x, x_metadata, y, y_metadata, index_to_actual = loader._load_dataset(filename)
+        self.assertEqual({1: -1, 2: 1, 3: 0}, index_to_actual)
+        self.assertEqual(['Car.Choose', 'x', 'v'], x_metadata['variables'])
+        self.assertTrue(np.array_equal([[1, -1, 1], [1, 1, 2]], x))
+        self.assertEqual(np.int16, x.dtype)
+        # the state x=1, v=2 occurs twice, only the action allowed in both occurrences is kept
+        self.assertTrue(np.array_equal([[1, 3], [2, -1]], y))
+        self.assertEqual([-1], y_metadata['min'])
+        self.assertEqual([1], y_metadata['step_size'])
+
+if __name__ == '__main__':
+    unittest.main()